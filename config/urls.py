@@ -16,10 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from core.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('core.urls', namespace='core')),
     path('api/v1/payments/', include('payments.urls', namespace='payments')),
     path('api/v1/', include('tally.urls', namespace='tally')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
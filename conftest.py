@@ -0,0 +1,14 @@
+import pytest
+
+from utils.queries import query_budget as _query_budget
+
+
+@pytest.fixture
+def query_budget(db):
+    """
+    Fails the block if it exceeds a query budget or repeats a statement.
+
+        with query_budget(2, max_repeats=2):
+            client.get(url)
+    """
+    return _query_budget
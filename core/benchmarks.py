@@ -0,0 +1,321 @@
+"""
+Throughput benchmarks for the request hot paths.
+
+`seed()` builds one realistic event and `run_benchmarks()` drives each
+scenario through the Django test client, recording requests/sec, p50/p99
+latency and queries per request. Results can be saved as a JSON baseline
+and later runs compared against it; see the `benchmark` management command.
+
+Everything runs in-process against the configured database, so absolute
+numbers depend on the machine and backend. Compare runs against a baseline
+recorded in the same environment.
+"""
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import os
+import random
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Candidate, Category, Event, Ticket, User
+from core.models.vote import VoteTransaction
+from payments.models import Transaction
+from payments.views import PAYSTACK_IPS, PAYSTACK_SECRET_KEY
+
+SCENARIOS = {}
+
+
+class BenchmarkError(Exception):
+    """
+    A scenario returned a response other than the one it benchmarks.
+    """
+
+
+def scenario(name, expect=200):
+    """
+    Register `setup(world, client, count)` as a benchmark. It prepares
+    whatever `count` requests need and returns `request(i)`, which makes the
+    i-th one.
+    """
+    def register(setup):
+        SCENARIOS[name] = (setup, expect)
+        return setup
+    return register
+
+
+class World:
+    """
+    The seeded data the scenarios run against.
+    """
+
+    def __init__(self, organizer, event, categories, candidates):
+        self.organizer = organizer
+        self.event = event
+        self.categories = categories
+        self.candidates = candidates
+
+
+def _payment(ref, status):
+    return Transaction(
+        amount=1, channel="momo", provider="mtn", phone_number="0240000000", status=status,
+        currency="GHS", type="payment", gateway="paystack", external_payment_id=ref,
+    )
+
+
+def seed_votes(candidates, count, status="success", prefix="bench"):
+    """
+    Bulk-create `count` vote transactions spread over `candidates`, each with
+    its Paystack transaction. Settled ones are verified; others are pending.
+
+    Returns:
+        list: The VoteTransaction instances, in creation order.
+    """
+    start = Transaction.objects.count()
+    payments = Transaction.objects.bulk_create(
+        [_payment(f"{prefix}-{start + i}", status) for i in range(count)], batch_size=1000,
+    )
+    votes = [
+        VoteTransaction(candidate=random.choice(candidates), vote_count=random.randint(1, 10),
+                        payment=payment, is_verified=status == "success")
+        for payment in payments
+    ]
+    VoteTransaction.objects.bulk_create(votes, batch_size=1000)
+    return votes
+
+
+def seed(categories=10, candidates=20, transactions=5000):
+    """
+    Create an organizer with one live event of `categories` categories,
+    `candidates` candidates each, and `transactions` settled votes.
+
+    Returns:
+        World
+    """
+    random.seed(0)
+    organizer = User.objects.create_user(
+        email="bench@example.com", password="bench", organization_name="Bench Org", is_verified=True,
+    )
+    event = Event.objects.create(
+        user=organizer, name="Benchmark Awards", host="Bench Org", amount_per_vote=1,
+        start_time=timezone.now() - timedelta(hours=1), end_time=timezone.now() + timedelta(days=7),
+    )
+    Ticket.objects.create(event=event, price=50, type="Regular", quantity=10_000)
+
+    Category.objects.bulk_create([Category(event=event, name=f"Category {i}") for i in range(categories)])
+    category_list = list(Category.objects.filter(event=event).order_by('id'))
+    Candidate.objects.bulk_create([
+        Candidate(event=event, category=category, name=f"Candidate {c}.{i}", gender="other")
+        for c, category in enumerate(category_list) for i in range(candidates)
+    ], batch_size=1000)
+    candidate_list = list(Candidate.objects.filter(event=event).order_by('id'))
+
+    votes = seed_votes(candidate_list, transactions)
+    totals = {}
+    for vote in votes:
+        totals[vote.candidate_id] = totals.get(vote.candidate_id, 0) + vote.vote_count
+    for candidate in candidate_list:
+        candidate.vote_count = totals.get(candidate.id, 0)
+    Candidate.objects.bulk_update(candidate_list, ['vote_count'], batch_size=1000)
+
+    return World(organizer, event, category_list, candidate_list)
+
+
+@scenario("initiate_vote")
+def initiate_vote(world, client, count):
+    url = reverse("payments:initiate-vote")
+    candidates = itertools.cycle(world.candidates)
+
+    def request(i):
+        return client.post(url, {
+            "candidate": next(candidates).id, "vote_count": 2,
+            "phone_number": "0240000000", "channel": "momo", "provider": "mtn",
+        }, content_type="application/json")
+    return request
+
+
+@scenario("paystack_webhook")
+def paystack_webhook(world, client, count):
+    url = reverse("payments:paystack-webhook")
+    pending = iter(seed_votes(world.candidates, count, status="pending", prefix="bench-hook"))
+
+    def request(i):
+        vote = next(pending)
+        body = json.dumps({
+            "event": "charge.success",
+            "data": {
+                "id": vote.payment.external_payment_id, "status": "success", "amount": vote.vote_count * 100,
+                "metadata": {"p": 0, "id": str(vote.id)},
+            },
+        })
+        signature = hmac.new(PAYSTACK_SECRET_KEY.encode(), body.encode(), hashlib.sha512).hexdigest()
+        return client.post(url, body, content_type="application/json",
+                           HTTP_X_PAYSTACK_SIGNATURE=signature, REMOTE_ADDR=PAYSTACK_IPS[0])
+    return request
+
+
+@scenario("event_results")
+def event_results(world, client, count):
+    url = reverse("core:public-results", kwargs={"shortcode": world.event.shortcode})
+    return lambda i: client.get(url)
+
+
+@scenario("event_results_not_modified", expect=304)
+def event_results_not_modified(world, client, count):
+    url = reverse("core:public-results", kwargs={"shortcode": world.event.shortcode})
+    etag = client.get(url)["ETag"]
+    return lambda i: client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+
+@scenario("dashboard")
+def dashboard(world, client, count):
+    url = reverse("core:dashboard")
+    token = RefreshToken.for_user(world.organizer).access_token
+    return lambda i: client.get(url, HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+@scenario("public_events")
+def public_events(world, client, count):
+    url = reverse("core:public-events")
+    return lambda i: client.get(url)
+
+
+@scenario("public_categories")
+def public_categories(world, client, count):
+    url = reverse("core:public-categories", kwargs={"shortcode": world.event.shortcode})
+    return lambda i: client.get(url)
+
+
+@scenario("public_candidates")
+def public_candidates(world, client, count):
+    url = reverse("core:public-candidates")
+    categories = itertools.cycle(world.categories)
+    return lambda i: client.get(url, {"eventcode": world.event.shortcode, "category": next(categories).id})
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of samples.
+    """
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def measure(request, iterations, warmup=0, expect=200):
+    """
+    Time `iterations` calls of `request(i)` after `warmup` untimed ones.
+
+    Returns:
+        dict: rps, p50_ms, p99_ms and queries (per request).
+
+    Raises:
+        BenchmarkError: A response did not have the `expect` status code.
+    """
+    def call(i):
+        response = request(i)
+        if response.status_code != expect:
+            raise BenchmarkError(f"Expected {expect}, got {response.status_code}: {response.content[:200]!r}")
+
+    for i in range(warmup):
+        call(i)
+
+    samples = []
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for i in range(warmup, warmup + iterations):
+            t0 = time.perf_counter()
+            call(i)
+            samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "rps": round(iterations / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "queries": round(len(queries) / iterations, 2),
+    }
+
+
+def _stub_charge():
+    ids = itertools.count(1)
+
+    def charge(amount, phone_number, provider, metadata=None):
+        charge_id = f"bench-charge-{next(ids)}"
+        return {
+            "status": True,
+            "data": {
+                "id": charge_id, "status": "send_otp", "amount": int(amount * 100), "reference": charge_id,
+                "channel": "mobile_money", "authorization": {"mobile_money_number": phone_number, "bank": provider},
+                "paid_at": None,
+            },
+        }
+    return charge
+
+
+def run_benchmarks(world, iterations=200, warmup=20, only=None):
+    """
+    Run the registered scenarios (or just those named in `only`) against
+    `world`. Throttling is disabled and Paystack is stubbed out, so only this
+    application's own work is measured.
+
+    Returns:
+        dict: Scenario name to its `measure()` result.
+    """
+    results = {}
+    with mock.patch.object(SimpleRateThrottle, "allow_request", return_value=True), \
+            mock.patch("payments.views.charge_mobile_money", side_effect=_stub_charge()):
+        for name, (setup, expect) in SCENARIOS.items():
+            if only and name not in only:
+                continue
+            request = setup(world, Client(), iterations + warmup)
+            results[name] = measure(request, iterations, warmup=warmup, expect=expect)
+    return results
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)["results"]
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results, **meta):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"recorded_at": timezone.now().isoformat(), **meta, "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compare a run against a baseline. A scenario regressed if its p50 is more
+    than `tolerance` slower or it makes more queries per request.
+
+    Returns:
+        dict: Scenario name to a list of human-readable regressions.
+    """
+    regressions = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        found = []
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            found.append(f"p50 {base['p50_ms']}ms -> {result['p50_ms']}ms")
+        if result["queries"] > base["queries"]:
+            found.append(f"queries {base['queries']} -> {result['queries']}")
+        if found:
+            regressions[name] = found
+    return regressions
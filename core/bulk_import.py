@@ -0,0 +1,158 @@
+"""
+Bulk category and candidate imports for setting up large events in one
+request (see the `import` actions of the organizer viewsets).
+
+Rows come as a JSON array or a CSV upload. Each import runs a fixed number
+of queries however many rows it has: one to check that the organizer owns
+every parent, one for `unique_together` collisions with existing rows, and
+batched INSERTs. Imports are all or nothing; if any row is invalid nothing
+is created and every bad row is reported.
+"""
+import csv
+import io
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from core.mixins.cache import invalidate_cache_scopes
+from core.models import Candidate, Category, Event
+from core.serializers import CandidateImportSerializer, CategoryImportSerializer
+from tally.versioning import bump_results_versions
+
+
+def read_rows(request):
+    """
+    The rows of an import request: the JSON body, or the CSV file uploaded as
+    `file` (a header row, then one row per record; blank cells are omitted).
+
+    Raises:
+        ValidationError: There are no rows, too many, the file is too large or
+            not valid CSV, or the body is neither.
+    """
+    upload = request.FILES.get('file')
+    if upload is not None:
+        if upload.size > settings.BULK_IMPORT_MAX_UPLOAD_BYTES:
+            raise ValidationError({'detail': f'The CSV file must be at most {settings.BULK_IMPORT_MAX_UPLOAD_BYTES} bytes.'})
+        try:
+            text = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValidationError({'detail': 'The CSV file must be UTF-8 encoded.'})
+        try:
+            rows = [
+                {key.strip(): value.strip() for key, value in row.items() if key and isinstance(value, str) and value.strip()}
+                for row in csv.DictReader(io.StringIO(text))
+            ]
+        except csv.Error as error:
+            raise ValidationError({'detail': f'The CSV file could not be read: {error}.'})
+    elif isinstance(request.data, list):
+        rows = request.data
+    else:
+        raise ValidationError({'detail': 'Send a JSON array of rows or a CSV file as "file".'})
+
+    if not rows:
+        raise ValidationError({'detail': 'There are no rows to import.'})
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise ValidationError({'detail': f'Import at most {settings.BULK_IMPORT_MAX_ROWS} rows at a time.'})
+    return rows
+
+
+def _validate(rows, serializer_class):
+    valid, errors = {}, {}
+    for number, row in enumerate(rows, start=1):
+        serializer = serializer_class(data=row)
+        if serializer.is_valid():
+            valid[number] = serializer.validated_data
+        else:
+            errors[number] = serializer.errors
+    return valid, errors
+
+
+def _create(model, valid, errors, events):
+    """
+    Insert the rows unless any failed, invalidating the public listings and
+    results of `events` ({id: shortcode}) since bulk_create sends no signals.
+
+    Returns:
+        tuple: (created objects, per-row errors as [{"row", "errors"}]).
+    """
+    if errors:
+        return [], [{'row': number, 'errors': errors[number]} for number in sorted(errors)]
+    try:
+        with transaction.atomic():
+            created = model.objects.bulk_create(
+                [model(**row) for row in valid.values()], batch_size=settings.BULK_IMPORT_BATCH_SIZE
+            )
+            scopes = ['events'] + [f'event:{shortcode}' for shortcode in events.values()]
+            transaction.on_commit(lambda: invalidate_cache_scopes(*scopes))
+            bump_results_versions(events)
+    except IntegrityError:
+        # Another request created a colliding row since we checked
+        raise ValidationError({'detail': 'Some rows were added by another request meanwhile. Import again to see which.'})
+    return created, []
+
+
+def import_categories(user, rows):
+    """
+    Create categories from rows of `event`, `name`, `description`, `is_active`.
+
+    Returns:
+        tuple: See `_create`.
+    """
+    valid, errors = _validate(rows, CategoryImportSerializer)
+    events = dict(
+        Event.objects.filter(user=user, pk__in={row['event_id'] for row in valid.values()})
+        .values_list('pk', 'shortcode')
+    )
+    taken = set(
+        Category.objects.filter(event__in=events, name__in={row['name'] for row in valid.values()})
+        .values_list('event_id', 'name')
+    )
+
+    for number, row in valid.items():
+        key = (row['event_id'], row['name'])
+        if row['event_id'] not in events:
+            errors[number] = {'event': ['You do not have permission to add category to this event.']}
+        elif key in taken:
+            errors[number] = {'name': ['A category with this name already exists in this event.']}
+        else:
+            taken.add(key)  # so a repeat further down the file collides too
+
+    return _create(Category, valid, errors, events)
+
+
+def import_candidates(user, rows):
+    """
+    Create candidates from rows of `category`, `name`, `gender` and optionally
+    `event` (defaults to the category's), `description`, `extra_info`,
+    `achivements` (JSON only) and `is_blocked`.
+
+    Returns:
+        tuple: See `_create`.
+    """
+    valid, errors = _validate(rows, CandidateImportSerializer)
+    categories = {
+        pk: (event_id, shortcode)
+        for pk, event_id, shortcode in Category.objects.filter(
+            event__user=user, pk__in={row['category_id'] for row in valid.values()}
+        ).values_list('pk', 'event_id', 'event__shortcode')
+    }
+    taken = set(
+        Candidate.objects.filter(category__in=categories, name__in={row['name'] for row in valid.values()})
+        .values_list('event_id', 'category_id', 'name')
+    )
+
+    for number, row in valid.items():
+        if row['category_id'] not in categories:
+            errors[number] = {'category': ['You do not have permission to add candidates to this category.']}
+            continue
+        event_id = categories[row['category_id']][0]
+        key = (event_id, row['category_id'], row['name'])
+        if row.setdefault('event_id', event_id) != event_id:
+            errors[number] = {'event': ['The category does not belong to this event.']}
+        elif key in taken:
+            errors[number] = {'name': ['A candidate with this name already exists in this category.']}
+        else:
+            taken.add(key)
+
+    return _create(Candidate, valid, errors, dict(categories.values()))
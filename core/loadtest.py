@@ -0,0 +1,254 @@
+"""
+A voting-night load generator.
+
+`VotingNight` runs a pool of simulated users against a running server for a
+fixed duration. Each user loops over a weighted mix of public listing reads,
+results polling (revalidating with If-None-Match like the web client) and
+vote initiations, with exponential think time in between.
+
+The server must be pointed at the fake Paystack this module serves
+(`PAYSTACK_BASE_URL=http://127.0.0.1:<port>`, see `services.fake_gateway`),
+which answers each charge and fires its signed webhook back at the server
+after a realistic lag, sometimes twice.
+
+Everything is measured from the outside except lock waits, which are sampled
+from the database the command is configured with (PostgreSQL only).
+"""
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+from django.db import connection
+
+from services.fake_gateway import FakeGateway, serve
+
+DEFAULT_MIX = {"events": 10, "categories": 15, "candidates": 25, "results": 35, "vote": 15}
+
+
+def parse_mix(value):
+    """
+    Parse a traffic mix like "results=40,vote=20" into weights.
+    Actions that are not mentioned keep their default weight.
+    """
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, value.split(",")):
+        action, _, weight = part.partition("=")
+        if action.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown action {action!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[action.strip()] = float(weight)
+    return mix
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)] if ordered else 0
+
+
+class Stats:
+    """
+    Thread-safe per-action latency and status code tallies.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, action, seconds, status):
+        with self.lock:
+            self.latencies[action].append(seconds)
+            self.statuses[action][status] += 1
+
+    def summary(self, elapsed):
+        rows = {}
+        for action, latencies in sorted(self.latencies.items()):
+            statuses = self.statuses[action]
+            errors = sum(n for status, n in statuses.items() if not (isinstance(status, int) and status < 400))
+            rows[action] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / elapsed, 1),
+                "error_rate": round(errors / len(latencies), 4),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                "statuses": dict(statuses),
+            }
+        return rows
+
+
+class LockSampler:
+    """
+    Samples how many database sessions are waiting on a lock, once per
+    `interval`. Only PostgreSQL exposes this; elsewhere `summary()` is None.
+    """
+
+    QUERY = "SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock' AND datname = current_database()"
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.supported = connection.vendor == "postgresql"
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        if self.supported:
+            self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            with connection.cursor() as cursor:
+                while not self.stopped.wait(self.interval):
+                    cursor.execute(self.QUERY)
+                    self.samples.append(cursor.fetchone()[0])
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def summary(self):
+        if not self.supported:
+            return None
+        return {
+            "samples": len(self.samples),
+            "waiting_peak": max(self.samples, default=0),
+            "waiting_mean": round(sum(self.samples) / len(self.samples), 2) if self.samples else 0,
+            # Sessions x sampling interval: a rough total of time spent blocked
+            "lock_wait_seconds": round(sum(self.samples) * self.interval, 1),
+        }
+
+
+class VotingNight:
+    """
+    One load-test run. `api_url` is the API root, e.g.
+    "http://127.0.0.1:8000/api/v1".
+    """
+
+    def __init__(self, api_url, paystack_secret, users=50, duration=60, think_time=0.5, mix=None,
+                 webhook_lag=2.0, duplicate_rate=0.05, paystack_host="127.0.0.1", paystack_port=0,
+                 paystack_latency=0.0, paystack_failure_rate=0.0):
+        self.api_url = api_url.rstrip("/")
+        self.users = users
+        self.duration = duration
+        self.think_time = think_time
+        self.mix = mix or DEFAULT_MIX
+        self.stats = Stats()
+        self.paystack = FakeGateway(
+            f"{self.api_url}/payments/webhooks/paystack", paystack_secret,
+            latency=paystack_latency, failure_rate=paystack_failure_rate,
+            webhook_lag=webhook_lag, duplicate_rate=duplicate_rate,
+            on_delivery=lambda seconds, status: self.stats.record("webhook", seconds, status),
+        )
+        self.paystack_server = serve(self.paystack, host=paystack_host, port=paystack_port)
+
+    @property
+    def paystack_url(self):
+        host, port = self.paystack_server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def discover(self, session):
+        """
+        Find what the simulated users will browse: live events, their
+        categories and candidates.
+        """
+        events = session.get(f"{self.api_url}/public/events/", timeout=30).json()["data"]
+        if not events:
+            raise RuntimeError("The server has no live events to load-test against")
+
+        targets = []
+        for event in events:
+            categories = session.get(f"{self.api_url}/public/events/{event['shortcode']}/categories/", timeout=30).json()["data"]
+            for category in categories:
+                candidates = session.get(f"{self.api_url}/public/events/candidates/", timeout=30, params={
+                    "eventcode": event["shortcode"], "category": category["id"],
+                }).json()["data"]
+                if candidates:
+                    targets.append((event["shortcode"], category["id"], [c["id"] for c in candidates]))
+        if not targets:
+            raise RuntimeError("The server's live events have no candidates to vote for")
+        return targets
+
+    def request(self, action, session, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=30, **kwargs)
+            status = response.status_code
+        except requests.RequestException as e:
+            response, status = None, type(e).__name__
+        self.stats.record(action, time.perf_counter() - started, status)
+        return response
+
+    def user(self, targets, deadline):
+        session = requests.Session()
+        etags = {}
+        actions, weights = zip(*self.mix.items())
+        while time.monotonic() < deadline:
+            action = random.choices(actions, weights)[0]
+            shortcode, category, candidates = random.choice(targets)
+
+            if action == "events":
+                self.request(action, session, "GET", f"{self.api_url}/public/events/")
+            elif action == "categories":
+                self.request(action, session, "GET", f"{self.api_url}/public/events/{shortcode}/categories/")
+            elif action == "candidates":
+                self.request(action, session, "GET", f"{self.api_url}/public/events/candidates/",
+                             params={"eventcode": shortcode, "category": category})
+            elif action == "results":
+                url = f"{self.api_url}/public/events/{shortcode}/results/"
+                headers = {"If-None-Match": etags[url]} if url in etags else {}
+                response = self.request(action, session, "GET", url, headers=headers)
+                if response is not None and "ETag" in response.headers:
+                    etags[url] = response.headers["ETag"]
+            elif action == "vote":
+                self.request(action, session, "POST", f"{self.api_url}/payments/vote", json={
+                    "candidate": random.choice(candidates), "vote_count": random.randint(1, 5),
+                    "phone_number": f"024{random.randint(0, 9999999):07d}", "channel": "momo", "provider": "mtn",
+                })
+
+            if self.think_time:
+                time.sleep(random.expovariate(1 / self.think_time))
+
+    def run(self, drain_timeout=60):
+        """
+        Run the load test and return its report.
+        """
+        threading.Thread(target=self.paystack_server.serve_forever, daemon=True).start()
+        locks = LockSampler().start()
+        try:
+            targets = self.discover(requests.Session())
+            started = time.monotonic()
+            users = [threading.Thread(target=self.user, args=(targets, started + self.duration), daemon=True)
+                     for _ in range(self.users)]
+            for user in users:
+                user.start()
+            for user in users:
+                user.join()
+            elapsed = time.monotonic() - started
+            undelivered = self.paystack.webhooks.drain(drain_timeout)
+        finally:
+            locks.stop()
+            self.paystack_server.shutdown()
+            self.paystack_server.server_close()
+
+        actions = self.stats.summary(elapsed)
+        requests_made = sum(row["requests"] for row in actions.values())
+        errors = sum(round(row["error_rate"] * row["requests"]) for row in actions.values())
+        return {
+            "duration": round(elapsed, 1),
+            "users": self.users,
+            "requests": requests_made,
+            "rps": round(requests_made / elapsed, 1),
+            "error_rate": round(errors / requests_made, 4) if requests_made else 0,
+            "charges": self.paystack.charges,
+            "failed_charges": self.paystack.failures,
+            "duplicate_webhooks": self.paystack.duplicates,
+            "undelivered_webhooks": undelivered,
+            "actions": actions,
+            "locks": locks.summary(),
+        }
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmarks import SCENARIOS, compare, load_baseline, run_benchmarks, save_baseline, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the vote, webhook, results, dashboard and public listing endpoints "
+        "against a throwaway test database and compare with a saved baseline. The committed "
+        "benchmarks/baseline.json was recorded with the default seed on SQLite; re-record it with "
+        "--save-baseline on the machine that runs the comparison (e.g. the CI runner), since "
+        "timings only compare like with like. Query counts compare anywhere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--candidates", type=int, default=20, help="Candidates per category.")
+        parser.add_argument("--transactions", type=int, default=5000, help="Settled vote transactions to seed.")
+        parser.add_argument("--iterations", type=int, default=200, help="Timed requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="Run just these scenarios.")
+        parser.add_argument("--baseline", default="benchmarks/baseline.json")
+        parser.add_argument("--save-baseline", action="store_true", help="Record this run as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed p50 slowdown before a scenario counts as regressed.")
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Exit with an error if any scenario regressed (for CI).")
+
+    def handle(self, *args, **options):
+        # Never touch the real database: seed a fresh test database and drop it afterwards
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            world = seed(options["categories"], options["candidates"], options["transactions"])
+            results = run_benchmarks(world, options["iterations"], options["warmup"], options["only"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        baseline = load_baseline(options["baseline"])
+        regressions = compare(results, baseline, options["tolerance"])
+
+        self.stdout.write(f"{'scenario':<28} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8}")
+        for name, result in results.items():
+            line = f"{name:<28} {result['rps']:>9} {result['p50_ms']:>9} {result['p99_ms']:>9} {result['queries']:>8}"
+            if name in regressions:
+                self.stdout.write(self.style.WARNING(f"{line}  REGRESSED: {'; '.join(regressions[name])}"))
+            elif name in baseline:
+                self.stdout.write(self.style.SUCCESS(f"{line}  (baseline p50 {baseline[name]['p50_ms']})"))
+            else:
+                self.stdout.write(line)
+
+        if options["save_baseline"]:
+            save_baseline(options["baseline"], {**baseline, **results}, vendor=connection.vendor,
+                          seed=[options["categories"], options["candidates"], options["transactions"]])
+            self.stdout.write(f"\nBaseline saved to {options['baseline']}")
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"Regressed: {', '.join(regressions)}")
@@ -0,0 +1,75 @@
+import re
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.models import Candidate, Category, Event, TicketSale
+from core.models.vote import VoteTransaction
+from core.models.withdrawal import WithdrawalTransaction
+from payments.models import Transaction, WebhookLog
+
+# Plan lines that read a whole table: "Seq Scan on t" (PostgreSQL), "SCAN t" (SQLite, without an index)
+SEQUENTIAL_SCAN = re.compile(r"Seq Scan on (\w+)|\bSCAN (\w+)(?!\s+USING)\s*$")
+
+
+def hot_queries():
+    """
+    The lookups the request paths and workers run most, with placeholder
+    parameters. Keep in step with the views they mirror.
+    """
+    user, event, category, ref = 1, 1, 1, "302961"
+    now = timezone.now()
+    return {
+        # core.views
+        "public categories": Category.objects.filter(event__shortcode="ABC123", event__is_active=True, is_active=True).with_stats(),
+        "public candidates": Candidate.objects.filter(event__shortcode="ABC123", category=category, is_blocked=False, event__is_active=True),
+        "public results": Candidate.objects.filter(event_id=event).with_live_votes(),
+        "event by shortcode": Event.objects.filter(shortcode="ABC123", is_active=True),
+        "organizer dashboard": Event.objects.filter(user=user, is_active=True, is_blocked=False).with_stats(),
+        "organizer candidates": Candidate.objects.filter(category__event__user=user),
+        "organizer ticket sales": TicketSale.objects.filter(ticket__event__user=user),
+        # tally
+        "category leaderboard": Candidate.objects.filter(category=category).with_live_votes().order_by('-live_vote_count', 'name'),
+        # payments.views
+        "vote history page": VoteTransaction.objects.filter(candidate__event__user=user).order_by('-created_at', '-id')[:50],
+        "withdrawal history page": WithdrawalTransaction.objects.filter(user=user, is_verified=True).order_by('-created_at', '-id')[:50],
+        "webhook seen": WebhookLog.objects.filter(idempotency_key=f"paystack:charge.success:{ref}"),
+        "webhooks for instance": WebhookLog.objects.filter(instance_id=str(uuid.uuid4())),
+        # payments.task
+        "charge lookup": Transaction.objects.filter(external_payment_id=ref, gateway="paystack"),
+        "webhook queue": WebhookLog.objects.filter(processed_at__isnull=True, is_valid=True, next_attempt_at__lte=now).order_by('id')[:100],
+        "vote settlement queue": VoteTransaction.objects.filter(is_verified=False, payment__status='success').order_by('created_at')[:500],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the hot queries and flag sequential scans. "
+        "Run it against a database with production-like row counts: planners "
+        "prefer scans on tiny tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not just flagged ones.")
+        parser.add_argument("--fail-on-scan", action="store_true",
+                            help="Exit with an error if any query scans a table (for CI).")
+
+    def handle(self, *args, **options):
+        flagged = {}
+        for name, queryset in hot_queries().items():
+            plan = queryset.explain()
+            tables = sorted({a or b for line in plan.splitlines() for a, b in SEQUENTIAL_SCAN.findall(line.strip())})
+
+            if tables:
+                flagged[name] = tables
+                self.stdout.write(self.style.WARNING(f"SCAN  {name}: {', '.join(tables)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok    {name}"))
+            if tables or options["verbose_plans"]:
+                self.stdout.write(f"      {plan}".replace("\n", "\n      "))
+
+        self.stdout.write(f"\n{len(flagged)} of {len(hot_queries())} queries scan a table ({connection.vendor}).")
+        if flagged and options["fail_on_scan"]:
+            raise CommandError(f"Sequential scans in: {', '.join(flagged)}")
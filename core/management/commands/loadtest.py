@@ -0,0 +1,76 @@
+import json
+
+from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import VotingNight, parse_mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a voting-night traffic mix against a running server. Start the server with "
+        "PAYSTACK_BASE_URL pointing at the fake Paystack this command runs (see --paystack-port), "
+        "ALLOWED_PAYSTACK_IPS including 127.0.0.1 and throttling relaxed via THROTTLE_ANON_RATE. "
+        "Use `benchmark` to measure single requests in isolation instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--api-url", default="http://127.0.0.1:8000/api/v1")
+        parser.add_argument("--users", type=int, default=50, help="Concurrent simulated users.")
+        parser.add_argument("--duration", type=float, default=60, help="Seconds to generate load for.")
+        parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between a user's requests.")
+        parser.add_argument("--mix", default="", help='Action weights, e.g. "results=50,vote=20".')
+        parser.add_argument("--paystack-port", type=int, default=8765)
+        parser.add_argument("--paystack-latency", type=float, default=0.3, help="Mean fake /charge latency, seconds.")
+        parser.add_argument("--paystack-failure-rate", type=float, default=0.0, help="Share of charges answered 503.")
+        parser.add_argument("--webhook-lag", type=float, default=2.0, help="Median seconds from charge to webhook.")
+        parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Share of webhooks delivered twice.")
+        parser.add_argument("--drain-timeout", type=float, default=60,
+                            help="Seconds to wait for outstanding webhooks after the load stops.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        night = VotingNight(
+            options["api_url"], config("PAYSTACK_SECRET_KEY"),
+            users=options["users"], duration=options["duration"], think_time=options["think_time"], mix=mix,
+            webhook_lag=options["webhook_lag"], duplicate_rate=options["duplicate_rate"],
+            paystack_port=options["paystack_port"], paystack_latency=options["paystack_latency"],
+            paystack_failure_rate=options["paystack_failure_rate"],
+        )
+        self.stderr.write(f"Fake Paystack listening on {night.paystack_url}")
+        try:
+            report = night.run(drain_timeout=options["drain_timeout"])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{report['users']} users for {report['duration']}s: {report['requests']} requests, "
+            f"{report['rps']} req/s, error rate {report['error_rate']:.2%}"
+        )
+        self.stdout.write(f"\n{'action':<12} {'requests':>9} {'req/s':>8} {'errors':>8} {'p50 ms':>8} {'p99 ms':>8}  statuses")
+        for action, row in report["actions"].items():
+            line = (f"{action:<12} {row['requests']:>9} {row['rps']:>8} {row['error_rate']:>8.2%} "
+                    f"{row['p50_ms']:>8} {row['p99_ms']:>8}  {row['statuses']}")
+            self.stdout.write(self.style.WARNING(line) if row["error_rate"] else line)
+
+        self.stdout.write(
+            f"\nCharges: {report['charges']}, failed: {report['failed_charges']}, "
+            f"duplicate webhooks: {report['duplicate_webhooks']}, undelivered: {report['undelivered_webhooks']}"
+        )
+        locks = report["locks"]
+        if locks is None:
+            self.stdout.write("Lock waits: not available on this database (PostgreSQL only)")
+        else:
+            self.stdout.write(
+                f"Lock waits: peak {locks['waiting_peak']} sessions, mean {locks['waiting_mean']}, "
+                f"~{locks['lock_wait_seconds']}s blocked in total"
+            )
@@ -0,0 +1,44 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+from utils.metrics import http_request_duration, http_request_queries
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Records the latency and number of database queries of every request,
+    labelled by URL pattern (not the raw path, to keep the label set small).
+
+    For streaming responses the latency covers producing the response
+    object, not sending the stream.
+    """
+
+    def process_request(self, request):
+        request._metrics_queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            request._metrics_queries += 1
+            return execute(sql, params, many, context)
+
+        request._metrics_wrappers = ExitStack()
+        for connection in connections.all():
+            request._metrics_wrappers.enter_context(connection.execute_wrapper(count_query))
+        request._metrics_start = time.perf_counter()
+
+    def process_response(self, request, response):
+        wrappers = getattr(request, '_metrics_wrappers', None)
+        if wrappers is None:
+            return response
+        wrappers.close()
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else "unmatched"
+        http_request_duration.observe(
+            time.perf_counter() - request._metrics_start,
+            route=route, method=request.method, status=f"{response.status_code // 100}xx",
+        )
+        http_request_queries.observe(request._metrics_queries, route=route, method=request.method)
+        return response
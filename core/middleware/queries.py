@@ -0,0 +1,36 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+from utils.queries import QueryRecorder, repeated_queries
+
+logger = logging.getLogger("error")
+
+
+class NPlusOneMiddleware(MiddlewareMixin):
+    """
+    Development aid: logs a warning when a request runs the same statement
+    (by fingerprint) QUERY_REPEAT_THRESHOLD times or more, the usual sign of
+    a per-row lookup in a serializer. Only active with QUERY_DEBUG on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_DEBUG:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.threshold = settings.QUERY_REPEAT_THRESHOLD
+
+    def process_request(self, request):
+        request._query_recorder = QueryRecorder().__enter__()
+
+    def process_response(self, request, response):
+        recorder = getattr(request, '_query_recorder', None)
+        if recorder is None:
+            return response
+        recorder.__exit__(None, None, None)
+
+        for sql, count in repeated_queries(recorder.queries, self.threshold):
+            logger.warning("Possible N+1 on %s %s: %s queries like: %s", request.method, request.path, count, sql)
+        return response
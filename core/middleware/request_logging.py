@@ -1,14 +1,14 @@
 import logging
+import random
 import time
 import json
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from django.http import QueryDict
+from utils.log import REDACT_FIELDS, REDACT_HEADERS
 
 logger = logging.getLogger("request_logger")
 
-REDACT_HEADERS = {'authorization', 'cookie', 'set-cookie'}
-REDACT_FIELDS = {'password', 'token', 'secret', 'file'}
-
 def flatten_querydict(qdict):
     return {
         k: v[0] if isinstance(v, list) and len(v) == 1 else v
@@ -16,7 +16,27 @@ def flatten_querydict(qdict):
     }
 
 class RequestLoggingMiddleware(MiddlewareMixin):
+    """
+    Logs every request to the "request_logger" logger.
+
+    With REQUEST_LOG_FORMAT = "json" (structured mode) the middleware only
+    collects raw values into one dict per request; body parsing, redaction and
+    serialization happen in utils.log.JsonRequestFormatter on the log writer
+    thread. Successful GETs are sampled at REQUEST_LOG_SAMPLE_RATE; other
+    requests and all errors are always logged.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.structured = settings.REQUEST_LOG_FORMAT == "json"
+        self.sample_rate = settings.REQUEST_LOG_SAMPLE_RATE
+        self.max_body = settings.REQUEST_LOG_MAX_BODY
+
     def process_request(self, request):
+        if self.structured:
+            request._start_time = time.perf_counter()
+            return
+
         request._start_time = time.time()
         request._logged_data = {}
 
@@ -39,6 +59,10 @@ class RequestLoggingMiddleware(MiddlewareMixin):
 
     
     def process_response(self, request, response):
+        if self.structured:
+            self.log_structured(request, response)
+            return response
+
         duration = time.time() - getattr(request, '_start_time', time.time())
         user = getattr(request, 'user', None)
         ip = self.get_client_ip(request)
@@ -72,6 +96,45 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         logger.info(" | ".join(log_parts))
         return response
 
+    def should_log(self, request, response):
+        if request.method in ('GET', 'HEAD') and response.status_code < 400:
+            return self.sample_rate >= 1 or random.random() < self.sample_rate
+        return True
+
+    def raw_body(self, request):
+        """
+        The unparsed body of JSON/form requests up to REQUEST_LOG_MAX_BODY bytes;
+        None for other requests (uploads are never read for logging).
+        """
+        content_type = request.content_type or ""
+        if request.method not in ('POST', 'PUT', 'PATCH'):
+            return None
+        if 'application/json' not in content_type and 'application/x-www-form-urlencoded' not in content_type:
+            return None
+        try:
+            body = request.body
+        except Exception:  # already consumed as a stream
+            return None
+        return body[:self.max_body]
+
+    def log_structured(self, request, response):
+        if not self.should_log(request, response):
+            return
+
+        started = getattr(request, '_start_time', None)
+        user = getattr(request, 'user', None)
+        logger.info("%s %s", request.method, request.path, extra={"request": {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1) if started else None,
+            "user_id": user.pk if user is not None and user.is_authenticated else None,
+            "ip": self.get_client_ip(request),
+            "headers": dict(request.headers),
+            "content_type": request.content_type or "",
+            "body": self.raw_body(request),
+        }})
+
     def get_client_ip(self, request):
         x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
         return x_forwarded_for.split(',')[0] if x_forwarded_for else request.META.get("REMOTE_ADDR")
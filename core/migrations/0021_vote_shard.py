@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_rename_customer_name_ticketsale_recipient_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_shards', to='core.candidate')),
+            ],
+            options={
+                'unique_together': {('candidate', 'shard')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_vote_shard'),
+        ('payments', '0014_webhooklog_settlement_queue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='votetransaction',
+            index=models.Index(fields=['created_at', 'id'], name='vote_tx_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votetransaction',
+            index=models.Index(fields=['candidate', 'created_at', 'id'], name='vote_tx_candidate_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawaltransaction',
+            index=models.Index(condition=models.Q(('is_verified', True)), fields=['user', 'created_at', 'id'], name='withdrawal_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_history_indexes'),
+        ('payments', '0015_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(condition=models.Q(('is_blocked', False)), fields=['event', 'category'], name='candidate_listed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_blocked', False)), fields=['user'], name='event_user_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketsale',
+            index=models.Index(fields=['ticket', 'created_at', 'id'], name='ticket_sale_ticket_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votetransaction',
+            index=models.Index(condition=models.Q(('is_verified', False)), fields=['created_at'], name='vote_tx_unverified_idx'),
+        ),
+    ]
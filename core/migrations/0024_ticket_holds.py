@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+def backfill_ticket_sales(apps, schema_editor):
+    # Sales made before holds existed never touched Ticket.sold: mark the paid
+    # ones sold and count them, and release the rest (they hold no stock).
+    Ticket = apps.get_model('core', 'Ticket')
+    TicketSale = apps.get_model('core', 'TicketSale')
+    TicketSale.objects.filter(payment__status='success').update(status='sold')
+    TicketSale.objects.exclude(status='sold').update(status='released')
+    sold = TicketSale.objects.filter(status='sold').values('ticket_id').annotate(n=models.Count('id'))
+    for row in sold:
+        Ticket.objects.filter(pk=row['ticket_id']).update(sold=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_hot_lookup_indexes'),
+        ('payments', '0015_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='held',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticketsale',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticketsale',
+            name='status',
+            field=models.CharField(choices=[('held', 'Held'), ('sold', 'Sold'), ('released', 'Released')], default='held', max_length=10),
+        ),
+        migrations.RunPython(backfill_ticket_sales, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticketsale',
+            index=models.Index(condition=models.Q(('status', 'held')), fields=['hold_expires_at'], name='ticket_sale_hold_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_ticket_holds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='waiting_room',
+            field=models.BooleanField(default=False),
+        ),
+    ]
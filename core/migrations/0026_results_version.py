@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_versions(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    ResultsVersion = apps.get_model('core', 'ResultsVersion')
+    ResultsVersion.objects.bulk_create(
+        [ResultsVersion(event_id=pk) for pk in Event.objects.values_list('pk', flat=True)], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_ticket_waiting_room'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultsVersion',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='results_version', serialize=False, to='core.event')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
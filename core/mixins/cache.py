@@ -0,0 +1,86 @@
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.response import Response
+
+from core.mixins.replica import ReplicaReadMixin
+
+
+def _version_key(scope):
+    return f"public:version:{scope}"
+
+
+def get_cache_version(scope):
+    """
+    Returns the current generation of a cache scope, starting a new one if
+    there is none (never set, invalidated or evicted).
+    """
+    version = cache.get(_version_key(scope))
+    if version is None:
+        cache.add(_version_key(scope), time.time_ns(), None)
+        version = cache.get(_version_key(scope))
+    return version
+
+
+def invalidate_cache_scopes(*scopes):
+    """
+    Start a new generation for each scope. Entries cached under the old one
+    are never read again and expire on their own.
+    """
+    cache.delete_many([_version_key(scope) for scope in scopes])
+
+
+class CachedListMixin:
+    """
+    A ListAPIView mixin that serves the serialized list from the cache.
+
+    Entries are keyed by view, URL kwargs and query string under the
+    generation of the view's `cache_scope`, so bumping the scope (see
+    core.signals) invalidates every page of it at once. `cache_scope` is
+    required; it is formatted with the URL kwargs and query parameters
+    (missing ones format as empty).
+
+    Usage:
+        class MyListView(CachedListMixin, StandardResponseView, generics.ListAPIView):
+            cache_scope = "event:{shortcode}"
+            cache_ttl_setting = 'PUBLIC_VOTES_CACHE_TTL'
+
+    Notes:
+        - Only cache views whose response is the same for every caller.
+        - Changes made with `QuerySet.update()` (e.g. vote counts) send no
+          signals; views showing them should use a short TTL.
+        - Misses are refilled from the primary: a refill from a lagging
+          replica right after an invalidation would cache the stale rows for
+          the whole TTL, so combining this with ReplicaReadMixin is refused.
+    """
+    cache_scope = None
+    cache_ttl_setting = 'PUBLIC_CACHE_TTL'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls.cache_scope:
+            raise ImproperlyConfigured(f"{cls.__name__} must set cache_scope")
+        if issubclass(cls, ReplicaReadMixin):
+            raise ImproperlyConfigured(f"{cls.__name__} must not read from a replica; cache refills use the primary")
+
+    def get_cache_scope(self):
+        params = defaultdict(str, self.request.query_params.dict())
+        params.update(self.kwargs)
+        return self.cache_scope.format_map(params)
+
+    def get_cache_key(self):
+        scope = self.get_cache_scope()
+        kwargs = ":".join(f"{k}={v}" for k, v in sorted(self.kwargs.items()))
+        query = self.request.GET.urlencode()
+        return f"public:{self.__class__.__name__}:{scope}:{get_cache_version(scope)}:{kwargs}:{query}"
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_cache_key()
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, getattr(settings, self.cache_ttl_setting))
+        return Response(data)
@@ -0,0 +1,18 @@
+from utils.db import read_from_replica
+
+
+class ReplicaReadMixin:
+    """
+    A view mixin that serves safe requests (GET, HEAD, OPTIONS) from a read
+    replica (see utils.db.ReplicaRouter).
+
+    Only use it on public views that never write and whose responses may lag
+    the primary by the replication delay, and not on cached views (see
+    CachedListMixin).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            with read_from_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
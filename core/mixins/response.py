@@ -1,3 +1,4 @@
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
@@ -14,6 +15,9 @@ class StandardResponseView(APIView):
         return getattr(self, "success_message", self.default_success_messages.get(request.method, "Success"))
 
     def finalize_response(self, request, response, *args, **kwargs):
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:  # must not have a body
+            return super().finalize_response(request, response, *args, **kwargs)
+
         if isinstance(response.data, dict) and {"status", "message", "data"} <= response.data.keys():
             return super().finalize_response(request, response, *args, **kwargs)
 
@@ -65,3 +65,33 @@ class RestrictUpdateFieldsMixin:
 
         instance.save()
         return instance
+
+
+class AnnotatedStatsMixin:
+    """
+    A serializer mixin for fields backed by a queryset's `with_stats()` annotations.
+
+    Instances that did not come from an annotated queryset (e.g. right after
+    create) have their stats loaded with one extra query the first time a
+    stat is read.
+
+    Usage:
+        class MySerializer(AnnotatedStatsMixin, serializers.ModelSerializer):
+            stats_fields = ('total_votes', 'total_candidates')
+
+            def get_total_votes(self, obj):
+                return self.get_stat(obj, 'total_votes')
+    """
+    stats_fields = ()
+
+    def get_stat(self, obj, name):
+        if not hasattr(obj, name):
+            stats = (
+                type(obj).objects.with_stats()
+                .filter(pk=obj.pk)
+                .values(*self.stats_fields)
+                .first()
+            ) or {}
+            for field in self.stats_fields:
+                setattr(obj, field, stats.get(field, 0))
+        return getattr(obj, name)
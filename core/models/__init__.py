@@ -4,10 +4,12 @@ from django.db import models
 from .user import User
 from .event import Event
 from .candidate import Candidate
+from .vote_counter import ResultsVersion, VoteShard
 from .category import Category
 from .audit_log import AuditLog
 from .otp import OTP
 # from .vote import VoteTransaction
 from .ticket import Ticket
 from .ticket import TicketSale
+from .withdrawal import WithdrawalTransaction
 from .audit_log import AuditLog
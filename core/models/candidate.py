@@ -1,7 +1,22 @@
 from django.db import models
+from django.db.models import F, OuterRef, Sum
 from .event import Event
 from .category import Category 
-from .common import TimeStampedModel
+from .common import TimeStampedModel, aggregate_subquery
+from .vote_counter import VoteShard
+
+
+class CandidateQuerySet(models.QuerySet):
+    def with_live_votes(self):
+        """
+        Annotate `live_vote_count`: the compacted `vote_count` plus any votes
+        still sitting in vote shards waiting for the next flush.
+        """
+        pending = aggregate_subquery(
+            VoteShard.objects.filter(candidate=OuterRef('pk')), 'candidate', Sum('votes')
+        )
+        return self.annotate(live_vote_count=F('vote_count') + pending)
+
 
 class Candidate(TimeStampedModel):
     GENDER_CHOICES = [('male', 'Male'), ('female', 'Female'), ('other', 'Other')]
@@ -17,8 +32,14 @@ class Candidate(TimeStampedModel):
     vote_count = models.PositiveIntegerField(default=0)
     is_blocked = models.BooleanField(default=False)
 
+    objects = CandidateQuerySet.as_manager()
+
     class Meta:
         unique_together = ("event", "name", "category")
+        indexes = [
+            # Public candidate listing: event + category, unblocked only
+            models.Index(fields=['event', 'category'], condition=models.Q(is_blocked=False), name='candidate_listed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.event.shortcode})"
@@ -1,6 +1,27 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Sum
 from .user import User
-from .common import TimeStampedModel
+from .common import TimeStampedModel, aggregate_subquery
+
+
+class CategoryQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Annotate `total_candidates` and `total_votes` (including votes pending in
+        vote shards) in the same query.
+        """
+        from .candidate import Candidate
+        from .vote_counter import VoteShard
+
+        candidates = Candidate.objects.filter(category=OuterRef('pk'))
+        shards = VoteShard.objects.filter(candidate__category=OuterRef('pk'))
+        return self.annotate(
+            total_candidates=aggregate_subquery(candidates, 'category', Count('pk')),
+            total_votes=(
+                aggregate_subquery(candidates, 'category', Sum('vote_count'))
+                + aggregate_subquery(shards, 'candidate__category', Sum('votes'))
+            ),
+        )
 
 
 class Category(TimeStampedModel):
@@ -9,6 +30,8 @@ class Category(TimeStampedModel):
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         unique_together = ("event", "name")
 
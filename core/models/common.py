@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 class TimeStampedModel(models.Model):
@@ -7,3 +9,14 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+def aggregate_subquery(queryset, group_by, expression):
+    """
+    Wrap an aggregate over `queryset`, grouped on `group_by`, as a scalar
+    subquery that evaluates to 0 when there are no rows.
+    """
+    return Coalesce(
+        Subquery(queryset.values(group_by).annotate(value=expression).values('value')),
+        0,
+    )
@@ -1,11 +1,36 @@
 import shortuuid
 from django.db import models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, OuterRef, Sum
 from .user import User
-from .common import TimeStampedModel
+from .common import TimeStampedModel, aggregate_subquery
 
 def generate_shortcode():
     return shortuuid.ShortUUID().random(length=8)
 
+class EventQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Annotate `total_candidates`, `total_votes` and `revenue` in the same query,
+        counting candidates through the event's categories. Votes include those
+        still pending in vote shards.
+        """
+        from .candidate import Candidate
+        from .vote_counter import VoteShard
+
+        candidates = Candidate.objects.filter(category__event=OuterRef('pk'))
+        shards = VoteShard.objects.filter(candidate__category__event=OuterRef('pk'))
+        return self.annotate(
+            total_candidates=aggregate_subquery(candidates, 'category__event', Count('pk')),
+            total_votes=(
+                aggregate_subquery(candidates, 'category__event', Sum('vote_count'))
+                + aggregate_subquery(shards, 'candidate__category__event', Sum('votes'))
+            ),
+            revenue=ExpressionWrapper(
+                F('total_votes') * F('amount_per_vote'),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+
 class Event(TimeStampedModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='events')
     name = models.CharField(max_length=255)
@@ -19,5 +44,13 @@ class Event(TimeStampedModel):
     is_active = models.BooleanField(default=True) # Indicates if the event is currently active
     is_blocked = models.BooleanField(default=False) # Indicates if the event is blocked or not by developer
 
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Organizer dashboard: the user's live events
+            models.Index(fields=['user'], condition=models.Q(is_active=True, is_blocked=False), name='event_user_live_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.shortcode})"
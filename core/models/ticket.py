@@ -1,9 +1,31 @@
 import uuid
-from django.db import models
+from collections import Counter
+from django.db import models, transaction
+from django.db.models import F, Q
 from core.models.event import Event
 from core.models.common import TimeStampedModel
 from payments.models.transaction import Transaction
 
+
+class TicketQuerySet(models.QuerySet):
+    def available(self):
+        """
+        Active tickets with stock that is neither sold nor held.
+        """
+        return self.filter(is_active=True, quantity__gt=F('sold') + F('held'))
+
+    def reserve(self, ticket_id, field='held'):
+        """
+        Take one unit of stock for `ticket_id` into `field` ('held' or 'sold')
+        with a single conditional UPDATE, so concurrent buyers never oversell
+        and the row is only locked for that one statement.
+
+        Returns:
+            bool: False if the ticket is sold out (or inactive).
+        """
+        return self.available().filter(pk=ticket_id).update(**{field: F(field) + 1}) == 1
+
+
 class Ticket(TimeStampedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
@@ -11,19 +33,90 @@ class Ticket(TimeStampedModel):
     type = models.CharField(max_length=100)
     quantity = models.PositiveIntegerField()
     sold = models.PositiveIntegerField(default=0)
+    held = models.PositiveIntegerField(default=0) # reserved by buyers who have not paid yet
+    waiting_room = models.BooleanField(default=False) # buyers queue for admission (see payments.waiting_room)
     desc = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
 
+    objects = TicketQuerySet.as_manager()
+
     def __str__(self):
         return f"Ticket: {self.id[:5]} - {self.type} votes"
 
+class TicketSaleQuerySet(models.QuerySet):
+    def expired_holds(self, now):
+        return self.filter(status=TicketSale.HELD, hold_expires_at__lte=now)
+
+    def release(self):
+        """
+        Give the stock held by these sales back to their tickets. Sales that
+        are being settled right now are skipped.
+
+        Returns:
+            int: The number of holds released.
+        """
+        with transaction.atomic():
+            held = list(
+                self.select_for_update(skip_locked=True).filter(status=TicketSale.HELD).values_list('id', 'ticket_id')
+            )
+            if not held:
+                return 0
+            TicketSale.objects.filter(id__in=[sale_id for sale_id, _ in held], status=TicketSale.HELD).update(
+                status=TicketSale.RELEASED, hold_expires_at=None,
+            )
+            # One UPDATE per ticket type, in a fixed order so concurrent sweepers cannot deadlock
+            for ticket_id, count in sorted(Counter(ticket_id for _, ticket_id in held).items()):
+                Ticket.objects.filter(pk=ticket_id).update(held=F('held') - count)
+        return len(held)
+
+
 class TicketSale(TimeStampedModel):
+    """
+    One ticket bought for a recipient. Initiation takes a hold on the stock
+    that expires after TICKET_HOLD_SECONDS; a successful payment turns it
+    into a sale, and the `process_webhooks` worker releases expired holds.
+    """
+    HELD, SOLD, RELEASED = 'held', 'sold', 'released'
+    STATUS_CHOICES = [(HELD, 'Held'), (SOLD, 'Sold'), (RELEASED, 'Released')]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE)
     payment = models.ForeignKey(Transaction, on_delete=models.CASCADE)
     recipient_name = models.CharField(max_length=255)
     recipient_contact = models.CharField(max_length=15)
     recipient_email = models.EmailField(max_length=255, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=HELD)
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TicketSaleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'created_at', 'id'], name='ticket_sale_ticket_created_idx'),
+            # Sweeper: holds by expiry; only live holds are indexed
+            models.Index(fields=['hold_expires_at'], condition=Q(status='held'), name='ticket_sale_hold_idx'),
+        ]
+
+    def confirm(self):
+        """
+        Turn this sale's hold into a sold ticket once it is paid. If the
+        hold already expired, the ticket is sold only if stock remains.
+        Call with the sale locked (select_for_update).
+
+        Returns:
+            bool: True if this call sold the ticket.
+        """
+        if self.status == self.SOLD:
+            return False
+        if self.status == self.HELD:
+            Ticket.objects.filter(pk=self.ticket_id).update(held=F('held') - 1, sold=F('sold') + 1)
+        elif not Ticket.objects.reserve(self.ticket_id, field='sold'):
+            return False
+
+        self.status = self.SOLD
+        self.hold_expires_at = None
+        self.save(update_fields=['status', 'hold_expires_at', 'updated_at'])
+        return True
 
     def __str__(self):
         return f"Ticket Sale: {self.payment_reference} - {self.amount} amount"
\ No newline at end of file
@@ -12,5 +12,14 @@ class VoteTransaction(TimeStampedModel):
     payment = models.ForeignKey(Transaction, on_delete=models.CASCADE)
     is_verified = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the organizer's vote history (see utils.pagination)
+            models.Index(fields=['created_at', 'id'], name='vote_tx_created_idx'),
+            models.Index(fields=['candidate', 'created_at', 'id'], name='vote_tx_candidate_created_idx'),
+            # Batch settlement queue (payments.task.settle_vote_batch); verified rows drop out
+            models.Index(fields=['created_at'], condition=models.Q(is_verified=False), name='vote_tx_unverified_idx'),
+        ]
+
     def __str__(self):
         return f"Tx: {self.candidate.name} - {self.vote_count} votes"
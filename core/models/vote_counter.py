@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class VoteShard(models.Model):
+    """
+    One of N counter rows per candidate that absorb vote increments.
+
+    Spreading increments over several rows keeps a burst of votes for a single
+    candidate from queuing on the candidate row lock. The compactor in
+    `tally.counters.flush_vote_shards` periodically folds shard totals back
+    into `Candidate.vote_count`.
+    """
+    candidate = models.ForeignKey('core.Candidate', on_delete=models.CASCADE, related_name='vote_shards')
+    shard = models.PositiveSmallIntegerField()
+    votes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("candidate", "shard")
+
+    def __str__(self):
+        return f"Shard {self.shard} of candidate {self.candidate_id}: {self.votes} votes"
+
+
+class ResultsVersion(models.Model):
+    """
+    Per-event counter bumped whenever the event's results can change, in the
+    same transaction as the change (see tally.versioning). It lives in the
+    database rather than the cache so every process, including the settlement
+    worker, sees the same version.
+    """
+    event = models.OneToOneField('core.Event', on_delete=models.CASCADE, primary_key=True, related_name='results_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Results version {self.version} of event {self.event_id}"
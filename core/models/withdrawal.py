@@ -14,3 +14,13 @@ class WithdrawalTransaction(TimeStampedModel):
     transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='withdrawals')
     otp = models.ForeignKey('core.OTP', on_delete=models.CASCADE, related_name='withdrawals')
     is_verified = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the organizer's withdrawal history (see utils.pagination)
+            models.Index(
+                fields=['user', 'created_at', 'id'],
+                condition=models.Q(is_verified=True),
+                name='withdrawal_user_created_idx',
+            ),
+        ]
@@ -1,4 +1,4 @@
-from core.mixins.serializer import RestrictUpdateFieldsMixin
+from core.mixins.serializer import AnnotatedStatsMixin, RestrictUpdateFieldsMixin
 from core.models.ticket import Ticket, TicketSale
 from rest_framework import serializers
 from .models.user import User
@@ -14,13 +14,25 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'email', 'organization_name', 'is_verified', 'first_name', 'last_name', 'is_active', 'is_staff', 'balance'] #'transfer_allowed', 'transfer_limit',
 
+def live_vote_count(candidate):
+    """
+    The candidate's exact vote count, including votes not yet flushed from
+    vote shards, when the queryset was annotated with `with_live_votes()`.
+    """
+    return getattr(candidate, 'live_vote_count', candidate.vote_count)
+
 class CandidateSerializer(serializers.ModelSerializer):
+    vote_count = serializers.SerializerMethodField()
     revenue = serializers.SerializerMethodField()
+
+    def get_vote_count(self, obj):
+        return live_vote_count(obj)
+
     def get_revenue(self, obj):
         """
         Returns the revenue generated by the candidate based on the votes received.
         """
-        return obj.vote_count * obj.event.amount_per_vote if obj.event else 0
+        return live_vote_count(obj) * obj.event.amount_per_vote if obj.event else 0
     
     class Meta:
         model = Candidate
@@ -28,6 +40,10 @@ class CandidateSerializer(serializers.ModelSerializer):
         read_only_fields = ['vote_count']
 
 class PublicCandidateSerializer(serializers.ModelSerializer):
+    vote_count = serializers.SerializerMethodField()
+
+    def get_vote_count(self, obj):
+        return live_vote_count(obj)
     
     class Meta:
         model = Candidate
@@ -36,21 +52,22 @@ class PublicCandidateSerializer(serializers.ModelSerializer):
 
 # Category Serializer
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(AnnotatedStatsMixin, serializers.ModelSerializer):
     total_votes = serializers.SerializerMethodField()
     total_candidates = serializers.SerializerMethodField()
+    stats_fields = ('total_votes', 'total_candidates')
     
     def get_total_votes(self, obj):
         """
         Returns the total number of votes for all candidates in the category.
         """
-        return sum(candidate.vote_count for candidate in obj.candidates.all())
+        return self.get_stat(obj, 'total_votes')
 
     def get_total_candidates(self, obj):
         """
         Returns the total number of candidates in the category.
         """
-        return obj.candidates.count()
+        return self.get_stat(obj, 'total_candidates')
     
 
     class Meta:
@@ -67,21 +84,46 @@ class CategorySerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class PublicCategorySerializer(serializers.ModelSerializer):
+
+# Bulk import rows (see core.bulk_import). Parents are plain ids here: the
+# importer checks ownership and uniqueness for all rows at once instead of
+# loading them row by row.
+
+class CategoryImportSerializer(serializers.ModelSerializer):
+    event = serializers.IntegerField(source='event_id')
+
+    class Meta:
+        model = Category
+        fields = ["event", "name", "description", "is_active"]
+        validators = []
+
+
+class CandidateImportSerializer(serializers.ModelSerializer):
+    event = serializers.IntegerField(source='event_id', required=False)
+    category = serializers.IntegerField(source='category_id')
+    achivements = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta:
+        model = Candidate
+        fields = ['event', 'category', 'name', 'gender', 'description', 'extra_info', 'achivements', 'is_blocked']
+        validators = []
+
+class PublicCategorySerializer(AnnotatedStatsMixin, serializers.ModelSerializer):
     total_votes = serializers.SerializerMethodField()
     total_candidates = serializers.SerializerMethodField()
+    stats_fields = ('total_votes', 'total_candidates')
     
     def get_total_votes(self, obj):
         """
         Returns the total number of votes for all candidates in the category.
         """
-        return sum(candidate.vote_count for candidate in obj.candidates.all())
+        return self.get_stat(obj, 'total_votes')
 
     def get_total_candidates(self, obj):
         """
         Returns the total number of candidates in the category.
         """
-        return obj.candidates.count()
+        return self.get_stat(obj, 'total_candidates')
 
     class Meta:
         model = Category
@@ -90,22 +132,23 @@ class PublicCategorySerializer(serializers.ModelSerializer):
 
 #Event Serializer
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(AnnotatedStatsMixin, serializers.ModelSerializer):
     total_votes = serializers.SerializerMethodField()
     revenue = serializers.SerializerMethodField()
     total_candidates = serializers.SerializerMethodField()
+    stats_fields = ('total_votes', 'revenue', 'total_candidates')
 
     def get_total_votes(self, obj):
-        return sum(candidate.vote_count for category in obj.categories.all() for candidate in category.candidates.all())
+        return self.get_stat(obj, 'total_votes')
     
     def get_revenue(self, obj):
-        return obj.amount_per_vote * self.get_total_votes(obj)
+        return self.get_stat(obj, 'revenue')
     
     def get_total_candidates(self, obj):
         """
         Returns the total number of candidates across all categories in the event.
         """
-        return sum(category.candidates.count() for category in obj.categories.all())
+        return self.get_stat(obj, 'total_candidates')
     
 
     class Meta:
@@ -123,6 +166,8 @@ class PublicEventSerializer(serializers.ModelSerializer):
         """
         Returns the number of categories associated with the event.
         """
+        if hasattr(obj, 'category_count'):  # annotated by PublicEventListView
+            return obj.category_count
         return obj.categories.count()
 
     class Meta:
@@ -136,15 +181,15 @@ class PublicEventSerializer(serializers.ModelSerializer):
 class TicketSerializer( RestrictUpdateFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Ticket
-        fields = ['id', 'event', 'price', 'type', 'quantity', 'sold', 'desc', 'is_active', 'created_at']
-        read_only_fields = ['id', 'sold', 'created_at']
-        updatable_fields = ['price', 'type', 'quantity', 'desc', 'is_active']
+        fields = ['id', 'event', 'price', 'type', 'quantity', 'sold', 'held', 'desc', 'is_active', 'waiting_room', 'created_at']
+        read_only_fields = ['id', 'sold', 'held', 'created_at']
+        updatable_fields = ['price', 'type', 'quantity', 'desc', 'is_active', 'waiting_room']
 
 class PublicTicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
-        exclude = ['sold', 'updated_at']
-        read_only_fields = ['id', 'event', 'price', 'type', 'quantity', 'desc', 'is_active', 'created_at']
+        exclude = ['sold', 'held', 'updated_at']
+        read_only_fields = ['id', 'event', 'price', 'type', 'quantity', 'desc', 'is_active', 'waiting_room', 'created_at']
         
 class TicketSaleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,28 @@
+"""
+Invalidate cached public listings when organizers change events, categories
+or candidates.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.mixins.cache import invalidate_cache_scopes
+from core.models import Candidate, Category, Event
+
+
+def _invalidate_event(shortcode):
+    # After commit, so a concurrent request can't re-cache the old rows
+    transaction.on_commit(lambda: invalidate_cache_scopes("events", f"event:{shortcode}"))
+
+
+@receiver([post_save, post_delete], sender=Event)
+def event_changed(sender, instance, **kwargs):
+    _invalidate_event(instance.shortcode)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Candidate)
+def event_child_changed(sender, instance, **kwargs):
+    shortcode = Event.objects.filter(pk=instance.event_id).values_list('shortcode', flat=True).first()
+    if shortcode:
+        _invalidate_event(shortcode)
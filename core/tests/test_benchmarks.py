@@ -0,0 +1,55 @@
+import os
+import pytest
+from django.core.cache import cache
+from core.benchmarks import SCENARIOS, compare, load_baseline, percentile, run_benchmarks, save_baseline, seed
+from core.models import Candidate
+from payments.models import WebhookLog
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def test_percentile_is_nearest_rank():
+    samples = list(range(1, 101))
+    assert (percentile(samples, 50), percentile(samples, 99), percentile([7], 99)) == (50, 99, 7)
+
+
+def test_compare_flags_slower_or_chattier_scenarios():
+    baseline = {"a": {"p50_ms": 10, "queries": 3}, "b": {"p50_ms": 10, "queries": 3}}
+    results = {
+        "a": {"p50_ms": 12, "queries": 3},
+        "b": {"p50_ms": 14, "queries": 4},
+        "new": {"p50_ms": 99, "queries": 9},
+    }
+    assert compare(results, baseline, tolerance=0.25) == {"b": ["p50 10ms -> 14ms", "queries 3 -> 4"]}
+
+
+def test_baseline_round_trip(tmp_path):
+    path = str(tmp_path / "benchmarks" / "baseline.json")
+    assert load_baseline(path) == {}
+    save_baseline(path, {"a": {"p50_ms": 1}}, vendor="sqlite")
+    assert load_baseline(path) == {"a": {"p50_ms": 1}}
+
+
+@pytest.mark.django_db
+def test_smoke_run_covers_every_scenario():
+    world = seed(categories=2, candidates=3, transactions=20)
+    assert sum(Candidate.objects.values_list("vote_count", flat=True)) > 0
+
+    results = run_benchmarks(world, iterations=3, warmup=1)
+
+    assert set(results) == set(SCENARIOS)
+    assert all(result["rps"] > 0 and result["p99_ms"] >= result["p50_ms"] for result in results.values())
+    assert results["event_results_not_modified"]["queries"] == 1  # the results version lookup
+    assert WebhookLog.objects.filter(is_valid=True).count() == 4
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run the full benchmark")
+@pytest.mark.django_db
+def test_full_benchmark(capsys):
+    results = run_benchmarks(seed(), iterations=200, warmup=20)
+    with capsys.disabled():
+        for name, result in results.items():
+            print(f"\n{name:<28} {result}")
@@ -0,0 +1,154 @@
+import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import User, Event, Category, Candidate
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def make_event(user, name="Pageant"):
+    return Event.objects.create(
+        user=user, name=name, host="Org", amount_per_vote=1.00,
+        start_time=timezone.now(), end_time=timezone.now() + timedelta(days=1), is_active=True,
+    )
+
+
+@pytest.fixture
+def organizer(db):
+    return User.objects.create_user(email="import@example.com", password="password123", organization_name="ImportOrg")
+
+
+@pytest.fixture
+def api(organizer):
+    client = APIClient()
+    client.force_authenticate(organizer)
+    return client
+
+
+@pytest.fixture
+def event(organizer):
+    return make_event(organizer)
+
+
+@pytest.fixture
+def category(event):
+    return Category.objects.create(event=event, name="Miss Campus")
+
+
+@pytest.fixture
+def stranger_category(db):
+    user = User.objects.create_user(email="other@example.com", password="password123", organization_name="OtherOrg")
+    return Category.objects.create(event=make_event(user, "Other Awards"), name="Best Dressed")
+
+
+def import_candidates(api, rows):
+    return api.post(reverse("core:organizer-candidates-bulk-import"), rows, format="json")
+
+
+@pytest.mark.django_db
+class TestCategoryImport:
+    def test_creates_categories(self, api, event):
+        rows = [{"event": event.id, "name": f"Category {i}"} for i in range(3)]
+        response = api.post(reverse("core:organizer-categories-bulk-import"), rows, format="json")
+
+        assert response.status_code == 201
+        data = response.json()["data"]
+        assert data["created"] == 3
+        assert sorted(event.categories.values_list("id", flat=True)) == sorted(data["ids"])
+
+    def test_reports_every_bad_row(self, api, event, category, stranger_category):
+        rows = [
+            {"event": event.id, "name": "Best Group"},
+            {"event": event.id, "name": category.name},
+            {"event": stranger_category.event_id, "name": "Sneaky"},
+            {"event": event.id, "name": "Best Group"},
+            {"name": "No event"},
+        ]
+        response = api.post(reverse("core:organizer-categories-bulk-import"), rows, format="json")
+
+        assert response.status_code == 400
+        errors = response.json()["data"]["errors"]
+        assert [(e["row"], list(e["errors"])) for e in errors] == [(2, ["name"]), (3, ["event"]), (4, ["name"]), (5, ["event"])]
+        assert Category.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestCandidateImport:
+    def test_runs_a_fixed_number_of_queries(self, api, category, settings, query_budget):
+        settings.BULK_IMPORT_BATCH_SIZE = 50
+        rows = [{"category": category.id, "name": f"Nominee {i}", "gender": "female"} for i in range(300)]
+
+        # ownership + collisions, then 6 INSERTs inside a savepoint
+        with query_budget(10, max_repeats=7):
+            response = import_candidates(api, rows)
+
+        assert response.json()["data"]["created"] == 300
+        assert set(category.candidates.values_list("event_id", flat=True)) == {category.event_id}
+
+    def test_csv_upload(self, api, category):
+        csv = (
+            "category,name,gender,description\n"
+            f"{category.id},Ama,female,Level 300\n"
+            f"{category.id},Kofi,male,\n"
+        )
+        upload = SimpleUploadedFile("nominees.csv", csv.encode(), content_type="text/csv")
+        response = api.post(reverse("core:organizer-candidates-bulk-import"), {"file": upload}, format="multipart")
+
+        assert response.status_code == 201
+        assert dict(category.candidates.values_list("name", "description")) == {"Ama": "Level 300", "Kofi": ""}
+
+    def test_rejects_unreadable_and_oversized_files(self, api, category, settings):
+        url = reverse("core:organizer-categories-bulk-import")
+        huge_field = f'event,name\n{category.event_id},"{"x" * 200000}"\n'
+        upload = SimpleUploadedFile("categories.csv", huge_field.encode(), content_type="text/csv")
+        assert api.post(url, {"file": upload}, format="multipart").status_code == 400
+
+        settings.BULK_IMPORT_MAX_UPLOAD_BYTES = 10
+        upload = SimpleUploadedFile("categories.csv", f"event,name\n{category.event_id},Best Group\n".encode(), content_type="text/csv")
+        assert api.post(url, {"file": upload}, format="multipart").status_code == 400
+        assert Category.objects.count() == 1
+
+    def test_reports_every_bad_row(self, api, event, category, stranger_category):
+        Candidate.objects.create(event=event, category=category, name="Ama", gender="female")
+        other_event = make_event(event.user, "Other")
+        rows = [
+            {"category": category.id, "name": "Esi", "gender": "female"},
+            {"category": category.id, "name": "Ama", "gender": "female"},
+            {"category": stranger_category.id, "name": "Yaw", "gender": "male"},
+            {"category": category.id, "event": other_event.id, "name": "Kwame", "gender": "male"},
+            {"category": category.id, "name": "Esi", "gender": "female"},
+            {"category": category.id, "name": "Abena", "gender": "unknown"},
+        ]
+        response = import_candidates(api, rows)
+
+        assert response.status_code == 400
+        errors = response.json()["data"]["errors"]
+        assert [(e["row"], list(e["errors"])) for e in errors] == [
+            (2, ["name"]), (3, ["category"]), (4, ["event"]), (5, ["name"]), (6, ["gender"]),
+        ]
+        assert Candidate.objects.count() == 1
+
+    def test_invalidates_public_listings(self, api, client, category, django_capture_on_commit_callbacks):
+        url = reverse("core:public-candidates")
+        params = {"eventcode": category.event.shortcode, "category": category.id}
+        assert client.get(url, params).json()["data"] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            import_candidates(api, [{"category": category.id, "name": "Kojo", "gender": "male"}])
+
+        assert [c["name"] for c in client.get(url, params).json()["data"]] == ["Kojo"]
+
+    def test_rejects_empty_and_oversized_imports(self, api, category, settings):
+        settings.BULK_IMPORT_MAX_ROWS = 2
+        row = {"category": category.id, "name": "Kojo", "gender": "male"}
+
+        assert import_candidates(api, []).status_code == 400
+        assert import_candidates(api, {"rows": [row]}).status_code == 400
+        assert import_candidates(api, [row] * 3).status_code == 400
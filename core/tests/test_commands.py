@@ -0,0 +1,23 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from core.management.commands.explain_hot_queries import SEQUENTIAL_SCAN
+
+
+@pytest.mark.parametrize("line, table", [
+    ("Seq Scan on core_candidate  (cost=0.00..35.50 rows=10 width=4)", "core_candidate"),
+    ("`--SCAN payments_webhooklog", "payments_webhooklog"),
+    ("SCAN core_event USING INDEX event_user_live_idx", None),
+    ("SEARCH core_event USING INDEX sqlite_autoindex_core_event_1 (shortcode=?)", None),
+    ("Index Scan using core_event_pkey on core_event", None),
+])
+def test_sequential_scan_detection(line, table):
+    found = [a or b for a, b in SEQUENTIAL_SCAN.findall(line)]
+    assert found == ([table] if table else [])
+
+
+@pytest.mark.django_db
+def test_hot_queries_use_indexes():
+    out = StringIO()
+    call_command("explain_hot_queries", "--fail-on-scan", stdout=out)
+    assert "0 of" in out.getvalue()
@@ -0,0 +1,72 @@
+import pytest
+from unittest import mock
+from django.core.management import call_command
+from django.core.servers.basehttp import WSGIServer
+from pytest_django.live_server_helper import LiveServer
+from rest_framework.throttling import SimpleRateThrottle
+from core.benchmarks import seed
+from core.loadtest import DEFAULT_MIX, VotingNight, parse_mix
+from payments.models import Transaction, WebhookLog
+from payments.views import PAYSTACK_SECRET_KEY
+from services.gateway import get_client
+
+
+def test_parse_mix_overrides_defaults():
+    assert parse_mix("results=50, vote=0") == {**DEFAULT_MIX, "results": 50, "vote": 0}
+    with pytest.raises(ValueError):
+        parse_mix("refunds=5")
+
+
+class SerialWSGIServer(WSGIServer):
+    # Requests run on the live server thread itself, which already uses the
+    # shared connections
+    def __init__(self, *args, connections_override=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+
+@pytest.fixture
+def serial_live_server(transactional_db):
+    """
+    A live server that handles one request at a time. The in-memory SQLite
+    test database is a single connection shared with the server thread, so
+    concurrent requests would fail with "table is locked" rather than
+    queue up as they do on PostgreSQL.
+    """
+    server = LiveServer("localhost", start=False)
+    server.thread.server_class = SerialWSGIServer
+    server._live_server_modified_settings.enable()
+    server.start()
+    yield server
+    server.stop()
+    server._live_server_modified_settings.disable()
+
+
+@pytest.fixture
+def night(serial_live_server, settings):
+    night = VotingNight(
+        f"{serial_live_server.url}/api/v1", PAYSTACK_SECRET_KEY, users=3, duration=1, think_time=0.01,
+        mix={"results": 1, "candidates": 1, "vote": 2}, webhook_lag=0.05, duplicate_rate=0.5,
+    )
+    settings.PAYSTACK_BASE_URL = night.paystack_url
+    get_client.cache_clear()
+    yield night
+    get_client.cache_clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_voting_night_round_trip(night):
+    seed(categories=1, candidates=3, transactions=10)
+    seeded = list(Transaction.objects.values_list("pk", flat=True))
+
+    with mock.patch.object(SimpleRateThrottle, "allow_request", return_value=True):
+        report = night.run(drain_timeout=10)
+
+    errors = {status for row in report["actions"].values() for status in row["statuses"] if status not in (200, 304)}
+    assert not errors
+    assert 0 < report["charges"] <= report["actions"]["vote"]["requests"]
+    assert report["undelivered_webhooks"] == 0
+    assert report["actions"]["webhook"]["requests"] == report["charges"] + report["duplicate_webhooks"]
+    # duplicates are acknowledged but logged once, and the worker settles every charge
+    assert WebhookLog.objects.count() == report["charges"]
+    call_command("process_webhooks", "--once", "--concurrency", "1", "--batch-size", str(report["charges"]))
+    assert Transaction.objects.exclude(pk__in=seeded).filter(status="success").count() == report["charges"]
@@ -0,0 +1,64 @@
+import pytest
+from unittest import mock
+from django.core.cache import cache
+from django.urls import reverse
+from services.gateway import GatewayClient
+from utils import metrics
+from utils.metrics import Counter, Histogram
+
+
+class TestRegistry:
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = Histogram("test_latency_seconds", "Test.", labels=("route",), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, route='a"b')
+        lines = histogram.render()
+        metrics.REGISTRY.remove(histogram)
+
+        assert lines[:2] == ["# HELP test_latency_seconds Test.", "# TYPE test_latency_seconds histogram"]
+        assert lines[2:5] == [
+            'test_latency_seconds_bucket{route="a\\"b",le="0.1"} 1',
+            'test_latency_seconds_bucket{route="a\\"b",le="1"} 2',
+            'test_latency_seconds_bucket{route="a\\"b",le="+Inf"} 3',
+        ]
+        assert lines[-1] == 'test_latency_seconds_count{route="a\\"b"} 3'
+
+    def test_counter(self):
+        counter = Counter("test_events", "Test.", labels=("outcome",))
+        counter.inc(outcome="ok")
+        counter.inc(2, outcome="ok")
+        metrics.REGISTRY.remove(counter)
+        assert counter.render()[2:] == ['test_events_total{outcome="ok"} 3']
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+    def test_requests_are_timed_by_route(self, client):
+        cache.clear()
+        route, labels = "api/v1/public/events/", {"method": "GET"}
+        before = metrics.http_request_duration.sample(route=route, status="2xx", **labels)[0]
+
+        client.get(reverse("core:public-events"))
+
+        assert metrics.http_request_duration.sample(route=route, status="2xx", **labels)[0] == before + 1
+        count, queries = metrics.http_request_queries.sample(route=route, **labels)
+        assert count >= 1 and queries >= 1
+
+    def test_gateway_calls_are_timed(self):
+        client = GatewayClient("testgw", "https://gw.example")
+        before = metrics.gateway_request_duration.sample(gateway="testgw", method="POST", outcome="2xx")[0]
+        with mock.patch.object(client.session, "request", return_value=mock.Mock(status_code=200)):
+            client.post("/charge", json={})
+        assert metrics.gateway_request_duration.sample(gateway="testgw", method="POST", outcome="2xx")[0] == before + 1
+
+    def test_metrics_endpoint_requires_token(self, client, settings):
+        settings.METRICS_TOKEN = "scrape"
+        assert client.get("/metrics").status_code == 401
+
+        response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape")
+        assert response.status_code == 200
+        assert "# TYPE http_request_duration_seconds histogram" in response.content.decode()
+
+    def test_metrics_endpoint_hidden_without_token_in_production(self, client, settings):
+        settings.METRICS_TOKEN, settings.DEBUG = "", False
+        assert client.get("/metrics").status_code == 404
@@ -1,7 +1,7 @@
 from core.models.common import TimeStampedModel
 import pytest
 from django.utils import timezone
-from core.models import User, Event, Category, Candidate, OTP
+from core.models import User, Event, Category, Candidate, OTP, VoteShard
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 # from django.contrib.auth.models import User
@@ -245,3 +245,45 @@ class TestCandidateModel:
             gender="other"
         )
         assert candidate.gender in dict(Candidate.GENDER_CHOICES)
+
+
+@pytest.mark.django_db
+class TestStatsAnnotations:
+    def test_event_with_stats(self, event, category):
+        other = Category.objects.create(event=event, name="Best Group")
+        Candidate.objects.create(event=event, category=category, name="A", gender="male", vote_count=3)
+        Candidate.objects.create(event=event, category=other, name="B", gender="female", vote_count=4)
+        VoteShard.objects.create(candidate=Candidate.objects.get(name="B"), shard=0, votes=2)
+
+        annotated = Event.objects.with_stats().get(pk=event.pk)
+        assert annotated.total_candidates == 2
+        assert annotated.total_votes == 9
+        assert annotated.revenue == Decimal("45.00")
+
+    def test_event_with_stats_without_candidates(self, event):
+        annotated = Event.objects.with_stats().get(pk=event.pk)
+        assert (annotated.total_candidates, annotated.total_votes, annotated.revenue) == (0, 0, 0)
+
+    def test_category_with_stats(self, event, category):
+        Candidate.objects.create(event=event, category=category, name="A", gender="male", vote_count=3)
+        Candidate.objects.create(event=event, category=category, name="B", gender="female", vote_count=1)
+
+        annotated = Category.objects.with_stats().get(pk=category.pk)
+        assert (annotated.total_candidates, annotated.total_votes) == (2, 4)
+
+    def test_event_serializer_reads_annotations(self, event, category, django_assert_num_queries):
+        from core.serializers import EventSerializer
+
+        for i in range(5):
+            Candidate.objects.create(event=event, category=category, name=f"C{i}", gender="other", vote_count=i)
+
+        with django_assert_num_queries(1):
+            data = EventSerializer(Event.objects.with_stats(), many=True).data
+        assert data[0]["total_votes"] == 10
+        assert data[0]["total_candidates"] == 5
+
+    def test_event_serializer_loads_stats_for_plain_instance(self, event):
+        from core.serializers import EventSerializer
+
+        data = EventSerializer(event).data
+        assert (data["total_votes"], data["total_candidates"], data["revenue"]) == (0, 0, 0)
@@ -0,0 +1,85 @@
+import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import generics
+from core.mixins.cache import CachedListMixin
+from core.models import User, Event, Category, Candidate
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def event(db):
+    user = User.objects.create_user(
+        email="cache@example.com",
+        password="password123",
+        organization_name="CacheOrg"
+    )
+    event = Event.objects.create(
+        user=user,
+        name="Music Awards",
+        host="Org",
+        amount_per_vote=1.00,
+        start_time=timezone.now(),
+        end_time=timezone.now() + timedelta(days=1),
+        is_active=True,
+    )
+    Category.objects.create(event=event, name="Best Group")
+    return event
+
+
+@pytest.mark.django_db
+class TestPublicListingCache:
+    def test_repeat_requests_are_served_from_cache(self, client, event, django_assert_num_queries):
+        url = reverse("core:public-categories", kwargs={"shortcode": event.shortcode})
+        first = client.get(url).json()
+
+        with django_assert_num_queries(0):
+            second = client.get(url).json()
+
+        assert first == second
+        assert [c["name"] for c in second["data"]] == ["Best Group"]
+
+    def test_query_string_is_part_of_the_key(self, client, event):
+        category = event.categories.get()
+        Candidate.objects.create(event=event, category=category, name="Kojo", gender="male")
+        url = reverse("core:public-candidates")
+
+        assert client.get(url).json()["data"] == []
+        response = client.get(url, {"eventcode": event.shortcode, "category": category.id})
+        assert [c["name"] for c in response.json()["data"]] == ["Kojo"]
+
+    def test_saves_invalidate_listings(self, client, event, django_capture_on_commit_callbacks):
+        events_url = reverse("core:public-events")
+        categories_url = reverse("core:public-categories", kwargs={"shortcode": event.shortcode})
+        client.get(events_url)
+        client.get(categories_url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Category.objects.create(event=event, name="Best Newcomer")
+
+        assert client.get(events_url).json()["data"][0]["number_of_category"] == 2
+        assert len(client.get(categories_url).json()["data"]) == 2
+
+    def test_deletes_invalidate_listings(self, client, event, django_capture_on_commit_callbacks):
+        url = reverse("core:public-events")
+        client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            event.delete()
+
+        assert client.get(url).json()["data"] == []
+
+
+def test_cached_views_must_declare_a_scope():
+    with pytest.raises(ImproperlyConfigured, match="cache_scope"):
+        class Unscoped(CachedListMixin, generics.ListAPIView):
+            pass
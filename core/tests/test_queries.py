@@ -0,0 +1,97 @@
+import pytest
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.middleware.queries import NPlusOneMiddleware
+from core.models import User, Event, Category, Candidate
+from utils.queries import QueryBudgetExceeded, fingerprint, query_budget
+
+
+@pytest.fixture
+def organizer(db):
+    return User.objects.create_user(email="budget@example.com", password="password123", organization_name="BudgetOrg")
+
+
+@pytest.fixture
+def events(organizer):
+    events = []
+    for i in range(5):
+        event = Event.objects.create(
+            user=organizer, name=f"Awards {i}", host="Org", amount_per_vote=1.00,
+            start_time=timezone.now(), end_time=timezone.now() + timedelta(days=1),
+        )
+        category = Category.objects.create(event=event, name="Best Dressed")
+        for name in ("Ama", "Kofi"):
+            Candidate.objects.create(event=event, category=category, name=name, gender="other")
+        events.append(event)
+    return events
+
+
+def test_fingerprint_ignores_parameters():
+    assert fingerprint('SELECT * FROM "e" WHERE "id" = 7') == fingerprint('SELECT * FROM "e" WHERE "id" = 8')
+    assert fingerprint("SELECT 1 WHERE x IN (1, 2, 3) AND y = 'a'") == "SELECT ? WHERE x IN (...) AND y = ?"
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    def test_fails_over_budget(self, events):
+        with pytest.raises(QueryBudgetExceeded, match="2 queries run, budget is 1"):
+            with query_budget(1):
+                list(Event.objects.all())
+                list(Category.objects.all())
+
+    def test_fails_on_repeated_statements(self, events):
+        with pytest.raises(QueryBudgetExceeded, match="5x SELECT"):
+            with query_budget(10, max_repeats=3):
+                for event in Event.objects.all():
+                    event.user.email
+
+    def test_works_as_a_decorator(self, events):
+        @query_budget(1)
+        def load():
+            return list(Event.objects.all())
+
+        assert len(load()) == 5
+
+
+@pytest.mark.django_db
+class TestViewBudgets:
+    def test_public_event_listing(self, client, events, query_budget):
+        cache.clear()
+        with query_budget(1):
+            response = client.get(reverse("core:public-events"))
+        assert [e["number_of_category"] for e in response.json()["data"]] == [1] * 5
+
+    def test_organizer_listings(self, organizer, events, query_budget):
+        client = APIClient()
+        client.force_authenticate(organizer)
+
+        category = events[0].categories.get()
+
+        with query_budget(1):
+            client.get(reverse("core:organizer-events-list"))
+        with query_budget(1, max_repeats=2):
+            response = client.get(reverse("core:organizer-candidates-list"), {"category": category.id})
+        assert [c["revenue"] for c in response.json()["data"]] == [0, 0]
+
+
+@pytest.mark.django_db
+class TestNPlusOneMiddleware:
+    def test_logs_repeated_statements(self, settings, events):
+        settings.QUERY_DEBUG, settings.QUERY_REPEAT_THRESHOLD = True, 3
+
+        def view(request):
+            for event in Event.objects.all():
+                event.user.email
+            return HttpResponse()
+
+        with mock.patch("core.middleware.queries.logger") as logger:
+            NPlusOneMiddleware(view)(RequestFactory().get("/dashboard"))
+
+        [call] = logger.warning.call_args_list
+        assert call.args[1:4] == ("GET", "/dashboard", 5)
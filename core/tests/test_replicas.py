@@ -0,0 +1,62 @@
+import pytest
+from unittest import mock
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework import generics
+from core.models import Event
+from core.mixins.cache import CachedListMixin
+from core.mixins.replica import ReplicaReadMixin
+from core.views import PublicEventListView, PublicTicketView
+from utils.db import ReplicaRouter, read_from_replica
+
+
+class TestReplicaRouter:
+    def test_reads_go_to_replicas_only_when_requested(self):
+        router = ReplicaRouter(replicas=["replica_1", "replica_2"])
+
+        assert router.db_for_read(Event) == "default"
+        with read_from_replica():
+            assert router.db_for_read(Event) in {"replica_1", "replica_2"}
+            assert router.db_for_write(Event) == "default"
+        assert router.db_for_read(Event) == "default"
+
+    def test_without_replicas_everything_uses_the_primary(self):
+        router = ReplicaRouter(replicas=[])
+        with read_from_replica():
+            assert router.db_for_read(Event) == "default"
+
+    def test_only_the_primary_is_migrated(self):
+        router = ReplicaRouter(replicas=["replica_1"])
+        assert router.allow_migrate("default", "core")
+        assert not router.allow_migrate("replica_1", "core")
+
+
+def reads_during(view, client, url):
+    router = ReplicaRouter(replicas=["replica_1"])
+    seen = []
+
+    def list_(self, request, *args, **kwargs):
+        seen.append(router.db_for_read(Event))
+        return original(self, request, *args, **kwargs)
+
+    original = view.list
+    with mock.patch.object(view, "list", list_):
+        client.get(url)
+    return seen
+
+
+@pytest.mark.django_db
+def test_uncached_public_views_read_from_replica(client):
+    url = reverse("core:public-event-tickets", kwargs={"event_id": 1})
+    assert reads_during(PublicTicketView, client, url) == ["replica_1"]
+
+
+@pytest.mark.django_db
+def test_cached_listings_refill_from_the_primary(client):
+    cache.clear()
+    assert reads_during(PublicEventListView, client, reverse("core:public-events")) == ["default"]
+
+    with pytest.raises(ImproperlyConfigured, match="replica"):
+        class ReplicaCached(ReplicaReadMixin, CachedListMixin, generics.ListAPIView):
+            cache_scope = "events"
@@ -0,0 +1,81 @@
+import json
+import logging
+import threading
+import pytest
+from unittest import mock
+from django.http import HttpResponse
+from django.test import RequestFactory
+from core.middleware.request_logging import RequestLoggingMiddleware
+from utils.log import BackgroundFileHandler, JsonRequestFormatter
+
+
+@pytest.fixture
+def middleware(settings):
+    settings.REQUEST_LOG_FORMAT = "json"
+    settings.REQUEST_LOG_SAMPLE_RATE = 0
+
+    def build(status=200):
+        return RequestLoggingMiddleware(lambda request: HttpResponse(status=status))
+    return build
+
+
+def logged(middleware, request):
+    with mock.patch("core.middleware.request_logging.logger") as logger:
+        middleware(request)
+    return [call.kwargs["extra"]["request"] for call in logger.info.call_args_list]
+
+
+class TestStructuredRequestLogging:
+    def test_successful_gets_are_sampled(self, middleware):
+        assert logged(middleware(), RequestFactory().get("/api/v1/public/events/")) == []
+
+    def test_errors_and_writes_are_always_logged(self, middleware):
+        assert len(logged(middleware(404), RequestFactory().get("/missing"))) == 1
+        [entry] = logged(middleware(201), RequestFactory().post(
+            "/api/v1/auth/login/", {"email": "a@b.c", "password": "hunter2"}, content_type="application/json",
+        ))
+        assert entry["status"] == 201
+        assert entry["body"] == b'{"email": "a@b.c", "password": "hunter2"}'  # parsed later, on the writer thread
+
+    def test_uploads_are_not_read(self, middleware):
+        request = RequestFactory().post("/upload", {"photo": "x" * 10})
+        [entry] = logged(middleware(), request)
+        assert entry["body"] is None
+
+
+class TestJsonRequestFormatter:
+    def test_parses_and_redacts(self):
+        record = logging.LogRecord("request_logger", logging.INFO, __file__, 1, "POST /login", None, None)
+        record.request = {
+            "method": "POST", "status": 200,
+            "headers": {"Authorization": "Bearer x", "Accept": "*/*"},
+            "content_type": "application/json",
+            "body": b'{"email": "a@b.c", "password": "hunter2"}',
+        }
+        entry = json.loads(JsonRequestFormatter().format(record))
+
+        assert entry["headers"] == {"Authorization": "[REDACTED]", "Accept": "*/*"}
+        assert entry["body"] == {"email": "a@b.c", "password": "[REDACTED]"}
+
+
+class TestBackgroundFileHandler:
+    def test_formats_and_writes_on_the_listener_thread(self, tmp_path):
+        threads = []
+
+        class Recording(logging.Formatter):
+            def format(self, record):
+                threads.append(threading.current_thread())
+                return super().format(record)
+
+        handler = BackgroundFileHandler(tmp_path / "requests.log")
+        handler.setFormatter(Recording("%(message)s"))
+        logger = logging.getLogger("test_background_handler")
+        logger.addHandler(handler)
+        try:
+            logger.warning("hello")
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        assert (tmp_path / "requests.log").read_text() == "hello\n"
+        assert threads and threads[0] is not threading.main_thread()
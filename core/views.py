@@ -8,11 +8,15 @@ from rest_framework.exceptions import NotFound, ValidationError, AuthenticationF
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import authenticate
 from django.core.exceptions import PermissionDenied
+from django.db.models import Count
 
-from services.services import send_email
+from services.services import queue_email
 from .models.user import User
 from .serializers import OTPSerializer, PublicCandidateSerializer, PublicCategorySerializer, PublicEventSerializer, PublicTicketSerializer, ResendOTPSerializer, TicketSaleSerializer, TicketSerializer, UserSerializer
+from .mixins.cache import CachedListMixin
+from .mixins.replica import ReplicaReadMixin
 from .mixins.response import StandardResponseView
+from tally.versioning import ResultsETagMixin, active_event_id
 import logging
 
 logger = logging.getLogger("error")
@@ -42,15 +46,15 @@ class RegisterView(StandardResponseView):
             otp = otp
         )
 
-        # Send OTP to email
+        # Queue OTP and welcome emails
         try:
-            send_email(
+            queue_email(
                 subject="SecureEVote Signup Verification",
                 template_name="emails/email_verification.html",
                 context={"organization_name": user.organization_name, "otp_code": otp.code},
                 recipient_list=[user.email],
             )
-            send_email(
+            queue_email(
                 subject="Welcome to SecureEVote 🎉",
                 template_name="emails/welcome.html",
                 context={
@@ -63,7 +67,7 @@ class RegisterView(StandardResponseView):
             
         except Exception as e:
             user.delete()
-            logger.error(f"Error sending OTP email: {e}", exc_info=True)
+            logger.error(f"Error queueing OTP email: {e}", exc_info=True)
             raise ValidationError({'detail': 'Failed to send OTP email. Please try again later.'})
         
         return Response({'email': user.email, 'request_id': otp.request_id}, status=201)
@@ -224,28 +228,33 @@ from .models.category import Category
 from .serializers import EventSerializer, CandidateSerializer, CategorySerializer
 from rest_framework import generics
 
-class PublicEventListView(StandardResponseView, generics.ListAPIView):
-    queryset = Event.objects.filter(is_active=True, is_blocked=False)
+class PublicEventListView(CachedListMixin, StandardResponseView, generics.ListAPIView):
+    queryset = Event.objects.filter(is_active=True, is_blocked=False).annotate(category_count=Count('categories'))
     serializer_class = PublicEventSerializer
     permission_classes = []
     success_message = "Events fetched successfully"
+    cache_scope = "events"
 
-class PublicCategoryListView(StandardResponseView, generics.ListAPIView):
+class PublicCategoryListView(CachedListMixin, StandardResponseView, generics.ListAPIView):
     serializer_class = PublicCategorySerializer
     permission_classes = [permissions.AllowAny]
     success_message = "Categories fetched successfully"
+    cache_ttl_setting = 'PUBLIC_VOTES_CACHE_TTL'  # total_votes
+    cache_scope = "event:{shortcode}"
 
     def get_queryset(self):
         return Category.objects.filter(
             event__shortcode=self.kwargs['shortcode'],
             event__is_active=True,
             is_active=True
-        )
+        ).with_stats()
 
-class PublicCandidateListView(StandardResponseView, generics.ListAPIView):
+class PublicCandidateListView(CachedListMixin, StandardResponseView, generics.ListAPIView):
     serializer_class = PublicCandidateSerializer
     permission_classes = []
     success_message = "Candidates fetched successfully"
+    cache_ttl_setting = 'PUBLIC_VOTES_CACHE_TTL'  # vote_count
+    cache_scope = "event:{eventcode}"
 
     def get_queryset(self):
 
@@ -260,32 +269,38 @@ class PublicCandidateListView(StandardResponseView, generics.ListAPIView):
             category=category,
             is_blocked=False,
             event__is_active=True
-        )
+        ).with_live_votes()
 
-class EventResultsView(StandardResponseView):
+class EventResultsView(ResultsETagMixin, StandardResponseView):
     permission_classes = []
     success_message = "Event results fetched successfully"
 
     def get(self, request, shortcode):
-        event = Event.objects.filter(shortcode=shortcode, is_active=True).first()
+        event_id = active_event_id(shortcode)
+        if event_id is None:
+            raise NotFound({'detail': 'Event not found'})
+        return self.results_response(request, event_id, lambda: self.build_results(event_id))
+
+    def build_results(self, event_id):
+        event = Event.objects.filter(id=event_id, is_active=True).first()
         if not event:
             raise NotFound({'detail': 'Event not found'})
 
-        candidates = Candidate.objects.filter(event=event)
+        candidates = Candidate.objects.filter(event=event).with_live_votes()
         data = [
             {
                 "candidate": c.name,
-                "vote_count": c.vote_count
+                "vote_count": c.live_vote_count
             }
             for c in candidates
         ]
-        return Response({
+        return {
             "event": event.name,
             "shortcode": event.shortcode,
             "results": data
-        })
+        }
     
-class PublicTicketView(StandardResponseView, generics.ListAPIView, generics.RetrieveAPIView):
+class PublicTicketView(ReplicaReadMixin, StandardResponseView, generics.ListAPIView, generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = PublicTicketSerializer
     success_message = "Ticket details fetched successfully"
@@ -301,14 +316,23 @@ class PublicTicketView(StandardResponseView, generics.ListAPIView, generics.Retr
 
 # Organizer role APIs
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
+from .bulk_import import import_candidates, import_categories, read_rows
 from .permissions import IsOrganizer
 
+
+def bulk_import_response(created, errors):
+    if errors:
+        return Response({"created": 0, "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"created": len(created), "ids": [obj.pk for obj in created]}, status=status.HTTP_201_CREATED)
+
 class EventViewSet(StandardResponseView, viewsets.ModelViewSet):
     serializer_class = EventSerializer
     permission_classes = [IsOrganizer]
 
     def get_queryset(self):
-        return Event.objects.filter(user=self.request.user)
+        return Event.objects.filter(user=self.request.user).with_stats()
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -319,7 +343,7 @@ class CategoryViewSet(StandardResponseView, viewsets.ModelViewSet):
 
     def get_queryset(self):
         # Only return category owned by the user
-        return Category.objects.filter( event__user=self.request.user)
+        return Category.objects.filter( event__user=self.request.user).with_stats()
     
     def list(self, request, *args, **kwargs):
         # Override list to return categories for a specific event
@@ -343,13 +367,18 @@ class CategoryViewSet(StandardResponseView, viewsets.ModelViewSet):
         
         serializer.save()
 
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[JSONParser, MultiPartParser])
+    def bulk_import(self, request):
+        # Many categories at once, from a JSON array or a CSV `file` (see core.bulk_import)
+        return bulk_import_response(*import_categories(request.user, read_rows(request)))
+
 class CandidateViewSet(StandardResponseView, viewsets.ModelViewSet):
     serializer_class = CandidateSerializer
     permission_classes = [IsOrganizer]
 
     def get_queryset(self):
         # Only return candidates owned by the user
-        return Candidate.objects.filter( category__event__user=self.request.user)
+        return Candidate.objects.filter( category__event__user=self.request.user).select_related('event').with_live_votes()
 
     def perform_create(self, serializer):
         print(serializer.validated_data)
@@ -365,6 +394,11 @@ class CandidateViewSet(StandardResponseView, viewsets.ModelViewSet):
         # Save the candidate with the authenticated user as the organizer
         serializer.save()
 
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[JSONParser, MultiPartParser])
+    def bulk_import(self, request):
+        # Many candidates at once, from a JSON array or a CSV `file` (see core.bulk_import)
+        return bulk_import_response(*import_candidates(request.user, read_rows(request)))
+
     def list(self, request, *args, **kwargs):
         # Override list to return candidates for a specific event or category
         category_id = self.request.query_params.get('category')
@@ -449,12 +483,38 @@ class DashboardView(StandardResponseView):
 
     def get(self, request):
         user = request.user
-        events = Event.objects.filter(user=user, is_active=True, is_blocked=False)
+        events = Event.objects.filter(user=user, is_active=True, is_blocked=False).with_stats()
+
+        active_events = EventSerializer(events, many=True).data
 
         data = {
-            "total_active_events": events.count(),
-            "active_events": EventSerializer(events, many=True).data,
+            "total_active_events": len(active_events),
+            "active_events": active_events,
             "available_balance": user.balance,
         }
 
         return Response(data)
+
+
+# Monitoring
+import hmac
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+from utils import metrics
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint for this process's metrics (see utils.metrics).
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; without a token it is
+    only served when DEBUG is on.
+    """
+    http_method_names = ['get']
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not (token or settings.DEBUG):
+            raise Http404
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+            return HttpResponse(status=401)
+        return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from core.models.vote import VoteTransaction
 from .models.webhook_log import WebhookLog
+from .models.email_outbox import OutboundEmail
 
 @admin.register(VoteTransaction)
 class VoteTransactionAdmin(admin.ModelAdmin):
@@ -11,6 +12,14 @@ class VoteTransactionAdmin(admin.ModelAdmin):
 
 @admin.register(WebhookLog)
 class WebhookLogAdmin(admin.ModelAdmin):
-    list_display = ('id', 'product', 'instance_id', 'is_valid', 'created_at', 'updated_at')
+    list_display = ('id', 'product', 'instance_id', 'is_valid', 'processed_at', 'created_at', 'updated_at')
     list_filter = ('is_valid',)
-    readonly_fields = ('payload',)
+    search_fields = ('idempotency_key', 'instance_id')
+    readonly_fields = ('payload', 'response_body')
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('context', 'last_error')
@@ -0,0 +1,178 @@
+"""
+Streaming exports of an organizer's vote transactions, ticket sales and
+payment transactions as CSV or NDJSON.
+
+Rows are read with `values_list().iterator()`, a server-side cursor on
+PostgreSQL, and written out chunk by chunk, so memory use does not depend on
+the size of the export and the first bytes go out as soon as the first chunk
+is read.
+"""
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from core.models.ticket import TicketSale
+from core.models.vote import VoteTransaction
+from core.models.withdrawal import WithdrawalTransaction
+from payments.models.transaction import Transaction
+from utils.pagination import filter_created_range
+
+CHUNK_SIZE = 2000
+
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _votes(user):
+    return VoteTransaction.objects.filter(candidate__event__user=user)
+
+def _tickets(user):
+    return TicketSale.objects.filter(ticket__event__user=user)
+
+def _transactions(user):
+    return Transaction.objects.filter(
+        Q(id__in=_votes(user).values('payment_id'))
+        | Q(id__in=_tickets(user).values('payment_id'))
+        | Q(id__in=WithdrawalTransaction.objects.filter(user=user).values('transaction_id'))
+    )
+
+# dataset -> (queryset for an organizer, event lookup, {column: ORM path}) in default column order
+DATASETS = {
+    "votes": (_votes, "candidate__event", {
+        "id": "id",
+        "created_at": "created_at",
+        "event": "candidate__event__name",
+        "category": "candidate__category__name",
+        "candidate_id": "candidate_id",
+        "candidate": "candidate__name",
+        "vote_count": "vote_count",
+        "is_verified": "is_verified",
+        "amount": "payment__amount",
+        "payment_status": "payment__status",
+        "payment_reference": "payment__external_payment_id",
+        "phone_number": "payment__phone_number",
+        "provider": "payment__provider",
+    }),
+    "tickets": (_tickets, "ticket__event", {
+        "id": "id",
+        "created_at": "created_at",
+        "event": "ticket__event__name",
+        "ticket_type": "ticket__type",
+        "recipient_name": "recipient_name",
+        "recipient_contact": "recipient_contact",
+        "recipient_email": "recipient_email",
+        "amount": "payment__amount",
+        "payment_status": "payment__status",
+        "payment_reference": "payment__external_payment_id",
+    }),
+    "transactions": (_transactions, None, {
+        "id": "id",
+        "created_at": "created_at",
+        "type": "type",
+        "status": "status",
+        "amount": "amount",
+        "currency": "currency",
+        "channel": "channel",
+        "provider": "provider",
+        "phone_number": "phone_number",
+        "gateway": "gateway",
+        "payment_reference": "external_payment_id",
+        "desc": "desc",
+    }),
+}
+
+
+def select_columns(dataset, requested):
+    """
+    Validate a comma-separated `?columns=` value. Returns the column names
+    (all of them when nothing was requested).
+    """
+    available = DATASETS[dataset][2]
+    if not requested:
+        return list(available)
+
+    columns = [column.strip() for column in requested.split(",") if column.strip()]
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise ValidationError({'detail': f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(available)}."})
+    return columns
+
+
+def export_rows(dataset, user, request, columns):
+    """
+    Returns an iterator over the export rows as tuples, oldest first, filtered
+    by the optional `?event=<id>&from=&to=` params.
+    """
+    get_queryset, event_lookup, available = DATASETS[dataset]
+    queryset = filter_created_range(get_queryset(user), request)
+
+    event_id = request.query_params.get('event')
+    if event_id:
+        if event_lookup is None:
+            raise ValidationError({'detail': f"{dataset} cannot be filtered by event."})
+        if not event_id.isdigit():
+            raise ValidationError({'detail': 'event must be an event id.'})
+        queryset = queryset.filter(**{f"{event_lookup}_id": event_id})
+
+    return (
+        queryset.order_by('created_at', 'id')
+        .values_list(*(available[column] for column in columns))
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _neutralize_formula(value):
+    """
+    Quote buyer-supplied text that a spreadsheet would run as a formula.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(columns)
+    yield flush()
+    for chunk in _chunks(rows):
+        writer.writerows([_neutralize_formula(value) for value in row] for row in chunk)
+        yield flush()
+
+
+def stream_ndjson(columns, rows):
+    for chunk in _chunks(rows):
+        yield "".join(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + "\n" for row in chunk)
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+}
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from services.fake_gateway import get_fake_gateway, serve
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the fake Paystack and Hubtel on localhost, for servers pointed at it via "
+        "PAYSTACK_BASE_URL and HUBTEL_BASE_URL. "
+        "Latency, failure rate and webhooks follow the FAKE_GATEWAY_* settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        server = serve(get_fake_gateway(), options["host"], options["port"])
+        self.stdout.write(
+            f"Fake Paystack/Hubtel on http://{options['host']}:{options['port']}, "
+            f"sending webhooks to {settings.FAKE_GATEWAY_WEBHOOK_URL}"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
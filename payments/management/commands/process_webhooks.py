@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.task import release_expired_holds, settle_vote_batch, settle_webhook_logs
+from utils import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Settle verified gateway webhook deliveries, oldest first, then count paid votes in batches "
+        "and release expired ticket holds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4,
+                            help="Number of deliveries settled in parallel.")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--vote-batch-size", type=int, default=500,
+                            help="Maximum vote transactions counted per settlement transaction.")
+        parser.add_argument("--interval", type=float, default=0.5,
+                            help="Seconds to sleep when there is nothing to settle.")
+        parser.add_argument("--once", action="store_true",
+                            help="Process a single batch and exit.")
+        parser.add_argument("--metrics-port", type=int,
+                            help="Serve this worker's metrics for Prometheus at :PORT/metrics.")
+        parser.add_argument("--metrics-host", default="0.0.0.0")
+
+    def handle(self, *args, **options):
+        if options["metrics_port"] is not None:
+            # Same rule as the web /metrics endpoint: a bearer token, or DEBUG
+            if not (settings.METRICS_TOKEN or settings.DEBUG):
+                raise CommandError("Set METRICS_TOKEN to expose worker metrics outside DEBUG.")
+            metrics.serve(options["metrics_host"], options["metrics_port"], settings.METRICS_TOKEN)
+
+        while True:
+            settled, failed = settle_webhook_logs(
+                batch_size=options["batch_size"],
+                concurrency=options["concurrency"],
+            )
+            votes = settle_vote_batch(batch_size=options["vote_batch_size"])
+            released = release_expired_holds()
+            if settled or failed or votes:
+                self.stdout.write(f"Settled {settled} webhooks ({failed} failed) and {votes} vote transactions")
+            if released:
+                self.stdout.write(f"Released {released} expired ticket holds")
+            if options["once"]:
+                return
+            if not (settled or failed or votes or released):
+                time.sleep(options["interval"])
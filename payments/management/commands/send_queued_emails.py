@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.task import process_email_outbox
+from utils import metrics
+
+
+class Command(BaseCommand):
+    help = "Deliver emails queued in the outbox, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4,
+                            help="Number of emails sent in parallel.")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--interval", type=float, default=2,
+                            help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument("--once", action="store_true",
+                            help="Process a single batch and exit.")
+        parser.add_argument("--metrics-port", type=int,
+                            help="Serve this worker's metrics for Prometheus at :PORT/metrics.")
+        parser.add_argument("--metrics-host", default="0.0.0.0")
+
+    def handle(self, *args, **options):
+        if options["metrics_port"] is not None:
+            # Same rule as the web /metrics endpoint: a bearer token, or DEBUG
+            if not (settings.METRICS_TOKEN or settings.DEBUG):
+                raise CommandError("Set METRICS_TOKEN to expose worker metrics outside DEBUG.")
+            metrics.serve(options["metrics_host"], options["metrics_port"], settings.METRICS_TOKEN)
+
+        while True:
+            sent, failed = process_email_outbox(
+                batch_size=options["batch_size"],
+                concurrency=options["concurrency"],
+            )
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed")
+            if options["once"]:
+                return
+            if not (sent or failed):
+                time.sleep(options["interval"])
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0012_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhooklog',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=150, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='response_body',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='response_status',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_logs_processed(apps, schema_editor):
+    # Deliveries logged before this migration were settled inline by the webhook
+    # view; keep the worker from settling them a second time.
+    WebhookLog = apps.get_model('payments', 'WebhookLog')
+    WebhookLog.objects.filter(processed_at__isnull=True).update(processed_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0013_webhooklog_idempotency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhooklog',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['next_attempt_at', 'id'], name='webhook_log_pending_idx'),
+        ),
+        migrations.RunPython(mark_existing_logs_processed, migrations.RunPython.noop),
+    ]
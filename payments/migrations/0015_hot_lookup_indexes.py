@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0014_webhooklog_settlement_queue'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='webhooklog',
+            name='webhook_log_pending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='webhook_log_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(fields=['instance_id'], name='webhook_log_instance_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 # Create your models here.
 from core.models.vote import VoteTransaction
 from .webhook_log import WebhookLog
-from .transaction import Transaction
\ No newline at end of file
+from .transaction import Transaction
+from .email_outbox import OutboundEmail
@@ -0,0 +1,31 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from core.models.common import TimeStampedModel
+
+EMAIL_STATUS_CHOICES = [('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')]
+
+class OutboundEmail(TimeStampedModel):
+    """
+    A templated email waiting to be delivered by the `send_queued_emails` worker.
+
+    While a worker holds a row, `next_attempt_at` doubles as its lease: if the
+    worker dies mid-send the row becomes due again once the lease runs out.
+    """
+    subject = models.CharField(max_length=255)
+    template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    recipient_list = models.JSONField(default=list)
+    status = models.CharField(max_length=10, default='pending', choices=EMAIL_STATUS_CHOICES)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Email '{self.subject}' to {', '.join(self.recipient_list)} ({self.status})"
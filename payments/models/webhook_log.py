@@ -1,12 +1,72 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from core.models.common import TimeStampedModel
 
+
+class WebhookLogQuerySet(models.QuerySet):
+    def seen(self, idempotency_key):
+        """
+        True if a delivery with this key was already accepted (one indexed lookup).
+        """
+        return bool(idempotency_key) and self.filter(idempotency_key=idempotency_key).exists()
+
+    def log_delivery(self, idempotency_key, **fields):
+        """
+        Create the log row for a delivery unless one with the same key exists
+        (e.g. a concurrent duplicate that got past `seen()`).
+
+        Returns:
+            tuple: (WebhookLog, created)
+        """
+        try:
+            with transaction.atomic():
+                return self.create(idempotency_key=idempotency_key, **fields), True
+        except IntegrityError:
+            return self.get(idempotency_key=idempotency_key), False
+
+
 class WebhookLog(TimeStampedModel):
+    """
+    A verified gateway delivery. The webhook view only records it; the
+    `process_webhooks` worker settles it and fills in `processed_at` and the
+    outcome. While a worker holds a row, `next_attempt_at` is its lease.
+    """
     event = models.CharField(max_length=100)
     product = models.IntegerField() # Vote -> 0, Ticket -> 1
     instance_id = models.CharField(max_length=100)
     payload = models.JSONField()
     is_valid = models.BooleanField(default=False)
+    idempotency_key = models.CharField(max_length=150, unique=True, null=True, blank=True) # one row per gateway event
+    processed_at = models.DateTimeField(null=True, blank=True)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True) # settlement outcome
+    response_body = models.JSONField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    objects = WebhookLogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Claimed in arrival order; only unsettled rows are indexed, so it stays small
+            models.Index(
+                fields=['id'],
+                condition=Q(processed_at__isnull=True),
+                name='webhook_log_pending_idx',
+            ),
+            models.Index(fields=['instance_id'], name='webhook_log_instance_idx'),
+        ]
 
     def __str__(self):
         return f"WebhookLog {self.id} ({'valid' if self.is_valid else 'invalid'})"
+
+    @staticmethod
+    def make_idempotency_key(gateway, event, reference):
+        """
+        Key identifying one gateway event, e.g. "paystack:charge.success:302961".
+        Returns None when the payload carries no reference to deduplicate on.
+        """
+        if reference in (None, ""):
+            return None
+        return f"{gateway}:{event}:{reference}"
@@ -48,9 +48,10 @@ class TicketTransactionSerializer(serializers.ModelSerializer):
     phone_number = serializers.CharField(max_length=15, write_only=True, required=True)
     channel = serializers.ChoiceField(choices=PAYMENT_METHOD_CHOICES, write_only=True, required=True)
     provider = serializers.ChoiceField(choices=PROVIDER_CHOICES, write_only=True, required=True)
+    admission_token = serializers.CharField(write_only=True, required=False) # from the waiting room, if the ticket has one
 
     class Meta:
         model = TicketSale
         fields = ['id', 'ticket', 'recipient_name', 'recipient_contact', 'recipient_email', 
-                  'phone_number', 'channel', 'provider',] # payment details
+                  'phone_number', 'channel', 'provider', 'admission_token',] # payment details
         read_only_fields = ['id', 'created_at', 'payment']
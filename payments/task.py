@@ -0,0 +1,342 @@
+"""
+Background work that runs outside the request cycle, driven by management commands.
+"""
+import json
+import logging
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models.ticket import TicketSale
+from core.models.vote import VoteTransaction
+from payments.models.email_outbox import OutboundEmail
+from payments.models.transaction import Transaction
+from payments.models.webhook_log import WebhookLog
+from services.services import queue_email, send_email
+from tally.counters import record_votes
+from tally.versioning import bump_results_versions
+from utils.metrics import email_send_duration, webhook_settlement_lag, webhook_settlements
+
+logger = logging.getLogger("error")
+paystack_logger = logging.getLogger("paystack")
+
+
+def _retry_delay(attempts, base_seconds):
+    """
+    Exponential backoff with jitter, capped at one hour.
+    """
+    ceiling = min(base_seconds * 2 ** (attempts - 1), 3600)
+    return timedelta(seconds=random.uniform(ceiling / 2, ceiling))
+
+
+def _run_in_thread(fn):
+    def run(item):
+        try:
+            return fn(item)
+        finally:
+            connection.close()  # each pool thread owns its own connection
+    return run
+
+
+def _run_all(fn, items, concurrency):
+    """
+    Apply `fn` to every item, `concurrency` at a time. Returns the results in order.
+    """
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(_run_in_thread(fn), items))
+    return [fn(item) for item in items]
+
+
+def claim_emails(batch_size):
+    """
+    Lease up to `batch_size` due emails to this worker.
+
+    Returns:
+        list: The claimed OutboundEmail instances.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        OutboundEmail.objects.filter(id__in=ids).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+        )
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by('next_attempt_at'))
+
+
+def deliver_email(email):
+    """
+    Send one claimed email and record the outcome.
+
+    Returns:
+        bool: True if the email was sent.
+    """
+    try:
+        with email_send_duration.time(outcome="failed") as labels:
+            send_email(
+                subject=email.subject,
+                template_name=email.template_name,
+                context=email.context,
+                recipient_list=email.recipient_list,
+            )
+            labels["outcome"] = "sent"
+    except Exception as e:
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            logger.error("Giving up on email %s after %s attempts: %s", email.id, email.attempts, e)
+            OutboundEmail.objects.filter(id=email.id).update(status='failed', last_error=str(e))
+        else:
+            OutboundEmail.objects.filter(id=email.id).update(
+                next_attempt_at=timezone.now() + _retry_delay(email.attempts, settings.EMAIL_OUTBOX_BACKOFF_SECONDS),
+                last_error=str(e),
+            )
+        return False
+
+    OutboundEmail.objects.filter(id=email.id).update(status='sent', sent_at=timezone.now(), last_error='')
+    return True
+
+
+def process_email_outbox(batch_size=50, concurrency=1):
+    """
+    Claim one batch of due emails and deliver them, `concurrency` at a time.
+
+    Returns:
+        tuple: (number sent, number that failed this attempt)
+    """
+    emails = claim_emails(batch_size)
+    if not emails:
+        return 0, 0
+
+    results = _run_all(deliver_email, emails, concurrency)
+    sent = sum(results)
+    return sent, len(results) - sent
+
+
+def claim_webhook_logs(batch_size=100, ids=None):
+    """
+    Lease up to `batch_size` unsettled webhook deliveries to this worker,
+    oldest first. `ids` restricts the claim to specific logs.
+
+    Returns:
+        list: The claimed WebhookLog instances.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = WebhookLog.objects.select_for_update(skip_locked=True).filter(
+            processed_at__isnull=True, is_valid=True, next_attempt_at__lte=now,
+        )
+        if ids is not None:
+            pending = pending.filter(id__in=ids)
+        claimed = list(pending.order_by('id').values_list('id', flat=True)[:batch_size])
+        WebhookLog.objects.filter(id__in=claimed).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=now + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS),
+        )
+    return list(WebhookLog.objects.filter(id__in=claimed).order_by('id'))
+
+
+def settle_charge(ext_payment_id, amount, payment_status, product, instance_id):
+    """
+    Apply a Paystack `charge.success` to its transaction and product.
+
+    Returns:
+        tuple: (status code, body) describing the outcome.
+
+    Raises:
+        Transaction.DoesNotExist: The charge is not linked to a transaction yet
+            (the webhook can beat the initiation view); the caller retries.
+    """
+    try:
+        with transaction.atomic():
+            tx = Transaction.objects.select_for_update().get(external_payment_id=ext_payment_id, gateway="paystack")
+
+            # Check for underpayment
+            if Decimal(amount) / 100 < tx.amount:
+                paystack_logger.error("Amount underpaid for transaction %s: expected %s, got %s", tx.id, tx.amount, Decimal(amount)/100)
+                
+            # Update transaction status
+            tx.status = payment_status
+            tx.save()
+
+            # Process based on product type
+            if product == 0 and payment_status == "success":  # p = 0 for vote payment
+                # Votes are verified and counted in bulk by settle_vote_batch
+                if not VoteTransaction.objects.filter(id=instance_id, payment=tx, is_verified=False).exists():
+                    raise VoteTransaction.DoesNotExist
+            elif product == 1 and payment_status == "success":  # p = 1 for ticket payment
+                # Send ticket email with QR code
+                #No need to verify again since payment status is success
+                ticket_tx = TicketSale.objects.select_related('ticket__event', 'payment').select_for_update(of=('self',)).get(id=instance_id)
+                if not ticket_tx.confirm():
+                    if ticket_tx.status == TicketSale.SOLD:
+                        return 200, {"detail": "Already processed"}
+                    # The hold expired and the last tickets went to other buyers
+                    paystack_logger.error("Ticket %s sold out before payment for sale %s arrived; refund needed",
+                                          ticket_tx.ticket_id, ticket_tx.id)
+                    return 200, {"detail": "Sold out"}
+                queue_email(
+                    subject=f"Your Ticket for {ticket_tx.ticket.event.name}",
+                    template_name="emails/ticket.html",
+                    context={
+                        "customer_name": ticket_tx.recipient_name,
+                        "event_name": ticket_tx.ticket.event.name,
+                        "event_date": ticket_tx.ticket.event.start_time.strftime("%B %d, %Y at %I:%M %p"),
+                        "ticket_type": ticket_tx.ticket.type,
+                        "event_venue": ticket_tx.ticket.event.location,
+                        "ticket_id": ticket_tx.id,
+                        "amount": f"₵{ticket_tx.payment.amount}",
+                        "qr_code_url": "https://secureevote.com/media/qrcodes/TCK123456789.png",
+                        "year": 2025,
+                    },
+                    recipient_list=[ticket_tx.recipient_email],
+                )
+            else:
+                paystack_logger.error("Unknown product type in metadata: %s", product)
+
+    except VoteTransaction.DoesNotExist:
+        paystack_logger.error("VoteTransaction not found or already verified for id: %s", instance_id)
+        return 200, {"detail": "Already processed"}
+
+    return 200, None
+
+
+def settle_webhook(log):
+    """
+    Apply one logged Paystack delivery.
+
+    Returns:
+        tuple: (status code, body) describing the outcome.
+    """
+    payload = json.loads(log.payload) if isinstance(log.payload, str) else log.payload
+    data = payload.get("data", {})
+
+    if log.event != 'charge.success':
+        paystack_logger.info("Unhandled event type: %s", log.event)
+        return 200, None
+
+    return settle_charge(
+        ext_payment_id=data.get("id"),
+        amount=data.get("amount", 0),
+        payment_status=data.get("status"),
+        product=log.product,
+        instance_id=log.instance_id,
+    )
+
+
+def process_webhook_log(log):
+    """
+    Settle one claimed delivery and record the outcome, scheduling a retry
+    with backoff on failure.
+
+    Returns:
+        bool: True if the delivery was settled.
+    """
+    try:
+        status_code, body = settle_webhook(log)
+    except Exception as e:
+        if isinstance(e, Transaction.DoesNotExist):
+            paystack_logger.error("Transaction not found for webhook %s", log.idempotency_key)
+        else:
+            paystack_logger.error("Error processing webhook %s: %s", log.id, str(e), exc_info=True)
+
+        if log.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            paystack_logger.error("Giving up on webhook %s after %s attempts", log.id, log.attempts)
+            WebhookLog.objects.filter(id=log.id).update(
+                processed_at=timezone.now(), response_status=500, last_error=str(e),
+            )
+            webhook_settlements.inc(outcome="failed")
+        else:
+            WebhookLog.objects.filter(id=log.id).update(
+                next_attempt_at=timezone.now() + _retry_delay(log.attempts, settings.WEBHOOK_BACKOFF_SECONDS),
+                last_error=str(e),
+            )
+            webhook_settlements.inc(outcome="retry")
+        return False
+
+    now = timezone.now()
+    WebhookLog.objects.filter(id=log.id).update(
+        processed_at=now, response_status=status_code, response_body=body, last_error='',
+    )
+    webhook_settlements.inc(outcome="settled")
+    webhook_settlement_lag.observe((now - log.created_at).total_seconds())
+    return True
+
+
+def settle_webhook_logs(batch_size=100, concurrency=1, ids=None):
+    """
+    Claim one batch of unsettled webhook deliveries and settle them.
+
+    Returns:
+        tuple: (number settled, number that failed this attempt)
+    """
+    logs = claim_webhook_logs(batch_size, ids=ids)
+    results = _run_all(process_webhook_log, logs, concurrency)
+    settled = sum(results)
+    return settled, len(results) - settled
+
+
+def release_expired_holds(batch_size=500):
+    """
+    Give the stock of up to `batch_size` expired, unpaid ticket holds back
+    to sale. Holds whose payment is being settled at the same moment are
+    skipped and picked up by a later sweep if they are still held.
+
+    Returns:
+        int: The number of holds released.
+    """
+    with transaction.atomic():
+        expired = list(
+            TicketSale.objects.expired_holds(timezone.now())
+            .select_for_update(skip_locked=True)
+            .order_by('hold_expires_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        return TicketSale.objects.filter(id__in=expired).release() if expired else 0
+
+
+def settle_vote_batch(batch_size=500):
+    """
+    Verify up to `batch_size` paid, unverified vote transactions and count
+    their votes in one transaction: one UPDATE flips `is_verified` and one
+    UPDATE ... CASE adds the per-candidate totals to the vote shards.
+
+    Rows are locked with SKIP LOCKED, so concurrent settlers never pick the
+    same vote, and the flip is conditional on `is_verified=False`; a vote can
+    only ever be counted once.
+
+    Returns:
+        int: The number of vote transactions settled.
+    """
+    with transaction.atomic():
+        votes = list(
+            VoteTransaction.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(is_verified=False, payment__status='success')
+            .order_by('created_at')
+            .values_list('id', 'candidate_id', 'vote_count', 'candidate__event_id')[:batch_size]
+        )
+        if not votes:
+            return 0
+
+        ids = [vote_id for vote_id, _, _, _ in votes]
+        if VoteTransaction.objects.filter(id__in=ids, is_verified=False).update(is_verified=True) != len(ids):
+            raise RuntimeError("Vote batch changed while locked; rolling back")
+
+        counts = defaultdict(int)
+        for _, candidate_id, vote_count, _ in votes:
+            counts[candidate_id] += vote_count
+        record_votes(counts)
+        bump_results_versions(event_id for _, _, _, event_id in votes)
+
+    return len(votes)
@@ -0,0 +1,114 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from core.models import User, Event, Category, Candidate, Ticket
+
+
+@pytest.fixture
+def organizer(db):
+    return User.objects.create_user(
+        email="organizer@example.com",
+        password="password123",
+        organization_name="Awards Org",
+        is_verified=True,
+    )
+
+
+@pytest.fixture
+def event(organizer):
+    return Event.objects.create(
+        user=organizer,
+        name="Music Awards",
+        host="Awards Org",
+        amount_per_vote=1.50,
+        start_time=timezone.now(),
+        end_time=timezone.now() + timedelta(days=2),
+    )
+
+
+@pytest.fixture
+def category(event):
+    return Category.objects.create(event=event, name="Artiste of the Year")
+
+
+@pytest.fixture
+def candidate(event, category):
+    return Candidate.objects.create(event=event, category=category, name="Kojo", gender="male")
+
+
+@pytest.fixture
+def ticket(event):
+    return Ticket.objects.create(event=event, price=50, type="VIP", quantity=100)
+
+
+@pytest.fixture
+def paystack_charge():
+    """
+    Builds a successful Paystack /charge response body.
+    """
+    def build(amount, charge_id=1001):
+        return {
+            "status": True,
+            "data": {
+                "id": charge_id,
+                "status": "send_otp",
+                "amount": int(amount * 100),
+                "reference": f"ref-{charge_id}",
+                "channel": "mobile_money",
+                "authorization": {"mobile_money_number": "0240000000", "bank": "MTN"},
+                "paid_at": None,
+            },
+        }
+    return build
+
+
+@pytest.fixture
+def post_paystack_webhook(client):
+    """
+    Posts a payload to the Paystack webhook with a valid signature.
+    """
+    import hashlib, hmac, json
+    from django.urls import reverse
+    from payments.views import PAYSTACK_SECRET_KEY
+
+    def post(payload):
+        body = json.dumps(payload)
+        signature = hmac.new(PAYSTACK_SECRET_KEY.encode("utf-8"), body.encode("utf-8"), hashlib.sha512).hexdigest()
+        return client.post(
+            reverse("payments:paystack-webhook"), body,
+            content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=signature,
+        )
+    return post
+
+
+@pytest.fixture
+def vote_payment(candidate):
+    """
+    A pending vote for `candidate` with its Paystack transaction, as created by InitiateVoteView.
+    """
+    from core.models.vote import VoteTransaction
+    from payments.models import Transaction
+
+    payment = Transaction.objects.create(
+        amount=3, channel="momo", provider="mtn", phone_number="0240000000",
+        type="payment", gateway="paystack", external_payment_id="5001",
+    )
+    return VoteTransaction.objects.create(candidate=candidate, vote_count=2, payment=payment)
+
+
+@pytest.fixture
+def charge_success():
+    """
+    Builds the `charge.success` webhook payload Paystack sends for a vote payment.
+    """
+    def build(vote_tx, amount=300):
+        return {
+            "event": "charge.success",
+            "data": {
+                "id": int(vote_tx.payment.external_payment_id),
+                "status": "success",
+                "amount": amount,
+                "metadata": {"p": 0, "id": str(vote_tx.id)},
+            },
+        }
+    return build
@@ -0,0 +1,90 @@
+import pytest
+from unittest import mock
+from django.core.cache import cache
+from django.urls import reverse
+from core.models import Ticket, TicketSale
+from core.models.vote import VoteTransaction
+from payments.models import Transaction
+from payments.serializers import VoteTransactionSerializer
+from payments.views import AsyncInitiationView
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_cache():
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncInitiateVoteView:
+    url = reverse("payments:initiate-vote-async")
+
+    def test_initiates_vote_payment(self, client, candidate, paystack_charge):
+        charge = mock.AsyncMock(return_value=paystack_charge(6))
+        with mock.patch("payments.views.acharge_mobile_money", charge):
+            response = client.post(self.url, {
+                "candidate": candidate.id, "vote_count": 4,
+                "phone_number": "0240000000", "channel": "momo", "provider": "mtn",
+            }, content_type="application/json")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] is True
+        assert body["data"]["vote"] == 4
+        assert body["data"]["candidate"] == {"id": candidate.id, "name": "Kojo"}
+
+        vote_tx = VoteTransaction.objects.get()
+        assert vote_tx.payment.amount == 6
+        assert vote_tx.payment.external_payment_id == "1001"
+        assert charge.await_args.kwargs["metadata"] == {"p": 0, "id": str(vote_tx.id)}
+
+    def test_rejects_invalid_payload(self, client, candidate):
+        response = client.post(self.url, {"candidate": candidate.id}, content_type="application/json")
+        assert response.status_code == 400
+        assert response.json()["status"] is False
+        assert not Transaction.objects.exists()
+
+    def test_rejects_unsupported_channel(self, client, candidate):
+        response = client.post(self.url, {
+            "candidate": candidate.id, "vote_count": 1,
+            "phone_number": "0240000000", "channel": "card", "provider": "mtn",
+        }, content_type="application/json")
+        assert response.status_code == 400
+        assert response.json()["message"] == "Unsupported payment channel this resource."
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncTicketPaymentView:
+    def test_initiates_ticket_payment(self, client, ticket, paystack_charge):
+        charge = mock.AsyncMock(return_value=paystack_charge(50))
+        with mock.patch("payments.views.acharge_mobile_money", charge):
+            response = client.post(reverse("payments:purchase-ticket-async"), {
+                "ticket": str(ticket.id), "recipient_name": "Ama", "recipient_contact": "0200000000",
+                "phone_number": "0240000000", "channel": "momo", "provider": "mtn",
+            }, content_type="application/json")
+
+        assert response.status_code == 200
+        assert response.json()["data"]["ticket"]["type"] == "VIP"
+        sale = TicketSale.objects.get()
+        assert sale.payment.amount == 50
+        assert sale.recipient_name == "Ama"
+        assert sale.status == TicketSale.HELD
+        ticket.refresh_from_db()
+        assert ticket.held == 1
+
+    def test_sold_out(self, client, ticket):
+        Ticket.objects.filter(pk=ticket.pk).update(quantity=0)
+        response = client.post(reverse("payments:purchase-ticket-async"), {
+            "ticket": str(ticket.id), "recipient_name": "Ama", "recipient_contact": "0200000000",
+            "phone_number": "0240000000", "channel": "momo", "provider": "mtn",
+        }, content_type="application/json")
+
+        assert response.status_code == 409
+        assert not TicketSale.objects.exists()
+
+
+def test_initiation_views_must_implement_initiate():
+    class Incomplete(AsyncInitiationView):
+        serializer_class = VoteTransactionSerializer
+
+    with pytest.raises(TypeError, match="initiate"):
+        Incomplete()
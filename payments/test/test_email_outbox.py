@@ -0,0 +1,65 @@
+import pytest
+from datetime import timedelta
+from django.core import mail
+from django.utils import timezone
+from payments.models import OutboundEmail
+from payments import task
+from services.services import queue_email
+
+
+def queue_welcome_email():
+    return queue_email(
+        subject="Welcome",
+        template_name="emails/welcome.html",
+        context={"organizer_name": "Org", "dashboard_url": "https://example.com", "year": 2025},
+        recipient_list=["org@example.com"],
+    )
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    def test_queue_email_does_not_send(self):
+        email = queue_welcome_email()
+        assert email.status == "pending"
+        assert len(mail.outbox) == 0
+
+    def test_process_outbox_sends_and_marks_sent(self):
+        email = queue_welcome_email()
+        assert task.process_email_outbox() == (1, 0)
+
+        email.refresh_from_db()
+        assert email.status == "sent"
+        assert email.attempts == 1
+        assert email.sent_at is not None
+        assert mail.outbox[0].to == ["org@example.com"]
+        assert task.process_email_outbox() == (0, 0)
+
+    def test_failed_send_is_retried_later(self, monkeypatch):
+        def broken_send(**kwargs):
+            raise ConnectionError("smtp down")
+
+        monkeypatch.setattr(task, "send_email", broken_send)
+        email = queue_welcome_email()
+        assert task.process_email_outbox() == (0, 1)
+
+        email.refresh_from_db()
+        assert email.status == "pending"
+        assert email.last_error == "smtp down"
+        assert email.next_attempt_at > timezone.now()
+        assert task.process_email_outbox() == (0, 0)  # not due yet
+
+    def test_gives_up_after_max_attempts(self, monkeypatch, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+
+        def broken_send(**kwargs):
+            raise ConnectionError("smtp down")
+
+        monkeypatch.setattr(task, "send_email", broken_send)
+        email = queue_welcome_email()
+        for _ in range(2):
+            OutboundEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+            task.process_email_outbox()
+
+        email.refresh_from_db()
+        assert email.status == "failed"
+        assert email.attempts == 2
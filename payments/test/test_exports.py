@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import TicketSale, User
+from core.models.vote import VoteTransaction
+from payments.models import Transaction
+
+
+@pytest.fixture
+def organizer_client(organizer):
+    client = APIClient()
+    client.force_authenticate(organizer)
+    return client
+
+
+@pytest.fixture
+def sales(candidate, ticket):
+    for i in range(3):
+        payment = Transaction.objects.create(
+            amount=2, channel="momo", provider="mtn", phone_number="0240000000",
+            type="payment", external_payment_id=f"v{i}",
+        )
+        VoteTransaction.objects.create(candidate=candidate, vote_count=i + 1, payment=payment)
+    payment = Transaction.objects.create(
+        amount=50, channel="momo", provider="mtn", phone_number="0240000000",
+        type="payment", external_payment_id="t1",
+    )
+    TicketSale.objects.create(ticket=ticket, payment=payment, recipient_name="Ama", recipient_contact="0240000000")
+
+
+def export(client, dataset, fmt, **params):
+    response = client.get(reverse("payments:export", kwargs={"dataset": dataset, "fmt": fmt}), params)
+    body = b"".join(response.streaming_content).decode() if response.streaming else None
+    return response, body
+
+
+@pytest.mark.django_db
+class TestExports:
+    def test_votes_csv(self, organizer_client, sales, candidate):
+        response, body = export(organizer_client, "votes", "csv", columns="candidate,vote_count,payment_reference")
+
+        assert response["Content-Type"] == "text/csv"
+        assert response["Content-Disposition"].startswith('attachment; filename="votes-')
+        rows = list(csv.reader(io.StringIO(body)))
+        assert rows[0] == ["candidate", "vote_count", "payment_reference"]
+        assert sorted(rows[1:]) == [["Kojo", "1", "v0"], ["Kojo", "2", "v1"], ["Kojo", "3", "v2"]]
+
+    def test_tickets_ndjson(self, organizer_client, sales):
+        response, body = export(organizer_client, "tickets", "ndjson", columns="recipient_name,amount")
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in body.splitlines()] == [{"recipient_name": "Ama", "amount": "50.00"}]
+
+    def test_transactions_cover_votes_and_tickets(self, organizer_client, sales):
+        _, body = export(organizer_client, "transactions", "ndjson", columns="payment_reference")
+        assert sorted(json.loads(line)["payment_reference"] for line in body.splitlines()) == ["t1", "v0", "v1", "v2"]
+
+    def test_filters(self, organizer_client, sales, event):
+        _, body = export(organizer_client, "votes", "ndjson", event=event.id + 1)
+        assert body == ""
+        _, body = export(organizer_client, "votes", "ndjson", **{"from": "2999-01-01"})
+        assert body == ""
+
+    def test_csv_cells_are_not_run_as_formulas(self, organizer_client, sales):
+        TicketSale.objects.update(recipient_name='=HYPERLINK("http://evil.example","Ama")')
+
+        _, body = export(organizer_client, "tickets", "csv", columns="recipient_name,amount")
+        assert list(csv.reader(io.StringIO(body)))[1] == ['\'=HYPERLINK("http://evil.example","Ama")', "50.00"]
+
+    def test_rows_are_streamed_in_chunks(self, organizer_client, sales, monkeypatch):
+        monkeypatch.setattr("payments.exports.CHUNK_SIZE", 1)
+        response = organizer_client.get(reverse("payments:export", kwargs={"dataset": "votes", "fmt": "csv"}))
+        assert len(list(response.streaming_content)) == 1 + 3  # header, then one chunk per row
+
+    def test_rejects_unknown_exports_and_columns(self, organizer_client):
+        assert export(organizer_client, "users", "csv")[0].status_code == 404
+        assert export(organizer_client, "votes", "xml")[0].status_code == 404
+        assert export(organizer_client, "votes", "csv", columns="password")[0].status_code == 400
+        assert export(organizer_client, "transactions", "csv", event=1)[0].status_code == 400
+        assert export(organizer_client, "votes", "csv", event="abc")[0].status_code == 400
+        assert export(organizer_client, "votes", "csv", **{"from": "2024-02-30"})[0].status_code == 400
+
+    def test_exports_are_scoped_to_the_organizer(self, sales):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="o@example.com", password="x", organization_name="O"))
+        _, body = export(client, "transactions", "csv")
+        assert body.splitlines()[1:] == []
@@ -0,0 +1,132 @@
+import pytest
+from unittest import mock
+from rest_framework.exceptions import ValidationError
+from payments.services import hubtel
+from services import services
+from services.gateway import GatewayClient, get_client
+
+
+def paystack_response(status_code=200, json=None):
+    response = mock.Mock(status_code=status_code)
+    response.json.return_value = json
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestGatewayClient:
+    def test_client_is_built_once_per_process(self):
+        assert get_client("paystack") is get_client("paystack")
+
+    def test_session_pool_and_credentials(self, settings):
+        client = GatewayClient("test", "https://gw.example.com/", headers={"api-key": "k"}, pool_size=7, retries=3)
+        adapter = client.session.get_adapter("https://gw.example.com/charge")
+        assert adapter._pool_maxsize == 7
+        assert adapter.max_retries.total == 3
+        assert "POST" not in adapter.max_retries.allowed_methods
+        assert client.session.headers["api-key"] == "k"
+        assert client.base_url == "https://gw.example.com"
+
+    def test_charge_mobile_money_goes_through_shared_session(self):
+        client = get_client("paystack")
+        data = {"status": True, "data": {"id": 1}}
+        with mock.patch.object(client.session, "request", return_value=paystack_response(json=data)) as request:
+            assert services.charge_mobile_money(5, "0240000000", "mtn") == data
+
+        method, url = request.call_args.args
+        assert (method, url) == ("POST", f"{client.base_url}/charge")
+        assert request.call_args.kwargs["json"]["amount"] == 500
+        assert request.call_args.kwargs["timeout"] == client.timeout
+
+    def test_charge_mobile_money_rejected_by_paystack(self):
+        client = get_client("paystack")
+        data = {"status": False, "message": "Invalid phone"}
+        with mock.patch.object(client.session, "request", return_value=paystack_response(json=data)):
+            with pytest.raises(ValidationError):
+                services.charge_mobile_money(5, "0240000000", "mtn")
+
+    def test_hubtel_checkout_goes_through_shared_session(self):
+        client = get_client("hubtel")
+        data = {"responseCode": "0000", "data": {"checkoutId": "abc"}}
+        with mock.patch.object(client.session, "request", return_value=paystack_response(json=data)) as request:
+            assert hubtel.initiate_payment("ref-1", 5, "Votes", "233240000000") == data
+
+        method, url = request.call_args.args
+        assert (method, url) == ("POST", f"{client.base_url}/payment/v1/merchantaccount/onlinecheckout/initiate")
+        assert request.call_args.kwargs["json"]["clientReference"] == "ref-1"
+
+
+@pytest.fixture
+def fake_backend(settings):
+    """
+    Route Paystack and Hubtel calls to a fresh in-process fake gateway.
+    """
+    from services.fake_gateway import get_fake_gateway
+
+    settings.GATEWAY_BACKEND = "fake"
+    settings.FAKE_GATEWAY_LATENCY = 0
+    settings.FAKE_GATEWAY_WEBHOOK_LAG = 0
+    settings.FAKE_GATEWAY_DUPLICATE_RATE = 0
+    get_client.cache_clear()
+    get_fake_gateway.cache_clear()
+    yield settings
+    get_client.cache_clear()
+    get_fake_gateway.cache_clear()
+
+
+class TestFakeGateway:
+    def test_charges_are_answered_offline(self, fake_backend):
+        fake_backend.FAKE_GATEWAY_WEBHOOK_URL = "http://127.0.0.1:1/unreachable"
+        data = services.charge_mobile_money(5, "0240000000", "mtn", metadata={"p": 0, "id": "v1"})
+
+        assert data["status"] is True
+        assert (data["data"]["amount"], data["data"]["authorization"]["bank"]) == (500, "mtn")
+
+    def test_async_charges_are_answered_offline(self, fake_backend):
+        import asyncio
+        fake_backend.FAKE_GATEWAY_WEBHOOK_URL = "http://127.0.0.1:1/unreachable"
+        data = asyncio.run(services.acharge_mobile_money(5, "0240000000", "mtn"))
+        assert data["data"]["status"] == "send_otp"
+
+    def test_failure_rate_surfaces_as_gateway_error(self, fake_backend):
+        from rest_framework.exceptions import APIException
+        fake_backend.FAKE_GATEWAY_FAILURE_RATE = 1
+        with pytest.raises(APIException):
+            services.charge_mobile_money(5, "0240000000", "mtn")
+
+    def test_refuses_a_live_key(self, fake_backend, monkeypatch):
+        from django.core.exceptions import ImproperlyConfigured
+        monkeypatch.setenv("PAYSTACK_SECRET_KEY", "sk_live_123")
+        with pytest.raises(ImproperlyConfigured):
+            get_client("paystack")
+
+    def test_hubtel_checkouts_are_answered_offline(self, fake_backend):
+        data = hubtel.initiate_payment("ref-1", 5, "Votes", "233240000000")
+        assert (data["responseCode"], data["data"]["clientReference"]) == ("0000", "ref-1")
+
+    def test_other_gateways_stay_live(self, fake_backend):
+        from requests.adapters import HTTPAdapter
+        assert isinstance(get_client("arkesel").session.get_adapter("https://x"), HTTPAdapter)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fake_gateway_closes_the_payment_loop(fake_backend, live_server, candidate):
+    from django.test import Client
+    from django.urls import reverse
+    from core.models.vote import VoteTransaction
+    from payments.models import WebhookLog
+    from django.core.cache import cache
+    from services.fake_gateway import get_fake_gateway
+
+    cache.clear()  # throttling
+    fake_backend.FAKE_GATEWAY_WEBHOOK_URL = live_server.url + reverse("payments:paystack-webhook")
+    response = Client().post(reverse("payments:initiate-vote"), {
+        "candidate": candidate.id, "vote_count": 2,
+        "phone_number": "0240000000", "channel": "momo", "provider": "mtn",
+    }, content_type="application/json")
+    assert response.status_code == 200
+
+    assert get_fake_gateway().webhooks.drain(timeout=10) == 0
+    vote = VoteTransaction.objects.get()
+    log = WebhookLog.objects.get()
+    assert (log.event, log.instance_id) == ("charge.success", str(vote.id))
+    assert log.idempotency_key == f"paystack:charge.success:{vote.payment.external_payment_id}"
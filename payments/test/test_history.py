@@ -0,0 +1,84 @@
+import base64
+import pytest
+from datetime import datetime, timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models.vote import VoteTransaction
+from payments.models import Transaction
+
+
+@pytest.fixture
+def organizer_client(organizer):
+    client = APIClient()
+    client.force_authenticate(organizer)
+    return client
+
+
+@pytest.fixture
+def vote_history(candidate):
+    """
+    25 vote transactions, one per hour going back from 1 June 2025 noon, with
+    the last five sharing a timestamp so pages must break ties on id.
+    """
+    start = timezone.make_aware(datetime(2025, 6, 1, 12))
+    votes = []
+    for i in range(25):
+        payment = Transaction.objects.create(
+            amount=1, channel="momo", provider="mtn", phone_number="0240000000", type="payment",
+        )
+        created_at = start - timedelta(hours=min(i, 20))
+        votes.append(VoteTransaction.objects.create(
+            candidate=candidate, vote_count=1, payment=payment, created_at=created_at,
+        ))
+    return votes
+
+
+@pytest.mark.django_db
+class TestVoteTransactionHistory:
+    url = reverse("payments:vote-transactions")
+
+    def fetch_all(self, client, params):
+        ids, response = [], client.get(self.url, params)
+        while True:
+            data = response.json()["data"]
+            ids += [row["id"] for row in data["results"]]
+            if not data["next"]:
+                return ids
+            response = client.get(data["next"])
+
+    def test_pages_cover_every_row_once_newest_first(self, organizer_client, vote_history):
+        ids = self.fetch_all(organizer_client, {"page_size": 7})
+
+        expected = sorted(vote_history, key=lambda v: (v.created_at, v.pk), reverse=True)
+        assert ids == [str(v.pk) for v in expected]
+
+    def test_page_cost_does_not_depend_on_position(self, organizer_client, vote_history, django_assert_num_queries):
+        first = organizer_client.get(self.url, {"page_size": 5}).json()["data"]
+
+        # user lookup is skipped by force_authenticate: one query per page
+        with django_assert_num_queries(1):
+            later = organizer_client.get(first["next"]).json()["data"]
+        assert len(later["results"]) == 5
+
+    def test_date_range_filter(self, organizer_client, vote_history):
+        ids = self.fetch_all(organizer_client, {"from": "2025-06-01", "to": "2025-06-01"})
+        assert len(ids) == 13  # 00:00 to 12:00 on 1 June
+
+    def test_rejects_bad_parameters(self, organizer_client):
+        forged = base64.urlsafe_b64encode(b"2024-01-01T00:00:00+00:00|zzz").decode()
+        assert organizer_client.get(self.url, {"cursor": "garbage"}).status_code == 400
+        assert organizer_client.get(self.url, {"cursor": forged}).status_code == 400
+        assert organizer_client.get(self.url, {"from": "June"}).status_code == 400
+        assert organizer_client.get(self.url, {"from": "2024-13-45"}).status_code == 400
+
+        withdrawals = reverse("payments:withdrawals")
+        assert organizer_client.get(withdrawals, {"cursor": forged}).status_code == 400
+        assert organizer_client.get(withdrawals, {"to": "2024-02-30"}).status_code == 400
+
+    def test_only_lists_own_transactions(self, organizer_client, vote_history):
+        from core.models import User
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email="o@example.com", password="x", organization_name="O"))
+        assert other.get(self.url).json()["data"]["results"] == []
@@ -0,0 +1,147 @@
+import pytest
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from core.models import Ticket, TicketSale
+from payments.models import OutboundEmail, Transaction
+from payments.task import release_expired_holds, settle_charge
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def buy(client, ticket, paystack_charge):
+    """
+    Initiates a ticket purchase through TicketPaymentView with Paystack stubbed out.
+    """
+    charge_ids = iter(range(2001, 3000))
+
+    def buy(charge=None):
+        charge = charge or mock.Mock(side_effect=lambda *a, **kw: paystack_charge(50, next(charge_ids)))
+        with mock.patch("payments.views.charge_mobile_money", charge):
+            return client.post(reverse("payments:purchase-ticket"), {
+                "ticket": str(ticket.id), "recipient_name": "Ama", "recipient_contact": "0200000000",
+                "phone_number": "0240000000", "channel": "momo", "provider": "mtn",
+            }, content_type="application/json")
+    return buy
+
+
+def pay(sale):
+    return settle_charge(sale.payment.external_payment_id, 5000, "success", 1, str(sale.id))
+
+
+def stock(ticket):
+    ticket.refresh_from_db()
+    return ticket.sold, ticket.held
+
+
+@pytest.mark.django_db
+class TestReservation:
+    def test_reserve_stops_at_quantity(self, ticket):
+        Ticket.objects.filter(pk=ticket.pk).update(quantity=2)
+        assert [Ticket.objects.reserve(ticket.pk) for _ in range(3)] == [True, True, False]
+        assert stock(ticket) == (0, 2)
+
+    def test_inactive_tickets_are_not_reserved(self, ticket):
+        Ticket.objects.filter(pk=ticket.pk).update(is_active=False)
+        assert not Ticket.objects.reserve(ticket.pk)
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="needs real row locking")
+    def test_concurrent_buyers_never_oversell(self, ticket):
+        Ticket.objects.filter(pk=ticket.pk).update(quantity=25)
+
+        def reserve(_):
+            try:
+                return Ticket.objects.reserve(ticket.pk)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(reserve, range(200)))
+        assert results.count(True) == 25
+        assert stock(ticket) == (0, 25)
+
+
+@pytest.mark.django_db
+class TestTicketPurchase:
+    def test_initiation_holds_a_ticket(self, buy, ticket):
+        response = buy()
+
+        assert response.status_code == 200
+        sale = TicketSale.objects.get()
+        assert sale.status == TicketSale.HELD
+        assert sale.hold_expires_at > timezone.now()
+        assert stock(ticket) == (0, 1)
+
+    def test_sold_out(self, buy, ticket):
+        Ticket.objects.filter(pk=ticket.pk).update(quantity=1)
+        buy()
+
+        response = buy()
+        assert response.status_code == 409
+        assert response.json()["message"] == "Tickets sold out."
+        assert TicketSale.objects.count() == 1
+        assert Transaction.objects.count() == 1
+
+    def test_failed_charge_releases_the_hold(self, buy, ticket):
+        response = buy(mock.Mock(side_effect=APIException("internal error")))
+
+        assert response.status_code == 500
+        assert TicketSale.objects.get().status == TicketSale.RELEASED
+        assert stock(ticket) == (0, 0)
+
+
+@pytest.mark.django_db
+class TestHoldSettlement:
+    def test_payment_turns_the_hold_into_a_sale(self, buy, ticket):
+        buy()
+        sale = TicketSale.objects.get()
+
+        assert pay(sale) == (200, None)
+        assert pay(sale) == (200, {"detail": "Already processed"})
+
+        sale.refresh_from_db()
+        assert (sale.status, sale.hold_expires_at) == (TicketSale.SOLD, None)
+        assert stock(ticket) == (1, 0)
+        assert OutboundEmail.objects.count() == 1
+
+    def test_sweeper_releases_expired_holds_only(self, buy, ticket):
+        buy()
+        buy()
+        expired = TicketSale.objects.order_by("created_at").first()
+        TicketSale.objects.filter(pk=expired.pk).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+
+        assert release_expired_holds() == 1
+        assert release_expired_holds() == 0
+        assert stock(ticket) == (0, 1)
+        assert dict(TicketSale.objects.values_list("id", "status"))[expired.id] == TicketSale.RELEASED
+
+    def test_late_payment_is_sold_while_stock_remains(self, buy, ticket):
+        buy()
+        sale = TicketSale.objects.get()
+        TicketSale.objects.filter(pk=sale.pk).release()
+
+        assert pay(sale) == (200, None)
+        assert stock(ticket) == (1, 0)
+
+    def test_late_payment_after_sell_out_is_not_sold(self, buy, ticket):
+        Ticket.objects.filter(pk=ticket.pk).update(quantity=1)
+        buy()
+        late = TicketSale.objects.get()
+        TicketSale.objects.filter(pk=late.pk).release()
+        buy()  # someone else takes the last ticket
+
+        assert pay(late) == (200, {"detail": "Sold out"})
+        late.refresh_from_db()
+        assert late.status == TicketSale.RELEASED
+        assert stock(ticket) == (0, 1)
+        assert not OutboundEmail.objects.exists()
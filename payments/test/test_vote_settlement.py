@@ -0,0 +1,65 @@
+import pytest
+from core.models import Candidate
+from core.models.vote import VoteTransaction
+from payments.models import Transaction
+from payments.task import settle_vote_batch
+from tally.versioning import results_etag
+
+
+@pytest.fixture
+def paid_votes(event, category, candidate):
+    """
+    Builds `n` vote transactions split over `candidate` and a rival, with the given payment status.
+    """
+    rival = Candidate.objects.create(event=event, category=category, name="Adjoa", gender="female")
+
+    def build(n, status="success"):
+        votes = []
+        for i in range(n):
+            payment = Transaction.objects.create(
+                amount=1, channel="momo", provider="mtn", phone_number="0240000000",
+                type="payment", gateway="paystack", status=status,
+            )
+            votes.append(VoteTransaction.objects.create(
+                candidate=candidate if i % 2 == 0 else rival, vote_count=i + 1, payment=payment,
+            ))
+        return votes
+    return build
+
+
+def live_votes():
+    return dict(Candidate.objects.with_live_votes().values_list("name", "live_vote_count"))
+
+
+@pytest.mark.django_db
+class TestSettleVoteBatch:
+    def test_counts_paid_votes_per_candidate(self, paid_votes):
+        paid_votes(4)
+        paid_votes(2, status="pending")
+
+        assert settle_vote_batch() == 4
+        assert live_votes() == {"Kojo": 1 + 3, "Adjoa": 2 + 4}
+        assert VoteTransaction.objects.filter(is_verified=True).count() == 4
+
+    def test_bumps_the_results_version(self, paid_votes, event, django_capture_on_commit_callbacks):
+        paid_votes(1)
+        etag = results_etag(event.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            settle_vote_batch()
+        assert results_etag(event.id) != etag
+
+    def test_each_vote_is_counted_once(self, paid_votes):
+        paid_votes(3)
+
+        assert settle_vote_batch(batch_size=2) == 2
+        assert settle_vote_batch(batch_size=2) == 1
+        assert settle_vote_batch() == 0
+        assert sum(live_votes().values()) == 1 + 2 + 3
+
+    def test_batch_runs_in_constant_queries(self, paid_votes, django_assert_max_num_queries):
+        paid_votes(40)
+
+        # lock + flip + shard update, plus creating the shard rows on first use
+        with django_assert_max_num_queries(10):
+            assert settle_vote_batch() == 40
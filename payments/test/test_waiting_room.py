@@ -0,0 +1,148 @@
+import pytest
+from unittest import mock
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework.exceptions import APIException
+from core.models import Ticket, TicketSale
+from payments import waiting_room
+
+
+@pytest.fixture(autouse=True)
+def room(settings):
+    cache.clear()
+    settings.DEBUG = True  # the tests' local memory cache stands in for Redis
+    settings.WAITING_ROOM_ADMISSION_RATE = 2
+    settings.WAITING_ROOM_TICK = 0  # let every call advance the line
+    return settings
+
+
+@pytest.fixture
+def clock():
+    """
+    Controls the waiting room's clock: `clock.time.return_value = seconds`.
+    """
+    with mock.patch("payments.waiting_room.time") as clock:
+        clock.time.return_value = 1000.0
+        yield clock.time
+
+
+def admitted(ticket_id, now, clock):
+    clock.return_value = now
+    return waiting_room.admitted_upto(ticket_id)
+
+
+class TestAdmission:
+    def test_refuses_a_per_process_cache_outside_debug(self, settings):
+        settings.DEBUG = False
+        with pytest.raises(ImproperlyConfigured, match="CACHE_BACKEND"):
+            waiting_room.join("t1")
+        with pytest.raises(ImproperlyConfigured, match="CACHE_BACKEND"):
+            waiting_room.admitted_upto("t1")
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        waiting_room._check_cache()
+
+    def test_places_are_admitted_in_order_at_the_rate(self, clock):
+        tokens = [waiting_room.join("t1") for _ in range(20)]
+        assert [waiting_room.read_token(token) for token in tokens[:2]] == [("t1", 1), ("t1", 2)]
+
+        assert admitted("t1", 1000, clock) == 0  # starts the clock
+        assert admitted("t1", 1001, clock) == 2
+        assert admitted("t1", 1002.5, clock) == 5
+        assert waiting_room.status(tokens[4])["admitted"]
+        assert waiting_room.status(tokens[5]) == {
+            "ticket": "t1", "position": 6, "admitted": False, "ahead": 0, "eta_seconds": 1,
+        }
+
+    def test_idle_time_is_not_banked(self, clock):
+        for _ in range(3):
+            waiting_room.join("t1")
+        assert admitted("t1", 1000, clock) == 0
+        assert admitted("t1", 1010, clock) == 3  # never past the end of the line
+
+        for _ in range(100):
+            waiting_room.join("t1")
+        # a new rush after an hour of quiet: only CATCH_UP_SECONDS worth goes through
+        assert admitted("t1", 4600, clock) == 3 + 2 * waiting_room.CATCH_UP_SECONDS
+
+    def test_tokens_are_single_use_and_per_tier(self, clock):
+        token = waiting_room.join("t1")
+        admitted("t1", 1000, clock)
+        admitted("t1", 1001, clock)
+
+        assert not waiting_room.admit(token, "t2")
+        assert not waiting_room.admit(token + "x", "t1")
+        assert waiting_room.admit(token, "t1")
+        assert not waiting_room.admit(token, "t1")
+        waiting_room.give_back(token, "t1")
+        assert waiting_room.admit(token, "t1")
+
+
+@pytest.mark.django_db
+class TestWaitingRoomEndpoints:
+    @pytest.fixture
+    def queued_ticket(self, ticket):
+        Ticket.objects.filter(pk=ticket.pk).update(waiting_room=True)
+        return ticket
+
+    def join(self, client, ticket):
+        return client.post(reverse("payments:waiting-room-join", kwargs={"ticket_id": ticket.id})).json()["data"]
+
+    def buy(self, client, ticket, paystack_charge, token=None, charge=None):
+        body = {
+            "ticket": str(ticket.id), "recipient_name": "Ama", "recipient_contact": "0200000000",
+            "phone_number": "0240000000", "channel": "momo", "provider": "mtn",
+        }
+        if token:
+            body["admission_token"] = token
+        with mock.patch("payments.views.charge_mobile_money", charge or mock.Mock(return_value=paystack_charge(50))):
+            return client.post(reverse("payments:purchase-ticket"), body, content_type="application/json")
+
+    def test_join_and_poll(self, client, queued_ticket, clock, django_assert_num_queries):
+        data = self.join(client, queued_ticket)
+        assert (data["position"], data["admitted"]) == (1, False)
+
+        url = reverse("payments:waiting-room-status")
+        with django_assert_num_queries(0):
+            response = client.get(url, {"token": data["token"]})
+        assert response["Retry-After"] == "1"
+
+        clock.return_value = 1001
+        response = client.get(url, {"token": data["token"]})
+        assert response.json()["data"]["admitted"] is True
+        assert "Retry-After" not in response
+
+        assert client.get(url, {"token": "forged"}).status_code == 400
+
+    def test_purchase_needs_an_admitted_token(self, client, queued_ticket, paystack_charge, clock):
+        token = self.join(client, queued_ticket)["token"]
+        assert self.buy(client, queued_ticket, paystack_charge).status_code == 403
+        assert self.buy(client, queued_ticket, paystack_charge, token).status_code == 403  # still waiting
+
+        clock.return_value = 1001
+        assert self.buy(client, queued_ticket, paystack_charge, token).status_code == 200
+        assert self.buy(client, queued_ticket, paystack_charge, token).status_code == 403  # used
+        assert TicketSale.objects.count() == 1
+
+    def test_failed_purchase_keeps_the_admission(self, client, queued_ticket, paystack_charge, clock):
+        token = self.join(client, queued_ticket)["token"]
+        clock.return_value = 1001
+        waiting_room.admitted_upto(queued_ticket.id)
+
+        failing = mock.Mock(side_effect=APIException("internal error"))
+        assert self.buy(client, queued_ticket, paystack_charge, token, charge=failing).status_code == 500
+        assert self.buy(client, queued_ticket, paystack_charge, token).status_code == 200
+
+    def test_sold_out_purchase_keeps_the_admission(self, client, queued_ticket, paystack_charge, clock):
+        token = self.join(client, queued_ticket)["token"]
+        clock.return_value = 1001
+        waiting_room.admitted_upto(queued_ticket.id)
+
+        Ticket.objects.filter(pk=queued_ticket.pk).update(held=queued_ticket.quantity)
+        assert self.buy(client, queued_ticket, paystack_charge, token).status_code == 409
+        Ticket.objects.filter(pk=queued_ticket.pk).update(held=0)  # a hold lapsed
+        assert self.buy(client, queued_ticket, paystack_charge, token).status_code == 200
+
+    def test_tickets_without_a_waiting_room_are_sold_directly(self, client, ticket, paystack_charge):
+        assert self.buy(client, ticket, paystack_charge).status_code == 200
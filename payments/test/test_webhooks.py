@@ -0,0 +1,132 @@
+import pytest
+import requests
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from core.models import Candidate
+from payments.models import WebhookLog
+from payments.task import settle_vote_batch, settle_webhook_logs
+from utils import metrics
+
+
+def live_votes():
+    return Candidate.objects.with_live_votes().get().live_vote_count
+
+
+@pytest.mark.django_db
+class TestPaystackWebhookIngestion:
+    def test_acknowledges_without_settling(self, post_paystack_webhook, vote_payment, charge_success):
+        response = post_paystack_webhook(charge_success(vote_payment))
+        assert response.status_code == 200
+
+        log = WebhookLog.objects.get()
+        assert log.idempotency_key == "paystack:charge.success:5001"
+        assert log.processed_at is None
+        vote_payment.refresh_from_db()
+        assert not vote_payment.is_verified
+
+    def test_duplicate_delivery_is_not_logged_again(self, post_paystack_webhook, vote_payment, charge_success, django_assert_max_num_queries):
+        post_paystack_webhook(charge_success(vote_payment))
+
+        with django_assert_max_num_queries(1):
+            response = post_paystack_webhook(charge_success(vote_payment))
+
+        assert response.status_code == 200
+        assert WebhookLog.objects.count() == 1
+
+    def test_settles_inline_when_configured(self, post_paystack_webhook, vote_payment, charge_success, settings):
+        settings.WEBHOOK_SETTLE_INLINE = True
+        post_paystack_webhook(charge_success(vote_payment))
+
+        assert WebhookLog.objects.get().processed_at is not None
+        assert live_votes() == 2
+
+    def test_invalid_signature_is_rejected(self, client, vote_payment, charge_success):
+        from django.urls import reverse
+
+        response = client.post(
+            reverse("payments:paystack-webhook"), charge_success(vote_payment),
+            content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE="forged",
+        )
+        assert response.status_code == 403
+        assert not WebhookLog.objects.exists()
+
+
+@pytest.mark.django_db
+class TestWebhookSettlement:
+    def test_worker_settles_vote_once(self, post_paystack_webhook, vote_payment, charge_success):
+        post_paystack_webhook(charge_success(vote_payment))
+        post_paystack_webhook(charge_success(vote_payment))
+        settled = metrics.webhook_settlements.value(outcome="settled")
+
+        assert settle_webhook_logs() == (1, 0)
+        assert metrics.webhook_settlements.value(outcome="settled") == settled + 1
+        assert settle_webhook_logs() == (0, 0)
+        assert settle_vote_batch() == 1
+
+        vote_payment.refresh_from_db()
+        assert vote_payment.is_verified
+        assert vote_payment.payment.status == "success"
+        assert live_votes() == 2
+        log = WebhookLog.objects.get()
+        assert (log.response_status, log.attempts) == (200, 1)
+
+    def test_worker_metrics_are_scrapeable(self, post_paystack_webhook, vote_payment, charge_success, settings):
+        settings.METRICS_TOKEN = "scrape"
+        post_paystack_webhook(charge_success(vote_payment))
+
+        servers = []
+        serve = metrics.serve
+        with mock.patch.object(metrics, "serve", lambda *args: servers.append(serve(*args)) or servers[-1]):
+            call_command(
+                "process_webhooks", "--once", "--concurrency", "1", "--metrics-host", "127.0.0.1", "--metrics-port", "0",
+                stdout=StringIO(),
+            )
+        [server] = servers
+        try:
+            url = "http://127.0.0.1:%d/metrics" % server.server_address[1]
+            assert requests.get(url, timeout=5).status_code == 401
+            body = requests.get(url, headers={"Authorization": "Bearer scrape"}, timeout=5).text
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        settled = metrics.webhook_settlements.value(outcome="settled")
+        assert f'webhook_settlements_total{{outcome="settled"}} {settled}' in body
+        assert "webhook_settlement_lag_seconds_count" in body
+
+    def test_worker_metrics_need_a_token_outside_debug(self, settings):
+        settings.METRICS_TOKEN, settings.DEBUG = "", False
+        with pytest.raises(CommandError, match="METRICS_TOKEN"):
+            call_command("send_queued_emails", "--once", "--metrics-port", "0")
+
+    def test_unknown_transaction_is_retried_with_backoff(self, post_paystack_webhook, vote_payment, charge_success):
+        payload = charge_success(vote_payment)
+        payload["data"]["id"] = 9999
+        post_paystack_webhook(payload)
+
+        assert settle_webhook_logs() == (0, 1)
+        log = WebhookLog.objects.get()
+        assert log.processed_at is None
+        assert log.next_attempt_at > timezone.now()
+        assert settle_webhook_logs() == (0, 0)  # not due yet
+
+    def test_gives_up_after_max_attempts(self, post_paystack_webhook, vote_payment, charge_success, settings):
+        settings.WEBHOOK_MAX_ATTEMPTS = 1
+        with mock.patch("payments.task.settle_webhook", side_effect=RuntimeError("boom")):
+            post_paystack_webhook(charge_success(vote_payment))
+            assert settle_webhook_logs() == (0, 1)
+
+        log = WebhookLog.objects.get()
+        assert log.processed_at is not None
+        assert (log.response_status, log.last_error) == (500, "boom")
+
+    def test_settles_in_arrival_order(self, post_paystack_webhook, vote_payment, charge_success):
+        post_paystack_webhook(charge_success(vote_payment))
+        WebhookLog.objects.create(event="charge.failed", product=0, instance_id="x", payload="{}", is_valid=True,
+                                  next_attempt_at=timezone.now() - timedelta(minutes=1))
+
+        settle_webhook_logs(batch_size=1)
+        assert list(WebhookLog.objects.order_by("id").values_list("processed_at", flat=True))[0] is not None
@@ -1,10 +1,11 @@
 from django.urls import path
-from .views import InitiateVoteView, HubtelWebhookView, PaystackWebhookView, ResendOTPView, TicketPaymentView, VoteTransactionHistoryView, WithdrawalOTPConfirmationView, WithdrawalTransactionView
+from .views import AsyncInitiateVoteView, AsyncTicketPaymentView, ExportView, InitiateVoteView, HubtelWebhookView, PaystackWebhookView, ResendOTPView, TicketPaymentView, VoteTransactionHistoryView, WaitingRoomJoinView, WaitingRoomStatusView, WithdrawalOTPConfirmationView, WithdrawalTransactionView
 
 app_name = "payments"
 
 urlpatterns = [
     path('vote', InitiateVoteView.as_view(), name='initiate-vote'),
+    path('vote/async', AsyncInitiateVoteView.as_view(), name='initiate-vote-async'),
     path('vote/transactions', VoteTransactionHistoryView.as_view(), name='vote-transactions'),
     path('withdrawals', WithdrawalTransactionView.as_view(), name='withdrawals'),
     path('withdrawals/verify-otp', WithdrawalOTPConfirmationView.as_view(), name='withdrawal-otp'),
@@ -12,6 +13,12 @@ urlpatterns = [
 
     #ticket purchase
     path('tickets', TicketPaymentView.as_view(), name='purchase-ticket'),
+    path('tickets/async', AsyncTicketPaymentView.as_view(), name='purchase-ticket-async'),
+    path('tickets/<uuid:ticket_id>/queue', WaitingRoomJoinView.as_view(), name='waiting-room-join'),
+    path('tickets/queue', WaitingRoomStatusView.as_view(), name='waiting-room-status'),
+
+    # organizer exports, e.g. exports/votes.csv
+    path('exports/<str:dataset>.<str:fmt>', ExportView.as_view(), name='export'),
 ]
 
 #Webhook URL
@@ -1,26 +1,36 @@
 import uuid
-from decimal import Decimal
 from core.models.candidate import Candidate
 from core.models.otp import OTP, generate_secure_otp
-from core.models.ticket import TicketSale
+from core.models.ticket import Ticket, TicketSale
 from core.serializers import OTPSerializer, ResendOTPSerializer
 from payments.models.transaction import Transaction
 from core.models.withdrawal import WithdrawalTransaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics
-from rest_framework.exceptions import APIException, ValidationError, PermissionDenied
+from rest_framework.exceptions import APIException, NotFound, ValidationError, PermissionDenied
 from core.models.vote import VoteTransaction
-from services.services import charge_mobile_money, send_email
+from services.services import charge_mobile_money, queue_email
 from .serializers import TicketTransactionSerializer, VoteTransactionSerializer, WithdrawalTransactionSerializer
 from .services.hubtel import initiate_payment
+from .task import settle_vote_batch, settle_webhook_logs
+from tally.counters import record_votes
+from tally.versioning import bump_results_versions
 from core.mixins.response import StandardResponseView
 from core.permissions import IsOrganizer
+from utils.pagination import KeysetPagination, filter_created_range
+from .exports import DATASETS, FORMATS, STREAMERS, export_rows, select_columns
 from django.shortcuts import get_object_or_404
 import hmac, hashlib, json, logging
 from decouple import config
 from django.db import models
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
 from ipware import get_client_ip
+from utils.exceptions import NotAdmitted, SoldOut
+from . import waiting_room
+from django.core import signing
 
 
 PAYSTACK_SECRET_KEY = config('PAYSTACK_SECRET_KEY')
@@ -29,6 +39,85 @@ PAYSTACK_IPS = config('ALLOWED_PAYSTACK_IPS', cast=lambda v: [ip.strip() for ip
 logger = logging.getLogger("paystack")
 error_logger = logging.getLogger("error")
 
+def charge_data(payment_response):
+    """
+    The part of an initiation response that comes from the Paystack charge.
+    """
+    return {
+        "status": payment_response["data"]["status"],
+        "amount": payment_response["data"]["amount"]/100,  # Convert from pesewa to GHS
+        "reference": payment_response["data"]["reference"],
+        "channel": payment_response["data"]["channel"],
+        "phone_number": payment_response["data"]["authorization"]["mobile_money_number"],
+        "provider": payment_response["data"]["authorization"]["bank"],
+        "completed_at": payment_response["data"]["paid_at"]
+    }
+
+def vote_initiation_data(payment_response, instance, candidate):
+    return {
+        **charge_data(payment_response),
+        "candidate": {
+            "id": candidate.id,
+            "name": candidate.name,
+            },
+        "vote": instance.vote_count,
+    }
+
+def hold_expiry():
+    return timezone.now() + timedelta(seconds=settings.TICKET_HOLD_SECONDS)
+
+def admit_buyer(ticket, admission_token):
+    """
+    For tickets sold through a waiting room, use up the buyer's admission.
+
+    Returns:
+        str: The admission token used, or None if the ticket has no waiting room.
+    """
+    if not ticket.waiting_room:
+        return None
+    if not admission_token or not waiting_room.admit(admission_token, ticket.pk):
+        raise NotAdmitted()
+    return admission_token
+
+def hold_ticket(ticket, admission_token):
+    """
+    Admit the buyer and reserve one of the ticket's stock for them. If it has
+    sold out the admission is given back, so a buyer who retries once a hold
+    lapses need not queue again.
+
+    Returns:
+        str: The admission token used, as `admit_buyer`.
+    """
+    admission_token = admit_buyer(ticket, admission_token)
+    if not Ticket.objects.reserve(ticket.pk):
+        if admission_token:
+            waiting_room.give_back(admission_token, ticket.pk)
+        raise SoldOut()
+    return admission_token
+
+def release_failed_hold(ticket_id, sale=None, admission_token=None):
+    """
+    Give back the stock reserved for a ticket initiation that failed, and
+    the buyer's admission so they can retry without queueing again.
+    """
+    if sale is not None:
+        TicketSale.objects.filter(pk=sale.pk).release()
+    else:
+        Ticket.objects.filter(pk=ticket_id).update(held=models.F('held') - 1)
+    if admission_token:
+        waiting_room.give_back(admission_token, ticket_id)
+
+def ticket_initiation_data(payment_response, instance, ticket):
+    return {
+        **charge_data(payment_response),
+        "ticket": {
+            "type": ticket.type,
+            "owner_contact": instance.recipient_contact,
+            "owner_name": instance.recipient_name,
+            "event": ticket.event.name,
+            },
+    }
+
 class InitiateVoteView(StandardResponseView):
     permission_classes = []
     serializer_class = VoteTransactionSerializer
@@ -88,20 +177,7 @@ class InitiateVoteView(StandardResponseView):
             raise APIException({'detail': 'Transaction Failed!'})
 
 
-        return Response({
-            "status": payment_response["data"]["status"],
-            "amount": payment_response["data"]["amount"]/100,  # Convert from pesewa to GHS
-            "reference": payment_response["data"]["reference"],
-            "channel": payment_response["data"]["channel"],
-            "phone_number": payment_response["data"]["authorization"]["mobile_money_number"],
-            "provider": payment_response["data"]["authorization"]["bank"],
-            "candidate": {
-                "id": instance.candidate.id,
-                "name": instance.candidate.name,
-                },
-            "vote": instance.vote_count,
-            "completed_at": payment_response["data"]["paid_at"]
-        })
+        return Response(vote_initiation_data(payment_response, instance, instance.candidate))
 
 # Hubtel Webhook View
 from .models.webhook_log import WebhookLog
@@ -127,13 +203,14 @@ class HubtelWebhookView(APIView):
 
         try:
             with transaction.atomic():
-                tx = VoteTransaction.objects.select_for_update().get(payment_reference=reference, is_verified=False)
+                tx = VoteTransaction.objects.select_for_update().select_related('candidate').get(
+                    payment_reference=reference, is_verified=False
+                )
                 tx.is_verified = True
                 tx.save()
 
-                candidate = tx.candidate
-                candidate.vote_count = models.F("vote_count") + tx.vote_count
-                candidate.save(update_fields=['vote_count'])
+                record_votes({tx.candidate_id: tx.vote_count})
+                bump_results_versions([tx.candidate.event_id])
 
                 log.is_valid = True
                 log.save()
@@ -145,6 +222,7 @@ class HubtelWebhookView(APIView):
 class PaystackWebhookView(APIView):
     authentication_classes = []  # public
     permission_classes = []      # public
+    throttle_classes = []        # Paystack bursts from a handful of IPs; guarded by IP allowlist and signature
 
     def initial(self, request, *args, **kwargs):
         ip, is_routable = get_client_ip(request)
@@ -159,8 +237,6 @@ class PaystackWebhookView(APIView):
 
         payload = json.loads(raw_body)
         event = payload.get("event", "")
-        amount = payload.get("data", {}).get("amount", 0)
-        payment_status = payload.get("data", {}).get("status", None)
         ext_payment_id = payload.get("data", {}).get("id", None)
         metadata = payload.get("data", {}).get("metadata", {})
         product = -1
@@ -184,8 +260,15 @@ class PaystackWebhookView(APIView):
             logger.warning("Invalid signature, event: {%s}, external_payment_id: {%s}", event, ext_payment_id)
             raise PermissionDenied("Invalid signature")
 
-        # Save raw log
-        WebhookLog.objects.create(
+        # Acknowledge deliveries we have already accepted without touching anything else
+        idempotency_key = WebhookLog.make_idempotency_key("paystack", event, ext_payment_id)
+        if WebhookLog.objects.seen(idempotency_key):
+            logger.info("Duplicate webhook %s, already accepted", idempotency_key)
+            return Response({"detail": "accepted"}, status=status.HTTP_200_OK)
+
+        # Save raw log; settlement happens in the process_webhooks worker
+        log, created = WebhookLog.objects.log_delivery(
+            idempotency_key,
             event=event, 
             product=product,  # 0 for vote, 1 for ticket, -1 unknown
             instance_id=instance_id, # vote or ticket transaction id 
@@ -193,91 +276,31 @@ class PaystackWebhookView(APIView):
             is_valid=True
         )
 
-        if event == 'charge.success':
-            try:
-                with transaction.atomic():
-                    tx = Transaction.objects.select_for_update().get(external_payment_id=ext_payment_id, gateway="paystack")
-
-                    # Check for underpayment
-                    if Decimal(amount) / 100 < tx.amount:
-                        logger.error("Amount underpaid for transaction %s: expected %s, got %s", tx.id, tx.amount, Decimal(amount)/100)
-                        
-                    # Update transaction status
-                    tx.status = payment_status
-                    tx.save()
-
-                    # Process based on product type
-                    if product == 0 and payment_status == "success":  # p = 0 for vote payment
-                        vote_tx = VoteTransaction.objects.select_for_update().get(id=instance_id, is_verified=False)
-                        vote_tx.is_verified = True
-                        vote_tx.save()
-                        # Update candidate vote_count atomically
-                        Candidate.objects.filter(id=vote_tx.candidate.id).update(
-                            vote_count=models.F("vote_count") + vote_tx.vote_count
-                        )
-                    elif product == 1 and payment_status == "success":  # p = 1 for ticket payment
-                        # Send ticket email with QR code
-                        #No need to verify again since payment status is success
-                        ticket_tx = TicketSale.objects.select_for_update().get(id=instance_id)
-                        #TODO: send this to a queue for processing
-                        send_email(
-                            subject=f"Your Ticket for {ticket_tx.ticket.event.name}",
-                            template_name="emails/ticket.html",
-                            context={
-                                "customer_name": ticket_tx.recipient_name,
-                                "event_name": ticket_tx.ticket.event.name,
-                                "event_date": ticket_tx.ticket.event.start_time.strftime("%B %d, %Y at %I:%M %p"),
-                                "ticket_type": ticket_tx.ticket.type,
-                                "event_venue": ticket_tx.ticket.event.location,
-                                "ticket_id": ticket_tx.id,
-                                "amount": f"₵{ticket_tx.payment.amount}",
-                                "qr_code_url": "https://secureevote.com/media/qrcodes/TCK123456789.png",
-                                "year": 2025,
-                            },
-                            recipient_list=[ticket_tx.recipient_email],
-                        )
-                    else:
-                        logger.error("Unknown product type in metadata: %s", metadata.get("p"))
-
-            except Transaction.DoesNotExist:
-                logger.error("Transaction not found for external_payment_id: %s", ext_payment_id)
-                return Response({"detail": "Transaction not found"}, status=status.HTTP_404_NOT_FOUND)
-            except VoteTransaction.DoesNotExist:
-                logger.error("VoteTransaction not found or already verified for id: %s", metadata.get("id"))
-                return Response({}, status=status.HTTP_202_OK) # Already processed, return 200 since payment was successful
-            except Exception as e:
-                logger.error("Error processing webhook for external_payment_id %s: %s", ext_payment_id, str(e))
-                raise APIException("Error processing webhook for external_payment_id: %s", ext_payment_id)
+        if created and settings.WEBHOOK_SETTLE_INLINE:
+            settle_webhook_logs(ids=[log.id])
+            settle_vote_batch()
 
-            return Response(status=status.HTTP_200_OK)
-        
-        logger.info("Unhandled event type: %s", event)
-        return Response(status=status.HTTP_200_OK)
+        return Response({"detail": "accepted"}, status=status.HTTP_200_OK)
 
 # Vote Transactions History View 
 class VoteTransactionHistoryView(StandardResponseView, generics.ListAPIView):
+    serializer_class = VoteTransactionSerializer
     permission_classes = [IsOrganizer]
+    pagination_class = KeysetPagination
 
-    def get(self, request):
-        user = request.user
-
-        transactions = VoteTransaction.objects.filter(candidate__event__user=user).order_by('-created_at')
-        serializer = VoteTransactionSerializer(transactions, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        transactions = VoteTransaction.objects.filter(candidate__event__user=self.request.user).select_related('payment', 'candidate')
+        return filter_created_range(transactions, self.request)
 
 # Withdrawal Transactions History View
 class WithdrawalTransactionView(StandardResponseView, generics.ListAPIView, generics.CreateAPIView):
     serializer_class = WithdrawalTransactionSerializer
     permission_classes = [IsOrganizer]
+    pagination_class = KeysetPagination
 
-    def get(self, request):
-        user = request.user
-
-        transactions = WithdrawalTransaction.objects.filter(user=user, is_verified=True).order_by('-created_at')
-        serializer = WithdrawalTransactionSerializer(transactions, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        transactions = WithdrawalTransaction.objects.filter(user=self.request.user, is_verified=True).select_related('transaction')
+        return filter_created_range(transactions, self.request)
     
     def post(self, request):
         self.success_message = "Withdrawal transaction created successfully"
@@ -306,7 +329,7 @@ class WithdrawalTransactionView(StandardResponseView, generics.ListAPIView, gene
             serializer.save(otp=otp, user=request.user, transaction=transaction)
 
             try:
-                send_email(
+                queue_email(
                     subject="Confirm Your Withdrawal - SecureEVote",
                     template_name="emails/withdraw_request_confirmation.html",
                     context={
@@ -320,7 +343,7 @@ class WithdrawalTransactionView(StandardResponseView, generics.ListAPIView, gene
                     recipient_list=[request.user.email],
                 )
             except Exception as e:
-                logger.error(f"Error sending email: {e}", exc_info=True)
+                logger.error(f"Error queueing email: {e}", exc_info=True)
                 raise e
 
         else:
@@ -397,6 +420,8 @@ class TicketPaymentView(StandardResponseView):
         provider = serializer.validated_data.pop('provider')
 
         ticket = serializer.validated_data.get('ticket')
+        admission_token = hold_ticket(ticket, serializer.validated_data.pop('admission_token', None))
+        instance = None
 
         try:
             amount = ticket.price
@@ -412,7 +437,7 @@ class TicketPaymentView(StandardResponseView):
                 gateway='paystack',
             )
 
-            instance = serializer.save(payment=payment)
+            instance = serializer.save(payment=payment, hold_expires_at=hold_expiry())
 
             if channel == 'momo':
                 payment_response = charge_mobile_money(int(ticket.price), phone_number, provider, metadata={"p":1, "id": str(instance.id)})    # p = 1 for ticket payment, id = ticket sale id
@@ -422,6 +447,8 @@ class TicketPaymentView(StandardResponseView):
                 raise ValidationError({"detail":"Unsupported payment channel this resource."})
 
         except Exception as e:
+            release_failed_hold(ticket.pk, instance, admission_token)
+
             # If it's a DRF exception, raise it again without altering
             if isinstance(e, (APIException, ValidationError)):
                 raise e
@@ -430,19 +457,206 @@ class TicketPaymentView(StandardResponseView):
             raise APIException({'detail': 'Transaction Failed!'})
 
 
-        return Response({
-            "status": payment_response["data"]["status"],
-            "amount": payment_response["data"]["amount"]/100,  # Convert from pesewa to GHS
-            "reference": payment_response["data"]["reference"],
-            "channel": payment_response["data"]["channel"],
-            "phone_number": payment_response["data"]["authorization"]["mobile_money_number"],
-            "provider": payment_response["data"]["authorization"]["bank"],
-            "ticket": {
-                "type": instance.ticket.type,
-                "owner_contact": instance.recipient_contact,
-                "owner_name": instance.recipient_name,
-                "event": instance.ticket.event.name,
-                },
-            "completed_at": payment_response["data"]["paid_at"]
-        })
-    
\ No newline at end of file
+        return Response(ticket_initiation_data(payment_response, instance, instance.ticket))
+    
+# Async (ASGI) initiation views
+# Same contract as InitiateVoteView and TicketPaymentView, but the Paystack round-trip
+# does not hold a worker: under an ASGI server (config/asgi.py) one process can keep
+# many initiations in flight. DRF views are sync-only, so these are plain Django views.
+import abc
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.throttling import AnonRateThrottle
+from services.services import acharge_mobile_money
+from utils.exceptions import custom_exception_handler
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncInitiationView(abc.ABC, View):
+    """
+    Base class for async payment initiation. Subclasses implement `initiate()`.
+    Responses use the same {status, message, data} envelope as StandardResponseView.
+    """
+    http_method_names = ['post']
+    serializer_class = None
+    throttle_classes = [AnonRateThrottle]
+    success_message = "transaction initiated successfully"
+
+    def respond(self, data=None, message=None, status_code=200):
+        return JsonResponse({
+            "status": status_code < 400,
+            "message": message,
+            "data": data,
+        }, status=status_code)
+
+    def respond_error(self, exc):
+        response = custom_exception_handler(exc, {"view": self})
+        return JsonResponse(response.data, status=response.status_code)
+
+    def allow_request(self, request):
+        return all(throttle().allow_request(request, self) for throttle in self.throttle_classes)
+
+    async def post(self, request):
+        if not await sync_to_async(self.allow_request)(request):
+            return self.respond(message="Request was throttled.", status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return self.respond(message="Invalid JSON body", status_code=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.serializer_class(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return self.respond(data={'detail': serializer.errors}, status_code=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = await self.initiate(serializer.validated_data)
+        except APIException as e:
+            return self.respond_error(e)
+        except Exception as e:
+            error_logger.error('Error creating transaction: %s', str(e), exc_info=True)
+            return self.respond_error(APIException({'detail': 'Transaction Failed!'}))
+
+        return self.respond(data=result, message=self.success_message)
+
+    @abc.abstractmethod
+    async def initiate(self, validated_data):
+        """
+        Start the payment for validated request data. Returns the response `data`.
+        """
+
+class AsyncInitiateVoteView(AsyncInitiationView):
+    serializer_class = VoteTransactionSerializer
+
+    async def initiate(self, validated_data):
+        phone_number = validated_data.pop('phone_number')
+        channel = validated_data.pop('channel')
+        provider = validated_data.pop('provider')
+        vote_count = validated_data.get('vote_count')
+
+        if vote_count <= 0 or not phone_number:
+            raise ValidationError({'detail': 'Invalid input'})
+        if channel != 'momo':
+            raise ValidationError({"detail":"Unsupported payment channel this resource."})
+
+        candidate = await Candidate.objects.select_related('event').aget(pk=validated_data['candidate'].pk)
+        amount = abs(candidate.event.amount_per_vote * int(vote_count))
+
+        payment = await Transaction.objects.acreate(
+            amount=amount,
+            channel=channel,
+            provider=provider,
+            phone_number=phone_number,
+            status='pending',
+            currency='GHS',
+            type='payment',
+            desc=f"{vote_count} votes for {candidate.name} ({candidate.event.name})",
+            gateway='paystack',
+        )
+        instance = await VoteTransaction.objects.acreate(candidate=candidate, vote_count=vote_count, payment=payment)
+
+        payment_response = await acharge_mobile_money(amount, phone_number, provider, metadata={"p":0, "id": str(instance.id)})    # p = 0 for vote payment, id = vote transaction id
+        payment.external_payment_id = payment_response.get('data')['id']
+        await payment.asave(update_fields=['external_payment_id', 'updated_at'])
+
+        return vote_initiation_data(payment_response, instance, candidate)
+
+class AsyncTicketPaymentView(AsyncInitiationView):
+    serializer_class = TicketTransactionSerializer
+
+    async def initiate(self, validated_data):
+        phone_number = validated_data.pop('phone_number')
+        channel = validated_data.pop('channel')
+        provider = validated_data.pop('provider')
+
+        if channel != 'momo':
+            raise ValidationError({"detail":"Unsupported payment channel this resource."})
+
+        ticket = await Ticket.objects.select_related('event').aget(pk=validated_data.pop('ticket').pk)
+        admission_token = await sync_to_async(hold_ticket)(ticket, validated_data.pop('admission_token', None))
+        instance = None
+
+        try:
+            payment = await Transaction.objects.acreate(
+                amount=ticket.price,
+                channel=channel,
+                provider=provider,
+                phone_number=phone_number,
+                status='pending',
+                currency='GHS',
+                type='payment',
+                desc=f"Payment for ticket {ticket.type} ({ticket.event.name})",
+                gateway='paystack',
+            )
+            instance = await TicketSale.objects.acreate(ticket=ticket, payment=payment, hold_expires_at=hold_expiry(), **validated_data)
+
+            payment_response = await acharge_mobile_money(int(ticket.price), phone_number, provider, metadata={"p":1, "id": str(instance.id)})    # p = 1 for ticket payment, id = ticket sale id
+            payment.external_payment_id = payment_response.get('data')['id']
+            await payment.asave(update_fields=['external_payment_id', 'updated_at'])
+        except Exception:
+            await sync_to_async(release_failed_hold)(ticket.pk, instance, admission_token)
+            raise
+
+        return ticket_initiation_data(payment_response, instance, ticket)
+
+
+class WaitingRoomJoinView(StandardResponseView):
+    """
+    Join the waiting room of a ticket tier. The returned token is polled on
+    `tickets/queue` and, once admitted, sent as `admission_token` with the
+    ticket purchase.
+    """
+    permission_classes = []
+    success_message = "Joined the waiting room"
+
+    def post(self, request, ticket_id):
+        ticket = get_object_or_404(Ticket.objects.only('id'), pk=ticket_id, is_active=True)
+        token = waiting_room.join(ticket.pk)
+        return Response({**waiting_room.status(token), "token": token})
+
+class WaitingRoomStatusView(StandardResponseView):
+    """
+    Where a waiting room token stands in line. Answered from the cache;
+    `Retry-After` suggests when to poll again.
+    """
+    permission_classes = []
+    throttle_classes = []  # polled by everyone in line; never touches the database
+    success_message = "Waiting room status"
+
+    def get(self, request):
+        token = request.query_params.get('token', '')
+        try:
+            data = waiting_room.status(token)
+        except signing.BadSignature:
+            raise ValidationError({'detail': 'Invalid or expired waiting room token.'})
+
+        headers = {} if data['admitted'] else {'Retry-After': str(min(max(data['eta_seconds'], 1), 30))}
+        return Response({**data, "token": token}, headers=headers)
+
+
+class ExportView(APIView):
+    """
+    Streams an organizer's `votes`, `tickets` or `transactions` as CSV or NDJSON,
+    e.g. `exports/votes.csv?event=3&from=2025-06-01&columns=created_at,candidate,vote_count`.
+
+    Errors are JSON (through the exception handler); successful responses are
+    the raw file, without the {status, message, data} envelope.
+    """
+    permission_classes = [IsOrganizer]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Accept: text/csv is fine; the stream bypasses the renderers
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, dataset, fmt):
+        if dataset not in DATASETS or fmt not in FORMATS:
+            raise NotFound({'detail': 'Unknown export.'})
+
+        columns = select_columns(dataset, request.query_params.get('columns'))
+        rows = export_rows(dataset, request.user, request, columns)
+
+        response = StreamingHttpResponse(STREAMERS[fmt](columns, rows), content_type=FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{dataset}-{timezone.localdate():%Y%m%d}.{fmt}"'
+        return response
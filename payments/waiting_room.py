@@ -0,0 +1,149 @@
+"""
+A virtual waiting room for hot ticket on-sales.
+
+Buyers of a ticket tier with `waiting_room` on join a FIFO queue and get a
+signed token carrying their place in line. The room admits places in order
+at WAITING_ROOM_ADMISSION_RATE per second, so the payment path (and its
+Paystack calls) sees a steady stream it can serve instead of the stampede.
+A token is checked by the ticket payment views and can be used once.
+
+All state lives in the cache (a few counters per tier), so polling never
+touches the database. That cache must be shared by every worker (set
+CACHE_BACKEND to Redis or Memcached): with a per-process cache each worker
+would keep its own line, multiplying the admission rate and letting a token
+buy once per worker. Outside DEBUG the room refuses to run on one.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+SALT = "payments.waiting_room"
+CATCH_UP_SECONDS = 5
+PER_PROCESS_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def _check_cache():
+    if settings.CACHES["default"]["BACKEND"] in PER_PROCESS_CACHES and not settings.DEBUG:
+        raise ImproperlyConfigured(
+            "The ticket waiting room needs a cache shared by every worker; set CACHE_BACKEND to Redis or Memcached."
+        )
+
+
+def _key(ticket_id, name):
+    return f"waitroom:{ticket_id}:{name}"
+
+
+def _counter(key):
+    cache.add(key, 0, None)
+    return key
+
+
+def join(ticket_id):
+    """
+    Take the next place in line for a ticket tier.
+
+    Returns:
+        str: The signed admission token for that place.
+
+    Raises:
+        ImproperlyConfigured: The cache is per process (see module docs).
+    """
+    _check_cache()
+    position = cache.incr(_counter(_key(ticket_id, "tail")))
+    return signing.dumps({"t": str(ticket_id), "n": position}, salt=SALT)
+
+
+def admitted_upto(ticket_id):
+    """
+    The last place in line that has been admitted, advancing it by the
+    admission rate for the time since the last advance. Places are never
+    admitted ahead of the queue, so quiet periods do not bank capacity.
+
+    Raises:
+        ImproperlyConfigured: The cache is per process (see module docs).
+    """
+    _check_cache()
+    admitted_key = _counter(_key(ticket_id, "admitted"))
+    now = time.time()
+    # One caller per tick moves the watermark; everyone else reads it
+    if cache.add(_key(ticket_id, "advancing"), 1, settings.WAITING_ROOM_TICK):
+        rate = settings.WAITING_ROOM_ADMISSION_RATE
+        last = cache.get(_key(ticket_id, "advanced_at"))
+        tail = cache.get(_key(ticket_id, "tail")) or 0
+        admitted = cache.get(admitted_key) or 0
+        if last is None or admitted >= tail:
+            # (Re)start the clock: an empty queue is owed nothing
+            cache.set(_key(ticket_id, "advanced_at"), now, None)
+        else:
+            # Time nobody polled in is only owed up to CATCH_UP_SECONDS, so a quiet
+            # spell cannot let a fresh stampede straight through
+            since = max(last, now - CATCH_UP_SECONDS)
+            step = math.floor((now - since) * rate)
+            if step > 0:
+                cache.set(admitted_key, min(tail, admitted + step), None)
+                cache.set(_key(ticket_id, "advanced_at"), since + step / rate, None)
+    return cache.get(admitted_key) or 0
+
+
+def read_token(token, ticket_id=None):
+    """
+    Returns:
+        tuple: (ticket id, place in line) from a token this room issued.
+
+    Raises:
+        signing.BadSignature: The token is forged, expired or for another tier.
+    """
+    data = signing.loads(token, salt=SALT, max_age=settings.WAITING_ROOM_TOKEN_MAX_AGE)
+    if ticket_id is not None and data["t"] != str(ticket_id):
+        raise signing.BadSignature("Token is for another ticket")
+    return data["t"], data["n"]
+
+
+def status(token):
+    """
+    Where a token's holder stands in line.
+
+    Raises:
+        signing.BadSignature: See `read_token`.
+    """
+    ticket_id, position = read_token(token)
+    admitted = admitted_upto(ticket_id)
+    ahead = max(position - admitted - 1, 0)
+    return {
+        "ticket": ticket_id,
+        "position": position,
+        "admitted": position <= admitted,
+        "ahead": ahead,
+        "eta_seconds": math.ceil((ahead + 1) / settings.WAITING_ROOM_ADMISSION_RATE) if position > admitted else 0,
+    }
+
+
+def admit(token, ticket_id):
+    """
+    Use an admitted token to buy `ticket_id`. Each place in line buys once.
+
+    Returns:
+        bool: True if the holder was admitted and had not used the token yet.
+    """
+    try:
+        _, position = read_token(token, ticket_id)
+    except signing.BadSignature:
+        return False
+    if position > admitted_upto(ticket_id):
+        return False
+    return cache.add(_key(ticket_id, f"used:{position}"), 1, settings.WAITING_ROOM_TOKEN_MAX_AGE)
+
+
+def give_back(token, ticket_id):
+    """
+    Make a token usable again after the purchase it was used for failed.
+    """
+    _, position = read_token(token, ticket_id)
+    cache.delete(_key(ticket_id, f"used:{position}"))
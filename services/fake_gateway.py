@@ -0,0 +1,300 @@
+"""
+A local stand-in for Paystack and Hubtel, for load and soak tests that must
+not touch the network.
+
+`FakeGateway` answers `POST /charge` the way Paystack does, after a random
+latency and with a configurable share of 503s, and then fires a signed
+`charge.success` webhook back at the app after a log-normal lag, sometimes
+twice, as Paystack does on retries. Hubtel's online checkout initiation is
+answered the same way, without a callback.
+
+It can run in-process, plugged into the gateway clients with
+GATEWAY_BACKEND = "fake" (see `services.gateway`), or as a localhost server
+(`manage.py fake_gateway`) for a server pointed at it via PAYSTACK_BASE_URL.
+"""
+import asyncio
+import functools
+import hashlib
+import heapq
+import hmac
+import io
+import itertools
+import json
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from decouple import config
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger("paystack")
+
+HUBTEL_CHECKOUT = "/payment/v1/merchantaccount/onlinecheckout/initiate"
+
+
+class WebhookSender:
+    """
+    Delivers signed Paystack webhooks at scheduled times from a small pool
+    of threads. `on_delivery(seconds, status)` is called after each attempt.
+    """
+
+    def __init__(self, url, secret, workers=4, on_delivery=None):
+        self.url = url
+        self.secret = secret.encode()
+        self.on_delivery = on_delivery
+        self.queue = []
+        self.cond = threading.Condition()
+        self.pending = 0
+        self.closed = False
+        self.order = itertools.count()  # breaks ties between deliveries due at the same time
+        self.threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def schedule(self, payload, delay):
+        body = json.dumps(payload)
+        with self.cond:
+            heapq.heappush(self.queue, (time.monotonic() + delay, next(self.order), body))
+            self.pending += 1
+            self.cond.notify()
+
+    def _run(self):
+        session = requests.Session()
+        while True:
+            with self.cond:
+                while not self.closed and (not self.queue or self.queue[0][0] > time.monotonic()):
+                    self.cond.wait(timeout=self.queue[0][0] - time.monotonic() if self.queue else None)
+                if self.closed:
+                    return
+                _, _, body = heapq.heappop(self.queue)
+            self._deliver(session, body)
+            with self.cond:
+                self.pending -= 1
+                self.cond.notify_all()
+
+    def _deliver(self, session, body):
+        signature = hmac.new(self.secret, body.encode(), hashlib.sha512).hexdigest()
+        started = time.perf_counter()
+        try:
+            response = session.post(self.url, data=body, timeout=30, headers={
+                "Content-Type": "application/json", "X-Paystack-Signature": signature,
+            })
+            status = response.status_code
+        except requests.RequestException as e:
+            logger.error("Fake gateway could not deliver webhook to %s: %s", self.url, e)
+            status = type(e).__name__
+        if self.on_delivery:
+            self.on_delivery(time.perf_counter() - started, status)
+
+    def drain(self, timeout):
+        """
+        Wait up to `timeout` seconds for scheduled deliveries, then stop.
+        Returns the number left undelivered.
+        """
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while self.pending and time.monotonic() < deadline:
+                self.cond.wait(timeout=max(deadline - time.monotonic(), 0))
+            self.closed = True
+            self.cond.notify_all()
+            return self.pending
+
+
+class FakeGateway:
+    """
+    The fake Paystack (and Hubtel) itself. `handle()` turns one API call into
+    a status, a JSON body and how long to wait before answering; transports
+    apply the wait in their own way (sleep or await).
+    """
+
+    def __init__(self, webhook_url, secret, latency=0.0, failure_rate=0.0, webhook_lag=2.0,
+                 duplicate_rate=0.0, on_delivery=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.webhook_lag = webhook_lag
+        self.duplicate_rate = duplicate_rate
+        self.webhooks = WebhookSender(webhook_url, secret, on_delivery=on_delivery)
+        self.ids = itertools.count(int(time.time()) * 1000)
+        self.lock = threading.Lock()
+        self.charges = 0
+        self.failures = 0
+        self.duplicates = 0
+
+    def handle(self, method, path, body):
+        """
+        Returns:
+            tuple: (status code, JSON-serializable body, delay in seconds)
+        """
+        delay = random.expovariate(1 / self.latency) if self.latency else 0
+        routes = {"/charge": self.charge, HUBTEL_CHECKOUT: self.checkout}
+        route = routes.get(path.rstrip("/")) if method == "POST" else None
+        if route is None:
+            return 404, {"status": False, "message": "Not found"}, delay
+        if random.random() < self.failure_rate:
+            with self.lock:
+                self.failures += 1
+            return 503, {"status": False, "message": "Service unavailable"}, delay
+        return 200, route(body), delay
+
+    def charge(self, body):
+        """
+        Paystack's answer to `POST /charge`; schedules its webhooks.
+        """
+        charge_id = next(self.ids)
+        self.charged(charge_id, body)
+        mobile_money = body.get("mobile_money") or {}
+        return {
+            "status": True,
+            "message": "Charge attempted",
+            "data": {
+                "id": charge_id, "status": "send_otp", "amount": body.get("amount"),
+                "reference": f"fake-{charge_id}", "channel": "mobile_money",
+                "authorization": {"mobile_money_number": mobile_money.get("phone"), "bank": mobile_money.get("provider")},
+                "paid_at": None,
+            },
+        }
+
+    def checkout(self, body):
+        """
+        Hubtel's answer to an online checkout initiation. No callback follows:
+        the buyer would complete the checkout on Hubtel's page.
+        """
+        checkout_id = f"fake-{next(self.ids)}"
+        return {
+            "responseCode": "0000",
+            "status": "Success",
+            "data": {
+                "checkoutUrl": f"https://pay.hubtel.com/{checkout_id}",
+                "checkoutDirectUrl": f"https://pay.hubtel.com/{checkout_id}/direct",
+                "checkoutId": checkout_id,
+                "clientReference": body.get("clientReference"),
+                "message": "",
+            },
+        }
+
+    def charged(self, charge_id, body):
+        """
+        Schedule the webhook(s) Paystack would send for an accepted charge.
+        """
+        payload = {
+            "event": "charge.success",
+            "data": {
+                "id": charge_id, "status": "success", "amount": body.get("amount"),
+                "currency": body.get("currency", "GHS"), "channel": "mobile_money", "metadata": body.get("metadata"),
+            },
+        }
+        lag = random.lognormvariate(math.log(self.webhook_lag), 0.6) if self.webhook_lag else 0
+        self.webhooks.schedule(payload, lag)
+        duplicate = random.random() < self.duplicate_rate
+        if duplicate:
+            self.webhooks.schedule(payload, lag + random.uniform(1, 5) * max(self.webhook_lag, 0.01))
+        with self.lock:
+            self.charges += 1
+            self.duplicates += duplicate
+
+
+def _path(url, base_url):
+    """
+    The API path of `url`, relative to the client's base URL.
+    """
+    path, prefix = urlsplit(url).path, urlsplit(base_url).path.rstrip("/")
+    return path[len(prefix):] if prefix and path.startswith(prefix) else path
+
+
+class FakeGatewayAdapter(BaseAdapter):
+    """
+    A `requests` transport adapter that answers from a FakeGateway instead
+    of the network.
+    """
+
+    def __init__(self, gateway, base_url):
+        super().__init__()
+        self.gateway = gateway
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        body = json.loads(request.body or b"{}")
+        status, payload, delay = self.gateway.handle(request.method, _path(request.url, self.base_url), body)
+        time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response.raw = io.BytesIO(json.dumps(payload).encode())
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        return response
+
+    def close(self):
+        pass
+
+
+class AsyncFakeGatewayTransport(httpx.AsyncBaseTransport):
+    """
+    The httpx counterpart of `FakeGatewayAdapter`.
+    """
+
+    def __init__(self, gateway, base_url):
+        self.gateway = gateway
+        self.base_url = base_url.rstrip("/")
+
+    async def handle_async_request(self, request):
+        body = json.loads(await request.aread() or b"{}")
+        status, payload, delay = self.gateway.handle(request.method, _path(str(request.url), self.base_url), body)
+        await asyncio.sleep(delay)
+        return httpx.Response(status, json=payload, request=request)
+
+
+def serve(gateway, host="127.0.0.1", port=0):
+    """
+    Build a threaded localhost HTTP server answering from `gateway`. Call
+    `serve_forever()` on it (in a thread, if need be) and `shutdown()` to stop.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            status, payload, delay = gateway.handle("POST", self.path.split("?")[0], body)
+            time.sleep(delay)
+
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+@functools.lru_cache(maxsize=None)
+def get_fake_gateway():
+    """
+    Returns the process-wide fake gateway configured from the FAKE_GATEWAY_*
+    settings. Refuses to run with a live Paystack key, since it would
+    confirm payments that never happened.
+    """
+    secret = config("PAYSTACK_SECRET_KEY")
+    if secret.startswith("sk_live_"):
+        raise ImproperlyConfigured("The fake gateway cannot be used with a live PAYSTACK_SECRET_KEY")
+    return FakeGateway(
+        settings.FAKE_GATEWAY_WEBHOOK_URL, secret,
+        latency=settings.FAKE_GATEWAY_LATENCY,
+        failure_rate=settings.FAKE_GATEWAY_FAILURE_RATE,
+        webhook_lag=settings.FAKE_GATEWAY_WEBHOOK_LAG,
+        duplicate_rate=settings.FAKE_GATEWAY_DUPLICATE_RATE,
+    )
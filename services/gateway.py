@@ -0,0 +1,172 @@
+import asyncio
+import functools
+import weakref
+
+import httpx
+import requests
+from decouple import config
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.metrics import gateway_request_duration
+
+
+class GatewayClient:
+    """
+    A keep-alive HTTP client for one payment/SMS gateway.
+
+    Each client owns a `requests.Session` with a connection pool of
+    `GATEWAY_POOL_SIZE` connections, so repeated calls reuse the same TCP/TLS
+    connection instead of handshaking every time. Idempotent requests
+    (GET, HEAD, ...) are retried with jittered backoff on connection errors
+    and 429/5xx responses; POSTs are only retried if the connection could not
+    be established, so a charge is never sent twice.
+    """
+
+    def __init__(self, name, base_url, headers=None, timeout=10, pool_size=10, retries=2, transport=None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.2,
+            backoff_jitter=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = transport or HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or {})
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        with gateway_request_duration.time(gateway=self.name, method=method, outcome="error") as labels:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            labels["outcome"] = f"{response.status_code // 100}xx"
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+
+class AsyncGatewayClient:
+    """
+    The asyncio counterpart of `GatewayClient`, built on `httpx.AsyncClient`.
+
+    Connection failures are retried `retries` times; nothing is retried once
+    a request has been sent.
+    """
+
+    def __init__(self, name, base_url, headers=None, timeout=10, pool_size=10, retries=2, transport=None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.AsyncClient(
+            headers=headers or {},
+            timeout=timeout,
+            transport=transport or httpx.AsyncHTTPTransport(retries=retries, limits=limits),
+        )
+
+    async def request(self, method, path, **kwargs):
+        with gateway_request_duration.time(gateway=self.name, method=method, outcome="error") as labels:
+            response = await self.client.request(method, f"{self.base_url}{path}", **kwargs)
+            labels["outcome"] = f"{response.status_code // 100}xx"
+        return response
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+
+def _paystack():
+    return dict(
+        base_url=settings.PAYSTACK_BASE_URL,
+        headers={"Authorization": f"Bearer {config('PAYSTACK_SECRET_KEY')}"},
+        timeout=settings.PAYSTACK_TIMEOUT,
+    )
+
+def _arkesel():
+    return dict(
+        base_url=settings.ARKESEL_BASE_URL,
+        headers={"api-key": config("SMS_API_KEY")},
+        timeout=settings.ARKESEL_TIMEOUT,
+    )
+
+def _hubtel():
+    return dict(
+        base_url=settings.HUBTEL_BASE_URL,
+        headers={"Authorization": f"Basic {config('HUBTEL_AUTH_BASE64', default='your_base64_encoded_credentials')}"},
+        timeout=settings.HUBTEL_TIMEOUT,
+    )
+
+GATEWAYS = {
+    "paystack": _paystack,
+    "arkesel": _arkesel,
+    "hubtel": _hubtel,
+}
+
+# Gateways the "fake" backend can stand in for (see services.fake_gateway)
+FAKE_GATEWAYS = {"paystack", "hubtel"}
+
+def _options(name):
+    return dict(
+        GATEWAYS[name](),
+        pool_size=settings.GATEWAY_POOL_SIZE,
+        retries=settings.GATEWAY_RETRIES,
+    )
+
+def _fake(name):
+    """
+    The fake gateway to answer `name`'s calls, or None to use the network.
+    """
+    if settings.GATEWAY_BACKEND == "live" or name not in FAKE_GATEWAYS:
+        return None
+    if settings.GATEWAY_BACKEND != "fake":
+        raise ImproperlyConfigured(f"Unknown GATEWAY_BACKEND {settings.GATEWAY_BACKEND!r}; use 'live' or 'fake'")
+    from services.fake_gateway import get_fake_gateway
+    return get_fake_gateway()
+
+@functools.lru_cache(maxsize=None)
+def get_client(name):
+    """
+    Returns the process-wide client for a gateway, building it (and resolving
+    its credentials) on first use.
+    """
+    options = _options(name)
+    fake = _fake(name)
+    if fake:
+        from services.fake_gateway import FakeGatewayAdapter
+        options["transport"] = FakeGatewayAdapter(fake, options["base_url"])
+    return GatewayClient(name, **options)
+
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_async_client(name):
+    """
+    Returns the async client for a gateway bound to the running event loop.
+
+    httpx connection pools cannot be shared between event loops, so clients
+    are cached per loop; under an ASGI server that is one pool per process.
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if name not in clients:
+        options = _options(name)
+        fake = _fake(name)
+        if fake:
+            from services.fake_gateway import AsyncFakeGatewayTransport
+            options["transport"] = AsyncFakeGatewayTransport(fake, options["base_url"])
+        clients[name] = AsyncGatewayClient(name, **options)
+    return clients[name]
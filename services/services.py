@@ -1,5 +1,5 @@
+import httpx
 import requests
-from decouple import config
 from rest_framework.exceptions import (
     ValidationError,
     APIException
@@ -9,6 +9,8 @@ from uuid import UUID
 from django.core.mail import send_mail
 from django.template.loader import get_template
 from django.conf import settings
+from payments.models.email_outbox import OutboundEmail
+from services.gateway import get_async_client, get_client
 
 logger = logging.getLogger("paystack")
 
@@ -23,14 +25,6 @@ def send_sms(recipients: list, message: str) -> bool:
     Returns:
         bool: True if the SMS was sent successfully, False otherwise.
     """
-    url = "https://sms.arkesel.com/api/v2/sms/send"
-    api_key = config("SMS_API_KEY")
-    
-    headers = {
-        "api-key": api_key,
-        "Content-Type": "application/json"
-    }
-
     body = {
         "sender": "Hello world",
         "message":message,
@@ -39,7 +33,7 @@ def send_sms(recipients: list, message: str) -> bool:
     }
     
     try:
-        response = requests.post(url=url,headers=headers, json=body)
+        response = get_client("arkesel").post("/api/v2/sms/send", json=body)
         response.raise_for_status()
         print(response.json())
         return response.json().get("status", False)
@@ -54,16 +48,8 @@ def check_sms_balance():
     Returns:
         dict: A dictionary containing balance details if successful, None otherwise.
     """
-    api_url = "https://sms.arkesel.com/api/v2/clients/balance-details"
-    api_key = config("SMS_API_KEY")
-    
-    headers = {
-        "api-key": api_key,
-        "Content-Type": "application/json"
-    }
-
     try:
-        response = requests.get(api_url, headers=headers) 
+        response = get_client("arkesel").get("/api/v2/clients/balance-details")
         response.raise_for_status()
         print(response.json())
         return response.json().get("status", None)
@@ -71,25 +57,8 @@ def check_sms_balance():
         print(f"Error sending SMS: {e}")
         return False
     
-def charge_mobile_money(amount:int, phone_number:str, provider:str, email:str=None, metadata:dict=None):
-    """
-    Debit the account by the specified amount via mobile money.
-    
-    Args:
-        amount (float): The amount to debit.
-        
-    Returns:
-        bool: True if the transaction was successful, False otherwise.
-    """
-    url = "https://api.paystack.co/charge"
-    api_key = config("PAYSTACK_SECRET_KEY")
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
+def _charge_payload(amount, phone_number, provider, email=None, metadata=None):
+    return {
         "email": email or "customer@osx.com",
         "amount": int(amount*100),  # Paystack expects amount in the smallest currency unit (pesewa)
         "currency": "GHS",
@@ -101,15 +70,37 @@ def charge_mobile_money(amount:int, phone_number:str, provider:str, email:str=No
         # "reference": id # uncomment to provide your own reference
     }
 
+def _charge_result(data):
+    # If status is False in Paystack response, treat as ValidationError
+    if not data.get("status", False):
+        logger.error("Paystack returned an error: %s", data)
+        raise ValidationError(data.get("message", "Unknown error"))
+
+    return data
+
+def _log_charge_rejection(response):
+    if response.status_code == 401:
+        logger.error("Paystack API key Invalid: %s", response.json())
+    elif response.status_code == 400:
+        logger.error("Paystack Validation error: %s", response.json())
+
+def charge_mobile_money(amount:int, phone_number:str, provider:str, email:str=None, metadata:dict=None):
+    """
+    Debit the account by the specified amount via mobile money.
+    
+    Args:
+        amount (float): The amount to debit.
+        
+    Returns:
+        bool: True if the transaction was successful, False otherwise.
+    """
+    payload = _charge_payload(amount, phone_number, provider, email, metadata)
+
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = get_client("paystack").post("/charge", json=payload)
         response.raise_for_status()
     except requests.exceptions.HTTPError:
-        if response.status_code == 401:
-            logger.error("Paystack API key Invalid: %s", response.json())
-        elif response.status_code == 400:
-            logger.error("Paystack Validation error: %s", response.json())
-        
+        _log_charge_rejection(response)
         raise APIException("internal error") # Paystack error
     except requests.exceptions.Timeout:
         logger.error("Paystack request timed out.")
@@ -121,14 +112,31 @@ def charge_mobile_money(amount:int, phone_number:str, provider:str, email:str=No
         logger.error("Unexpected error: %s", str(e), exc_info=True)
         raise APIException("An unexpected error occured.")
 
-    data = response.json()
+    return _charge_result(response.json())
 
-    # If status is False in Paystack response, treat as ValidationError
-    if not data.get("status", False):
-        logger.error("Paystack returned an error: %s", data)
-        raise ValidationError(data.get("message", "Unknown error"))
+async def acharge_mobile_money(amount:int, phone_number:str, provider:str, email:str=None, metadata:dict=None):
+    """
+    Async version of `charge_mobile_money` for ASGI views; raises the same errors.
+    """
+    payload = _charge_payload(amount, phone_number, provider, email, metadata)
 
-    return data
+    try:
+        response = await get_async_client("paystack").post("/charge", json=payload)
+        response.raise_for_status()
+    except httpx.HTTPStatusError:
+        _log_charge_rejection(response)
+        raise APIException("internal error") # Paystack error
+    except httpx.TimeoutException:
+        logger.error("Paystack request timed out.")
+        raise APIException("internal error")
+    except httpx.TransportError:
+        logger.error("Failed to connect to Paystack.")
+        raise APIException("internal error")
+    except Exception as e:
+        logger.error("Unexpected error: %s", str(e), exc_info=True)
+        raise APIException("An unexpected error occured.")
+
+    return _charge_result(response.json())
 
 def send_email(subject, template_name, context, recipient_list):
     """
@@ -146,3 +154,19 @@ def send_email(subject, template_name, context, recipient_list):
         fail_silently=False,
     )
 
+def queue_email(subject, template_name, context, recipient_list):
+    """
+    Queue a templated HTML email for delivery by the `send_queued_emails` worker.
+
+    Takes the same arguments as `send_email`. Calling this inside a database
+    transaction ties the email to the commit: nothing is sent if it rolls back.
+
+    Returns:
+        OutboundEmail: The queued email.
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        template_name=template_name,
+        context=context,
+        recipient_list=list(recipient_list),
+    )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TallyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tally'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,91 @@
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+
+from core.models.candidate import Candidate
+from core.models.vote_counter import VoteShard
+
+
+class _MissingShards(Exception):
+    """Raised inside a savepoint when some shard rows do not exist yet."""
+
+
+def _case(mapping, key="pk"):
+    """
+    Build a `CASE key WHEN k THEN v ... END` expression from a dict.
+    """
+    return Case(
+        *[When(**{key: k}, then=Value(v)) for k, v in mapping.items()],
+        default=Value(0),
+        output_field=models.PositiveIntegerField(),
+    )
+
+
+def _increment_shard(shard, counts):
+    return VoteShard.objects.filter(shard=shard, candidate_id__in=counts.keys()).update(
+        votes=F("votes") + _case(counts, key="candidate_id")
+    )
+
+
+def record_votes(counts):
+    """
+    Add votes to candidates through their vote shards.
+
+    Args:
+        counts (dict): Mapping of candidate id -> number of votes to add.
+
+    All candidates in one call land on the same randomly picked shard, so the
+    whole batch is a single UPDATE. Shard rows are created on first use.
+    """
+    counts = {candidate_id: n for candidate_id, n in counts.items() if n}
+    if not counts:
+        return
+
+    shard = random.randrange(settings.VOTE_COUNTER_SHARDS)
+    try:
+        with transaction.atomic():
+            if _increment_shard(shard, counts) != len(counts):
+                raise _MissingShards  # roll back the partial increment
+    except _MissingShards:
+        VoteShard.objects.bulk_create(
+            [VoteShard(candidate_id=candidate_id, shard=shard) for candidate_id in counts],
+            ignore_conflicts=True,
+        )
+        _increment_shard(shard, counts)
+
+
+def flush_vote_shards(batch_size=500):
+    """
+    Fold pending shard votes into `Candidate.vote_count`.
+
+    Shards locked by a concurrent increment are skipped and picked up on the
+    next run. Returns the number of votes moved.
+    """
+    moved = 0
+    while True:
+        with transaction.atomic():
+            shards = list(
+                VoteShard.objects.select_for_update(skip_locked=True)
+                .filter(votes__gt=0)
+                .values_list("id", "candidate_id", "votes")[:batch_size]
+            )
+            if not shards:
+                return moved
+
+            totals = defaultdict(int)
+            for _, candidate_id, votes in shards:
+                totals[candidate_id] += votes
+
+            Candidate.objects.filter(pk__in=totals.keys()).update(
+                vote_count=F("vote_count") + _case(totals)
+            )
+            VoteShard.objects.filter(pk__in=[shard_id for shard_id, _, _ in shards]).update(
+                votes=F("votes") - _case({shard_id: votes for shard_id, _, votes in shards})
+            )
+            moved += sum(totals.values())
+
+        if len(shards) < batch_size:
+            return moved
@@ -0,0 +1,71 @@
+from itertools import groupby
+from operator import attrgetter
+
+from core.models.candidate import Candidate
+
+
+class Leaderboard:
+    """
+    Candidates of one category in rank order, loaded with a single query.
+
+    Ranks are positions in the ordering (live vote count descending, then
+    name), so ties are broken alphabetically. Each candidate gets a `rank`
+    attribute; lookups by candidate id are O(1).
+    """
+
+    def __init__(self, candidates):
+        self.entries = list(candidates)
+        self._positions = {}
+        for position, candidate in enumerate(self.entries):
+            candidate.rank = position + 1
+            self._positions[candidate.id] = position
+
+    @classmethod
+    def for_category(cls, category):
+        candidates = (
+            Candidate.objects.filter(category=category)
+            .with_live_votes()
+            .select_related('event')
+            .order_by('-live_vote_count', 'name')
+        )
+        return cls(candidates)
+
+    @classmethod
+    def for_event(cls, event_id):
+        """
+        Returns one board per category of the event, loaded with a single query.
+        """
+        candidates = (
+            Candidate.objects.filter(event_id=event_id)
+            .with_live_votes()
+            .order_by('category_id', '-live_vote_count', 'name')
+        )
+        return [cls(group) for _, group in groupby(candidates, key=attrgetter('category_id'))]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def rank_of(self, candidate_id):
+        """
+        Returns the rank of a candidate, or None if it is not on this board.
+        """
+        position = self._positions.get(candidate_id)
+        return None if position is None else position + 1
+
+    def top(self, k):
+        """
+        Returns the first `k` candidates.
+        """
+        return self.entries[:max(k, 0)]
+
+    def around(self, candidate_id, radius=2):
+        """
+        Returns the candidate together with up to `radius` neighbours on each side.
+        """
+        position = self._positions.get(candidate_id)
+        if position is None:
+            return []
+        return self.entries[max(position - radius, 0):position + radius + 1]
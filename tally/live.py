@@ -0,0 +1,134 @@
+"""
+In-process fan-out of live results to Server-Sent Events streams.
+
+Each process runs at most one poller per event that has viewers. Every
+`LIVE_RESULTS_TICK` seconds it checks the event's results version (one
+primary-key lookup, see tally.versioning), which the settlement worker bumps
+in the database; only when a settlement has bumped it does it
+reload the standings (one query) and push the candidates whose vote count or
+rank changed to every subscriber. Updates that land within one tick are
+coalesced, so the database load follows the rate of vote settlements rather
+than the number of viewers.
+"""
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from tally.leaderboard import Leaderboard
+from tally.versioning import results_etag
+
+
+def load_standings(event_id):
+    """
+    Returns {candidate_id: {"candidate_id", "vote_count", "rank"}} for an event,
+    ranked within each category.
+    """
+    return {
+        candidate.id: {"candidate_id": candidate.id, "vote_count": candidate.live_vote_count, "rank": candidate.rank}
+        for board in Leaderboard.for_event(event_id)
+        for candidate in board
+    }
+
+
+class Subscription:
+    """
+    One viewer's stream. Deltas published while the viewer is busy are merged
+    per candidate, so a slow client holds at most one pending row per candidate.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = list(snapshot.values())
+        self._pending = {}
+        self._ready = asyncio.Event()
+
+    def push(self, delta):
+        self._pending.update(delta)
+        self._ready.set()
+
+    async def next_delta(self, timeout=None):
+        """
+        Wait for the next delta. Returns an empty list on timeout.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        delta, self._pending = list(self._pending.values()), {}
+        return delta
+
+
+class _Channel:
+    def __init__(self, hub, event_id):
+        self.hub = hub
+        self.event_id = event_id
+        self.subscribers = set()
+        self.version = None
+        self.standings = None
+        self.poller = None
+
+    async def refresh(self):
+        """
+        Reload the standings if the results version moved. Returns the delta.
+        """
+        version = await sync_to_async(results_etag)(self.event_id)
+        if version is not None and version == self.version and self.standings is not None:
+            return {}
+        standings = await sync_to_async(load_standings)(self.event_id)
+        previous, self.version, self.standings = self.standings or {}, version, standings
+        return {cid: row for cid, row in standings.items() if previous.get(cid) != row}
+
+    async def poll(self):
+        while self.subscribers:
+            await asyncio.sleep(self.hub.tick)
+            delta = await self.refresh()
+            if delta:
+                for subscription in self.subscribers:
+                    subscription.push(delta)
+
+
+class ResultsHub:
+    """
+    Tracks the live-results channels of one event loop.
+    """
+
+    def __init__(self, tick=None):
+        self.tick = settings.LIVE_RESULTS_TICK if tick is None else tick
+        self.channels = {}
+
+    async def subscribe(self, event_id):
+        channel = self.channels.get(event_id)
+        if channel is None:
+            channel = self.channels[event_id] = _Channel(self, event_id)
+        if channel.standings is None:
+            await channel.refresh()
+
+        subscription = Subscription(channel.standings)
+        channel.subscribers.add(subscription)
+        if channel.poller is None or channel.poller.done():
+            channel.poller = asyncio.create_task(channel.poll())
+        return subscription
+
+    def unsubscribe(self, event_id, subscription):
+        channel = self.channels.get(event_id)
+        if channel is None:
+            return
+        channel.subscribers.discard(subscription)
+        if not channel.subscribers:
+            del self.channels[event_id]
+            if channel.poller is not None:
+                channel.poller.cancel()
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+def get_hub():
+    """
+    Returns the hub for the running event loop (one per process under an ASGI server).
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = ResultsHub()
+    return _hubs[loop]
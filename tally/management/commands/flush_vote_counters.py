@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tally.counters import flush_vote_shards
+
+
+class Command(BaseCommand):
+    help = "Fold pending vote shard totals into Candidate.vote_count."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Seconds between flushes. 0 runs a single flush and exits.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            moved = flush_vote_shards(batch_size=options["batch_size"])
+            if moved:
+                self.stdout.write(f"Flushed {moved} votes")
+            if not interval:
+                return
+            time.sleep(interval)
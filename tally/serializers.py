@@ -1,31 +1,32 @@
 from core.models.candidate import Candidate
+from tally.leaderboard import Leaderboard
 from core.models.category import Category
 from rest_framework import serializers
 from django.utils.timezone import now
 
 
 class CandidateSerializer(serializers.ModelSerializer):
+    vote_count = serializers.SerializerMethodField(read_only=True)
     vote_amount = serializers.SerializerMethodField(read_only=True)
     rank = serializers.SerializerMethodField(read_only=True)
+
+    def get_vote_count(self, obj):
+        """
+        Returns the exact vote count, including votes not yet flushed from shards.
+        """
+        return getattr(obj, 'live_vote_count', obj.vote_count)
     
     def get_vote_amount(self, obj):
         """
         Returns the total amount generated by the votes for the candidate.
         """
-        return obj.vote_count * obj.event.amount_per_vote if obj.event else 0
+        return self.get_vote_count(obj) * obj.event.amount_per_vote if obj.event else 0
     
     def get_rank(self, obj):
         """
-        Returns the rank of the candidate based on the vote count.
+        Returns the rank of the candidate, as assigned by the category leaderboard.
         """
-        # Get all candidates in the same event, ordered by vote count descending
-        candidates = Candidate.objects.filter(event=obj.event).order_by('-vote_count', 'name')
-        rank = 1
-        for candidate in candidates:
-            if candidate.id == obj.id:
-                return rank
-            rank += 1
-        return None
+        return getattr(obj, 'rank', None)
 
     class Meta:
         model = Candidate
@@ -33,9 +34,23 @@ class CandidateSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "vote_count", "vote_amount", "rank"]
 
 class CategoryResultSerializer(serializers.ModelSerializer):
-    results = CandidateSerializer(source='candidates', many=True, read_only=True)
+    results = serializers.SerializerMethodField(read_only=True)
     last_update = serializers.SerializerMethodField(read_only=True)
 
+    def get_results(self, obj):
+        """
+        Returns the ranked candidates of the category, optionally narrowed to a
+        rank window through the `top` or `around`/`radius` context values.
+        """
+        leaderboard = Leaderboard.for_category(obj)
+        if self.context.get('around') is not None:
+            candidates = leaderboard.around(self.context['around'], self.context.get('radius', 2))
+        elif self.context.get('top') is not None:
+            candidates = leaderboard.top(self.context['top'])
+        else:
+            candidates = leaderboard.entries
+        return CandidateSerializer(candidates, many=True).data
+
     def get_last_update(self, obj):
         """
         Returns the last update time in a human-readable
@@ -0,0 +1,24 @@
+"""
+Create results versions for new events and bump them when organizers change
+what an event's results show.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Candidate, Category, Event, ResultsVersion
+from tally.versioning import bump_results_versions
+
+
+@receiver(post_save, sender=Event)
+def event_changed(sender, instance, created, **kwargs):
+    # A deleted event's version row goes with it, so it never serves a 304 again
+    if created:
+        ResultsVersion.objects.get_or_create(event=instance)
+    else:
+        bump_results_versions([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Candidate)
+def event_child_changed(sender, instance, **kwargs):
+    bump_results_versions([instance.event_id])
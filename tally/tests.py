@@ -1,3 +1,319 @@
-from django.test import TestCase
+import asyncio
+import pytest
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import User, Event, Category, Candidate, ResultsVersion, VoteShard
+from core.models.vote import VoteTransaction
+from payments.models import Transaction
+from payments.task import settle_vote_batch
+from tally.counters import flush_vote_shards, record_votes
+from tally.leaderboard import Leaderboard
+from tally.live import ResultsHub, load_standings
+from tally.serializers import CategoryResultSerializer
+from tally.versioning import bump_results_versions, results_etag
 
-# Create your tests here.
+
+@pytest.fixture
+def event(db):
+    user = User.objects.create_user(
+        email="tally@example.com",
+        password="password123",
+        organization_name="TallyOrg"
+    )
+    return Event.objects.create(
+        user=user,
+        name="Campus Awards",
+        host="SRC",
+        amount_per_vote=1.00,
+        start_time=timezone.now(),
+        end_time=timezone.now() + timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def category(event):
+    return Category.objects.create(event=event, name="Best Dressed")
+
+
+@pytest.fixture
+def candidates(event, category):
+    return [
+        Candidate.objects.create(event=event, category=category, name=name, gender="other")
+        for name in ("Ama", "Kofi", "Esi")
+    ]
+
+
+@pytest.mark.django_db
+class TestVoteCounters:
+    def test_record_votes_goes_to_shards(self, candidates):
+        ama, kofi, _ = candidates
+        record_votes({ama.id: 3, kofi.id: 2})
+        record_votes({ama.id: 4})
+
+        ama.refresh_from_db()
+        assert ama.vote_count == 0
+        assert sum(VoteShard.objects.filter(candidate=ama).values_list("votes", flat=True)) == 7
+
+    def test_live_vote_count_is_exact_before_flush(self, candidates):
+        ama, kofi, esi = candidates
+        Candidate.objects.filter(pk=ama.pk).update(vote_count=10)
+        record_votes({ama.id: 5, kofi.id: 1})
+
+        live = dict(Candidate.objects.with_live_votes().values_list("id", "live_vote_count"))
+        assert live == {ama.id: 15, kofi.id: 1, esi.id: 0}
+
+    def test_flush_folds_shards_into_vote_count(self, candidates):
+        ama, kofi, _ = candidates
+        for _ in range(20):
+            record_votes({ama.id: 1, kofi.id: 2})
+
+        assert flush_vote_shards(batch_size=1) == 60
+
+        ama.refresh_from_db()
+        kofi.refresh_from_db()
+        assert (ama.vote_count, kofi.vote_count) == (20, 40)
+        assert not VoteShard.objects.filter(votes__gt=0).exists()
+        assert flush_vote_shards() == 0
+
+    def test_record_votes_ignores_zero_counts(self, candidates):
+        record_votes({candidates[0].id: 0})
+        assert not VoteShard.objects.exists()
+
+    def test_candidate_listings_show_unflushed_votes(self, client, event, category, candidates):
+        cache.clear()
+        Candidate.objects.filter(pk=candidates[0].pk).update(vote_count=2)
+        record_votes({candidates[0].id: 3})
+
+        organizer = APIClient()
+        organizer.force_authenticate(event.user)
+        response = organizer.get(reverse("core:organizer-candidates-list"), {"category": category.id})
+        ama = next(c for c in response.json()["data"] if c["id"] == candidates[0].id)
+        assert (ama["vote_count"], ama["revenue"]) == (5, 5)
+
+        response = client.get(reverse("core:public-candidates"), {"eventcode": event.shortcode, "category": category.id})
+        assert {c["name"]: c["vote_count"] for c in response.json()["data"]}["Ama"] == 5
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+    def test_ranks_by_live_votes_then_name(self, category, candidates):
+        ama, kofi, esi = candidates
+        Candidate.objects.filter(pk=kofi.pk).update(vote_count=5)
+        record_votes({esi.id: 5, ama.id: 1})
+
+        board = Leaderboard.for_category(category)
+        assert [c.name for c in board] == ["Esi", "Kofi", "Ama"]
+        assert [c.rank for c in board] == [1, 2, 3]
+        assert board.rank_of(ama.id) == 3
+        assert board.rank_of(-1) is None
+
+    def test_rank_windows(self, category, candidates):
+        for votes, candidate in enumerate(candidates):
+            Candidate.objects.filter(pk=candidate.pk).update(vote_count=votes)
+
+        board = Leaderboard.for_category(category)
+        assert [c.name for c in board.top(2)] == ["Esi", "Kofi"]
+        assert [c.name for c in board.around(candidates[1].id, radius=1)] == ["Esi", "Kofi", "Ama"]
+        assert [c.name for c in board.around(candidates[2].id, radius=1)] == ["Esi", "Kofi"]
+        assert board.around(-1) == []
+
+    def test_category_results_are_built_in_constant_queries(self, category, candidates, django_assert_num_queries):
+        for i in range(20):
+            Candidate.objects.create(event=category.event, category=category, name=f"Extra {i}", gender="other")
+
+        with django_assert_num_queries(1):
+            data = CategoryResultSerializer(instance=category, context={"top": 5}).data
+        assert [row["rank"] for row in data["results"]] == [1, 2, 3, 4, 5]
+
+
+def settle(votes):
+    record_votes(votes)
+    bump_results_versions(Candidate.objects.filter(id__in=votes).values_list("event_id", flat=True))
+
+
+def paid_votes(candidate, votes):
+    payment = Transaction.objects.create(
+        amount=votes, channel="momo", provider="mtn", phone_number="0240000000",
+        type="payment", gateway="paystack", status="success",
+    )
+    VoteTransaction.objects.create(candidate=candidate, vote_count=votes, payment=payment)
+
+
+@contextmanager
+def worker_cache():
+    """
+    Runs the block as another process would: against a cache the web views don't share.
+    """
+    other = LocMemCache("worker", {})
+    with mock.patch("django.core.cache.cache", other), mock.patch("core.mixins.cache.cache", other), \
+            mock.patch("tally.versioning.cache", other):
+        yield
+
+
+@pytest.mark.django_db
+class TestResultsETag:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def test_unchanged_results_return_304_after_one_lookup(self, client, event, candidates, django_assert_num_queries):
+        url = reverse("core:public-results", kwargs={"shortcode": event.shortcode})
+        response = client.get(url)
+        etag = response["ETag"]
+        assert response.status_code == 200
+        assert etag == results_etag(event.id)
+
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_settled_votes_change_the_etag(self, client, event, candidates, django_capture_on_commit_callbacks):
+        url = reverse("core:public-results", kwargs={"shortcode": event.shortcode})
+        etag = client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            record_votes({candidates[0].id: 3})
+            bump_results_versions([event.id])
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert response.json()["data"]["results"][0]["vote_count"] == 3
+
+    def test_settlement_in_the_worker_process_changes_the_etag(self, client, event, candidates, django_capture_on_commit_callbacks):
+        url = reverse("core:public-results", kwargs={"shortcode": event.shortcode})
+        etag = client.get(url)["ETag"]
+
+        # process_webhooks settles votes with its own per-process cache
+        with worker_cache(), django_capture_on_commit_callbacks(execute=True):
+            settle({candidates[0].id: 3})
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["data"]["results"][0]["vote_count"] == 3
+
+    def test_settlements_do_not_lock_the_version_row(self, event, candidates, django_capture_on_commit_callbacks):
+        paid_votes(candidates[0], 2)
+        version_table = ResultsVersion._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries, django_capture_on_commit_callbacks() as callbacks:
+            assert settle_vote_batch() == 1
+        assert not [q for q in queries.captured_queries if version_table in q["sql"]]
+
+        etag = results_etag(event.id)
+        for callback in callbacks:
+            callback()
+        assert results_etag(event.id) != etag
+
+    def test_deleted_events_have_no_etag(self, event):
+        event_id = event.id
+        event.delete()
+        assert results_etag(event_id) is None
+
+    def test_organizer_edits_change_the_etag(self, event, candidates, django_capture_on_commit_callbacks):
+        etag = results_etag(event.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            candidates[0].delete()
+        assert results_etag(event.id) != etag
+
+
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLiveResults:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def test_subscribers_get_snapshot_then_deltas(self, event, candidates):
+        ama, kofi, esi = candidates
+
+        async def scenario():
+            hub = ResultsHub(tick=0.01)
+            subscription = await hub.subscribe(event.id)
+            await sync_to_async(settle)({esi.id: 3})
+            delta = await subscription.next_delta(timeout=2)
+            hub.unsubscribe(event.id, subscription)
+            return hub, subscription.snapshot, delta
+
+        hub, snapshot, delta = asyncio.run(scenario())
+
+        assert snapshot == [
+            {"candidate_id": ama.id, "vote_count": 0, "rank": 1},
+            {"candidate_id": esi.id, "vote_count": 0, "rank": 2},
+            {"candidate_id": kofi.id, "vote_count": 0, "rank": 3},
+        ]
+        # Kofi kept rank 3 and no votes, so he is left out
+        assert sorted(delta, key=lambda row: row["rank"]) == [
+            {"candidate_id": esi.id, "vote_count": 3, "rank": 1},
+            {"candidate_id": ama.id, "vote_count": 0, "rank": 2},
+        ]
+        assert hub.channels == {}
+
+    def test_settlements_in_the_worker_process_reach_subscribers(self, event, candidates):
+        ama, kofi, esi = candidates
+
+        def settle_in_worker():
+            with worker_cache():
+                assert settle_vote_batch() == 1
+
+        async def scenario():
+            hub = ResultsHub(tick=0.01)
+            subscription = await hub.subscribe(event.id)
+            await sync_to_async(paid_votes)(kofi, 4)
+            await sync_to_async(settle_in_worker)()
+            delta = await subscription.next_delta(timeout=2)
+            hub.unsubscribe(event.id, subscription)
+            return delta
+
+        delta = asyncio.run(scenario())
+
+        assert {"candidate_id": kofi.id, "vote_count": 4, "rank": 1} in delta
+
+    def test_settlements_within_a_tick_are_coalesced(self, event, candidates):
+        ama, kofi, esi = candidates
+
+        async def scenario():
+            hub = ResultsHub(tick=0.3)
+            viewers = [await hub.subscribe(event.id) for _ in range(50)]
+            await sync_to_async(settle)({ama.id: 1})
+            await sync_to_async(settle)({kofi.id: 2})
+            deltas = [await viewer.next_delta(timeout=2) for viewer in viewers]
+            for viewer in viewers:
+                hub.unsubscribe(event.id, viewer)
+            return deltas
+
+        with mock.patch("tally.live.load_standings", wraps=load_standings) as loads:
+            deltas = asyncio.run(scenario())
+
+        assert loads.call_count == 2  # initial snapshot + one reload for both settlements
+        assert all(
+            sorted((row["candidate_id"], row["rank"]) for row in delta) == sorted([(kofi.id, 1), (ama.id, 2), (esi.id, 3)])
+            for delta in deltas
+        )
+
+    def test_stream_endpoint(self, event, candidates):
+        async def scenario():
+            client = AsyncClient()
+            missing = await client.get(reverse("tally:results-stream", kwargs={"shortcode": "nope"}))
+            response = await client.get(reverse("tally:results-stream", kwargs={"shortcode": event.shortcode}))
+            first = await anext(aiter(response.streaming_content))
+            await response.streaming_content.aclose()
+            return missing, response, first
+
+        missing, response, first = asyncio.run(scenario())
+
+        assert missing.status_code == 404
+        assert response["Content-Type"] == "text/event-stream"
+        assert first.decode().startswith("event: snapshot\ndata: [")
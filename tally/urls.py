@@ -1,8 +1,9 @@
 from django.urls import path
-from tally.views import EventResultsView
+from tally.views import EventResultsStreamView, EventResultsView
 
 app_name = "tally"
 
 urlpatterns = [
     path('results', EventResultsView.as_view(), name='public-results'),
+    path('public/events/<str:shortcode>/results/stream', EventResultsStreamView.as_view(), name='results-stream'),
 ]
@@ -0,0 +1,89 @@
+"""
+Per-event results versions, used as ETags so pollers can revalidate results
+with a single primary-key lookup.
+
+The version is a counter row (core.models.ResultsVersion) bumped once
+anything that changes an event's results commits: votes settling
+(payments.task) and organizers editing the event, its categories or
+candidates (tally.signals). It is kept in the database, not the cache, because
+settlements run in the process_webhooks worker, which does not share a
+per-process cache with the web servers.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.models.event import Event
+from core.models.vote_counter import ResultsVersion
+
+
+def results_etag(event_id):
+    """
+    Strong ETag for the current results of an event, or None if the event
+    has no version row (it was deleted).
+    """
+    version = ResultsVersion.objects.filter(event_id=event_id).values_list('version', flat=True).first()
+    return None if version is None else quote_etag(f"{event_id}-{version}")
+
+
+def bump_results_versions(event_ids):
+    """
+    Move the results ETags of the given events on once the current
+    transaction commits (at once outside one).
+
+    The bump is not part of the transaction so that concurrent settlements
+    for one event do not queue on its version row while they hold their own
+    locks; each bump is a single-statement UPDATE per event. A poller that
+    reads results between the commit and the bump gets the new body under
+    the old ETag and is corrected by the next poll after the bump.
+    """
+    event_ids = sorted(set(event_ids))
+    if event_ids:
+        transaction.on_commit(lambda: _bump(event_ids))
+
+
+def _bump(event_ids):
+    for event_id in event_ids:
+        ResultsVersion.objects.filter(event_id=event_id).update(version=F('version') + 1)
+
+
+def active_event_id(shortcode):
+    """
+    Resolve a public shortcode to the id of an active event, memoized in the
+    cache. Returns None if there is no such event.
+
+    Views must still check the event when building a response: a memoized id
+    may belong to an event that has since been deactivated (which also bumps
+    its results version, so no stale 304 is served).
+    """
+    key = f"results:event-id:{shortcode}"
+    event_id = cache.get(key)
+    if event_id is None:
+        event_id = Event.objects.filter(shortcode=shortcode, is_active=True).values_list('id', flat=True).first()
+        if event_id is not None:
+            cache.set(key, event_id, settings.PUBLIC_CACHE_TTL)
+    return event_id
+
+
+class ResultsETagMixin:
+    """
+    A view mixin for results endpoints that answers `If-None-Match` with
+    304 Not Modified while the event's results version is unchanged.
+
+    Usage:
+        def get(self, request, ...):
+            return self.results_response(request, event.id, lambda: build_results(event))
+    """
+
+    def results_response(self, request, event_id, build):
+        # Read the version before building, so the ETag is never newer than the body
+        etag = results_etag(event_id)
+        if etag is None:
+            return Response(build())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(build(), headers={'ETag': etag})
@@ -6,20 +6,79 @@ from core.permissions import IsOrganizer
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
-from rest_framework.response import Response
 from tally.serializers import CategoryResultSerializer
+from tally.versioning import ResultsETagMixin, active_event_id
 from django.shortcuts import get_object_or_404
 from core.mixins.response import StandardResponseView
-from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from tally.live import get_hub
+from utils.exceptions import custom_exception_handler
+import json
 
-class EventResultsView(StandardResponseView):
+class EventResultsView(ResultsETagMixin, StandardResponseView):
     permission_classes = [IsOrganizer]
 
+    def get_window(self, request):
+        """
+        Parse the optional rank window: `?top=K` or `?around=<candidate_id>&radius=N`.
+        """
+        window = {}
+        try:
+            for param in ('top', 'around', 'radius'):
+                if request.query_params.get(param):
+                    window[param] = int(request.query_params[param])
+        except ValueError:
+            raise ValidationError({'detail': 'top, around and radius must be integers.'})
+        return window
+
     def get(self, request):
         event_id = request.query_params.get('event')
         category_id = request.query_params.get('category')
 
         category = get_object_or_404(Category, id=category_id, event_id=event_id, event__user=request.user)
-        serializer = CategoryResultSerializer(instance=category)
+        window = self.get_window(request)
+
+        return self.results_response(
+            request, category.event_id, lambda: CategoryResultSerializer(instance=category, context=window).data,
+        )
+
+
+class EventResultsStreamView(View):
+    """
+    Live results of an event as Server-Sent Events (serve under ASGI).
+
+    The stream opens with a `snapshot` event listing every candidate as
+    {candidate_id, vote_count, rank}, followed by `delta` events with only
+    the candidates that changed. Ranks are within the candidate's category.
+    """
+    http_method_names = ['get']
+
+    async def get(self, request, shortcode):
+        event_id = await sync_to_async(active_event_id)(shortcode)
+        if event_id is None:
+            response = custom_exception_handler(NotFound({'detail': 'Event not found'}), {"view": self})
+            return JsonResponse(response.data, status=response.status_code)
+
+        response = StreamingHttpResponse(self.stream(event_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+        return response
+
+    @staticmethod
+    def format_event(name, data):
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    async def stream(self, event_id):
+        hub = get_hub()
+        subscription = await hub.subscribe(event_id)
+        try:
+            yield self.format_event("snapshot", subscription.snapshot)
+            while True:
+                delta = await subscription.next_delta(timeout=settings.LIVE_RESULTS_HEARTBEAT)
+                yield self.format_event("delta", delta) if delta else ": keep-alive\n\n"
+        finally:
+            hub.unsubscribe(event_id, subscription)
@@ -0,0 +1,48 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Route the reads made inside the block to a read replica, if any are
+    configured. Writes always go to the primary.
+
+    Only use this for reads that tolerate replication lag.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads inside `read_from_replica()` to a random `replica_*` database
+    and everything else (including settlement and other writes) to `default`.
+    """
+
+    def __init__(self, replicas=None):
+        if replicas is None:
+            replicas = [alias for alias in settings.DATABASES if alias.startswith("replica_")]
+        self.replicas = replicas
+
+    def db_for_read(self, model, **hints):
+        if self.replicas and _replica_reads.get():
+            return random.choice(self.replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replicas hold the same data as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -1,6 +1,21 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
 from rest_framework.views import exception_handler
 from utils.response import standard_response
 
+
+class SoldOut(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Tickets sold out.'
+    default_code = 'sold_out'
+
+
+class NotAdmitted(APIException):
+    status_code = status.HTTP_403_FORBIDDEN
+    default_detail = 'Join the waiting room for this ticket and wait to be admitted.'
+    default_code = 'not_admitted'
+
+
 def custom_exception_handler(exc, context):
     response = exception_handler(exc, context)
     print(f"Exception: {exc}, Context: {context}")
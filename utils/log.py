@@ -0,0 +1,84 @@
+"""
+Logging plumbing: a handler that writes on a background thread, and the JSON
+formatter for structured request logs (see core.middleware.request_logging).
+"""
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import parse_qsl
+
+REDACT_HEADERS = {'authorization', 'cookie', 'set-cookie'}
+REDACT_FIELDS = {'password', 'token', 'secret', 'file'}
+
+
+class BackgroundFileHandler(QueueHandler):
+    """
+    A file handler whose formatting and writing happen on a QueueListener
+    thread. The logging call only enqueues the record, so the caller never
+    waits on the disk or pays for formatting.
+
+    Records are queued as they are (not pre-formatted, unlike QueueHandler),
+    so callers must not mutate objects they pass in `extra` after logging.
+    When the queue is full, records are dropped rather than blocking.
+    """
+
+    def __init__(self, filename, max_queue_size=10000, encoding=None):
+        super().__init__(queue.Queue(max_queue_size))
+        self.file_handler = logging.FileHandler(filename, encoding=encoding)
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, self.file_handler)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        self.file_handler.setFormatter(fmt)  # applied on the listener thread
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()  # drains the queue first
+        self.file_handler.close()
+        super().close()
+
+
+def _parse_body(content_type, body):
+    if not body:
+        return None
+    try:
+        if 'application/json' in content_type:
+            return json.loads(body)
+        if 'application/x-www-form-urlencoded' in content_type:
+            return dict(parse_qsl(body.decode()))
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return '[Unreadable]'
+
+
+def _redact(mapping, keys):
+    return {k: ("[REDACTED]" if k.lower() in keys else v) for k, v in mapping.items()}
+
+
+class JsonRequestFormatter(logging.Formatter):
+    """
+    Renders the `request` dict attached by RequestLoggingMiddleware as one JSON
+    line. The raw body is parsed and redacted here, on the writer thread.
+    """
+
+    def format(self, record):
+        data = getattr(record, 'request', None)
+        if data is None:
+            return json.dumps({"time": self.formatTime(record), "message": record.getMessage()})
+
+        entry = {"time": self.formatTime(record), **data}
+        entry["headers"] = _redact(data.get("headers", {}), REDACT_HEADERS)
+        body = _parse_body(data.get("content_type", ""), data.get("body"))
+        entry["body"] = _redact(body, REDACT_FIELDS) if isinstance(body, dict) else body
+        return json.dumps(entry, default=str)
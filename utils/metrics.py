@@ -0,0 +1,172 @@
+"""
+A small in-process metrics registry rendered in the Prometheus text format
+(served by core.views.MetricsView).
+
+Values are per process: scrape every worker, or run one worker per
+container, and let Prometheus aggregate. Worker commands that serve no HTTP
+(process_webhooks, send_queued_emails) expose theirs with `serve()`.
+"""
+import bisect
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+LAG_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_value(self, key, value):
+        yield f"{self.name}_total{_labels(self.label_names, key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the block in seconds. Labels can be added
+        inside the block by updating the yielded dict.
+        """
+        labels = dict(labels)
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def sample(self, **labels):
+        """
+        Returns (count, sum) of the observations with these labels.
+        """
+        counts, total = self._values.get(self._key(labels), ([0], 0))
+        return sum(counts), total
+
+    def _render_value(self, key, value):
+        counts, total = value
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f"{self.name}_bucket{_labels(self.label_names + ('le',), key + (le,))} {cumulative}"
+        yield f"{self.name}_sum{_labels(self.label_names, key)} {total}"
+        yield f"{self.name}_count{_labels(self.label_names, key)} {cumulative}"
+
+
+def render():
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def serve(host, port, token=""):
+    """
+    Serve this process's metrics at http://host:port/metrics from a daemon
+    thread. With a token, scrapes must send `Authorization: Bearer <token>`
+    like they do for core.views.MetricsView.
+
+    Returns:
+        ThreadingHTTPServer: The running server (`server_address` has the bound port).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                return self.send_error(404)
+            if token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+                return self.send_error(401)
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+# Metrics recorded across the project
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", labels=("route", "method", "status"),
+)
+http_request_queries = Histogram(
+    "http_request_db_queries", "Database queries per request by route.", labels=("route", "method"),
+    buckets=COUNT_BUCKETS,
+)
+gateway_request_duration = Histogram(
+    "gateway_request_duration_seconds", "Outbound payment/SMS gateway call latency.",
+    labels=("gateway", "method", "outcome"),
+)
+webhook_settlement_lag = Histogram(
+    "webhook_settlement_lag_seconds", "Time from receiving a webhook to settling it.", buckets=LAG_BUCKETS,
+)
+webhook_settlements = Counter(
+    "webhook_settlements", "Webhook settlement attempts by outcome.", labels=("outcome",),
+)
+email_send_duration = Histogram(
+    "email_send_duration_seconds", "Outbox email delivery time by outcome.", labels=("outcome",),
+)
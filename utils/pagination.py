@@ -0,0 +1,96 @@
+import base64
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pagination on `(created_at, id)`.
+
+    Each page continues strictly after the last row of the previous one, so
+    fetching page N costs the same as page 1 (given an index ending in
+    `created_at, id`), and rows inserted meanwhile never shift a page.
+
+    Query params:
+        cursor: Opaque position returned as `next` by the previous page.
+        page_size: Rows per page (default `page_size`, at most `max_page_size`).
+    """
+    page_size = 50
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor, queryset.model)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get('page_size', self.page_size))
+        except ValueError:
+            raise ValidationError({'detail': 'page_size must be an integer.'})
+        return min(max(page_size, 1), self.max_page_size)
+
+    def encode_cursor(self, instance):
+        position = f"{instance.created_at.isoformat()}|{instance.pk}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor, model):
+        try:
+            created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+            created_at = parse_datetime(created_at)
+            pk = model._meta.pk.to_python(pk)
+        except (ValueError, UnicodeDecodeError, DjangoValidationError):
+            created_at = None
+        if created_at is None:
+            raise ValidationError({'detail': 'Invalid cursor.'})
+        return created_at, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, 'cursor', self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+def filter_created_range(queryset, request):
+    """
+    Apply the optional `?from=YYYY-MM-DD&to=YYYY-MM-DD` filters (both days
+    inclusive, in the current time zone) to `created_at`.
+    """
+    for param in ('from', 'to'):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        try:
+            day = parse_date(value) if len(value) == 10 else None
+        except ValueError:  # well formed but not a real day, e.g. 2024-02-30
+            day = None
+        if day is None:
+            raise ValidationError({'detail': f'{param} must be a date (YYYY-MM-DD).'})
+        if param == 'from':
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(day, time.min)))
+        else:
+            queryset = queryset.filter(created_at__lt=timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min)))
+    return queryset
@@ -0,0 +1,106 @@
+"""
+Query counting for tests and debugging: a budget that fails when a block runs
+too many queries, and N+1 detection by repeated SQL fingerprints.
+"""
+import re
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+
+from django.db import connections
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%s|\?")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Normalize a statement so queries that differ only in their parameters
+    compare equal, e.g. `... WHERE "event_id" = 7` and `... = 8`.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def repeated_queries(queries, threshold=3):
+    """
+    Returns [(fingerprint, count)] for statements run at least `threshold`
+    times, most repeated first: the usual signature of an N+1.
+    """
+    counts = Counter(fingerprint(sql) for sql in queries)
+    return [(sql, count) for sql, count in counts.most_common() if count >= threshold]
+
+
+class QueryRecorder:
+    """
+    Records the SQL run on every database connection inside the block.
+    Unlike CaptureQueriesContext it does not need DEBUG.
+    """
+
+    def __init__(self, using=None):
+        self.using = using
+        self.queries = []
+        self._stack = None
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in self.using or connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+    def __len__(self):
+        return len(self.queries)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail if the block (or decorated function) runs more than `max_queries`
+    queries, or repeats any statement `max_repeats` times or more.
+
+    Usage:
+        with query_budget(3):
+            client.get(url)
+
+        @query_budget(5, max_repeats=3)
+        def test_dashboard(...): ...
+    """
+
+    def __init__(self, max_queries, max_repeats=None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    def __enter__(self):
+        self.recorder = QueryRecorder().__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.__exit__(exc_type, exc, tb)
+        if exc_type is not None:
+            return False
+
+        queries = self.recorder.queries
+        problems = []
+        if len(queries) > self.max_queries:
+            problems.append(f"{len(queries)} queries run, budget is {self.max_queries}")
+        if self.max_repeats is not None:
+            problems += [f"{count}x {sql}" for sql, count in repeated_queries(queries, self.max_repeats)]
+        if problems:
+            listing = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(queries, start=1))
+            raise QueryBudgetExceeded("\n".join(problems) + f"\nQueries:\n{listing}")
+        return False